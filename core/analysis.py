@@ -0,0 +1,215 @@
+"""
+Analyse groupée des exports de fin de partie (rapports/*_results.csv).
+
+Les fichiers sont lus en parallèle ; la section "Journal Quotidien" de chaque
+fichier devient un tableau NumPy. Les parties de durées différentes sont
+alignées dans une matrice (joueurs x jours) complétée par des NaN, sur laquelle
+sont calculées les courbes moyennes et les percentiles jour par jour.
+
+Utilisation en ligne de commande :
+    python -m core.analysis [dossier] [--out rapport.csv]
+"""
+import csv
+import glob
+import io
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from core.export import JOURNAL_COLUMNS
+
+JOURNAL_MARKER = "Journal Quotidien"
+PERCENTILES = (10, 50, 90)
+SUMMARY_KEYS = {
+    "Argent Final (€)": "final_money",
+    "Réserve d'Eau Finale (L)": "final_water",
+    "Score de Durabilité Final (%)": "sustainability",
+    "Nombre de Récoltes": "harvests",
+}
+# En dessous de ce nombre de fichiers, la lecture se fait sans processus supplémentaires
+PARALLEL_MIN_FILES = 64
+
+
+def default_reports_dir():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "rapports")
+
+
+def player_name(filepath):
+    """Nom du joueur déduit du nom de fichier ("Awa_results.csv" -> "Awa")."""
+    name = os.path.basename(filepath)
+    return name[:-len("_results.csv")] if name.endswith("_results.csv") else os.path.splitext(name)[0]
+
+
+def parse_results_file(filepath):
+    """
+    Lit un export de fin de partie.
+
+    Returns:
+        {"player", "path", "summary": {clé: valeur}, "journal": {clé: tableau}}, ou None
+        si le fichier est vide ou illisible.
+    """
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            text = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Fichier ignoré ({filepath}) : {e}")
+        return None
+    if not text.strip():
+        return None
+
+    head, _, journal_text = text.partition(JOURNAL_MARKER)
+    summary = {}
+    for row in csv.reader(io.StringIO(head)):
+        if len(row) >= 2 and row[0] in SUMMARY_KEYS:
+            try:
+                summary[SUMMARY_KEYS[row[0]]] = float(row[1])
+            except ValueError:
+                pass
+
+    journal = {}
+    lines = journal_text.strip().splitlines()
+    if len(lines) > 1:
+        headers = next(csv.reader([lines[0]]))
+        keys = ["day"] + [_journal_key(header) for header in headers[1:]]
+        try:
+            data = np.loadtxt(lines[1:], delimiter=",", ndmin=2)
+        except ValueError:
+            # Anciens exports : valeurs manquantes écrites "N/A"
+            data = np.genfromtxt(lines[1:], delimiter=",", ndmin=2)
+        if data.size:
+            journal = {key: data[:, i] for i, key in enumerate(keys) if i < data.shape[1]}
+
+    return {"player": player_name(filepath), "path": filepath, "summary": summary, "journal": journal}
+
+
+def _journal_key(header):
+    for title, key, _ in JOURNAL_COLUMNS:
+        if title == header:
+            return key
+    return header
+
+
+def load_reports(paths, processes=None):
+    """Lit une liste de fichiers (en parallèle au-delà de PARALLEL_MIN_FILES) et ignore ceux qui sont vides."""
+    paths = list(paths)
+    if processes == 1 or len(paths) < PARALLEL_MIN_FILES:
+        reports = map(parse_results_file, paths)
+        return [report for report in reports if report]
+    chunksize = max(1, len(paths) // (4 * (processes or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return [report for report in executor.map(parse_results_file, paths, chunksize=chunksize) if report]
+
+
+def stack_channel(reports, key):
+    """Matrice (joueurs x jours) d'une colonne du journal ; NaN là où une partie est plus courte."""
+    series = [report["journal"].get(key, np.empty(0)) for report in reports]
+    num_days = max((len(values) for values in series), default=0)
+    matrix = np.full((len(series), num_days), np.nan)
+    for row, values in enumerate(series):
+        matrix[row, :len(values)] = values
+    return matrix
+
+
+def aggregate(reports):
+    """
+    Statistiques groupées sur tous les joueurs.
+
+    Returns:
+        Un dictionnaire avec, pour "yield" et "soil_quality", les courbes journalières
+        "mean" et "p10"/"p50"/"p90", ainsi qu'un tableau par joueur ("players").
+    """
+    stats = {"num_reports": len(reports)}
+    # Les jours sans aucune donnée (tous NaN) donnent NaN, sans avertissement
+    with np.errstate(all="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        for key in ("yield", "soil_quality"):
+            matrix = stack_channel(reports, key)
+            curves = {"mean": np.nanmean(matrix, axis=0) if matrix.size else np.empty(0)}
+            if matrix.size:
+                for p, values in zip(PERCENTILES, np.nanpercentile(matrix, PERCENTILES, axis=0)):
+                    curves[f"p{p}"] = values
+            else:
+                curves.update({f"p{p}": np.empty(0) for p in PERCENTILES})
+            stats[key] = curves
+
+        yields = stack_channel(reports, "yield")
+        soil = stack_channel(reports, "soil_quality")
+        summaries = {name: np.array([report["summary"].get(name, np.nan) for report in reports])
+                     for name in SUMMARY_KEYS.values()}
+        num_days = np.sum(~np.isnan(yields), axis=1)
+        last_soil = soil[np.arange(len(reports)), np.maximum(num_days - 1, 0)] if soil.shape[1] else np.full(len(reports), np.nan)
+        stats["players"] = {
+            "player": [report["player"] for report in reports],
+            "days": num_days,
+            "total_yield": np.nansum(yields, axis=1),
+            "final_soil": last_soil,
+            **summaries,
+        }
+        stats["harvests_mean"] = float(np.nanmean(summaries["harvests"])) if len(reports) else float("nan")
+        stats["sustainability_mean"] = float(np.nanmean(summaries["sustainability"])) if len(reports) else float("nan")
+    return stats
+
+
+def write_summary_report(stats, filepath):
+    """Écrit le rapport de synthèse (tableau par joueur, puis courbes journalières) au format CSV."""
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    players = stats["players"]
+    with open(filepath, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Nombre de rapports", stats["num_reports"]])
+        writer.writerow(["Récoltes moyennes", f"{stats['harvests_mean']:.2f}"])
+        writer.writerow(["Durabilité moyenne (%)", f"{stats['sustainability_mean']:.2f}"])
+        writer.writerow([])
+
+        writer.writerow(["Synthèse par Joueur"])
+        writer.writerow(["Joueur", "Jours", "Rendement total (kg)", "Qualité finale du sol (%)",
+                         "Nombre de Récoltes", "Argent Final (€)", "Score de Durabilité Final (%)"])
+        for i, name in enumerate(players["player"]):
+            writer.writerow([name, int(players["days"][i]), f"{players['total_yield'][i]:.2f}",
+                             f"{players['final_soil'][i]:.2f}", f"{players['harvests'][i]:.0f}",
+                             f"{players['final_money'][i]:.2f}", f"{players['sustainability'][i]:.2f}"])
+        writer.writerow([])
+
+        curves = [stats["yield"], stats["soil_quality"]]
+        num_days = len(curves[0]["mean"])
+        if num_days:
+            writer.writerow(["Courbes Journalières"])
+            names = ("mean",) + tuple(f"p{p}" for p in PERCENTILES)
+            writer.writerow(["Jour"] + [f"Rendement {name}" for name in names] + [f"Sol {name}" for name in names])
+            matrix = np.column_stack([np.arange(1, num_days + 1)]
+                                     + [curve[name] for curve in curves for name in names])
+            np.savetxt(f, matrix, fmt=["%d"] + ["%.2f"] * (matrix.shape[1] - 1), delimiter=",")
+    return filepath
+
+
+def analyze_directory(directory=None, output=None, processes=None):
+    """Lit tous les *_results.csv d'un dossier, calcule les statistiques et écrit le rapport."""
+    directory = directory or default_reports_dir()
+    paths = sorted(glob.glob(os.path.join(directory, "*_results.csv")))
+    stats = aggregate(load_reports(paths, processes))
+    output = output or os.path.join(directory, "synthese", "synthese_classe.csv")
+    write_summary_report(stats, output)
+    return stats, output
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Synthèse des exports de fin de partie.")
+    parser.add_argument("directory", nargs="?", help="Dossier des exports (rapports/ par défaut)")
+    parser.add_argument("--out", help="Fichier du rapport de synthèse")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result_stats, report_path = analyze_directory(args.directory, args.out, args.processes)
+    print(f"{result_stats['num_reports']} rapports analysés en {time.perf_counter() - start:.2f} s")
+    print(f"Récoltes moyennes : {result_stats['harvests_mean']:.1f}, "
+          f"durabilité moyenne : {result_stats['sustainability_mean']:.1f} %")
+    print(f"Rapport écrit dans {report_path}")
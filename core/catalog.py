@@ -0,0 +1,217 @@
+"""
+Catalogue des cultures, des régions et des saisons (data/samples/crops.json, data/regions_fr.json).
+
+Les deux fichiers sont lus et vérifiés une seule fois par processus
+(default_catalog()). Chaque culture reçoit un identifiant entier, et ses
+paramètres sont rangés dans des tableaux NumPy indexés par cet identifiant :
+`catalog.water_need[crop_ids]` donne le besoin en eau de toutes les parcelles
+d'un coup. Les tableaux ont une case supplémentaire en fin de tableau (valeurs
+par défaut), si bien que l'identifiant -1 (parcelle vide ou culture inconnue)
+est toujours valide.
+
+Les valeurs invalides sont signalées et remplacées par leur valeur par défaut ;
+les cultures citées par une région mais absentes de crops.json reçoivent un
+identifiant avec les paramètres par défaut.
+
+La table "seasons" en tête de regions_fr.json donne les effets de chaque saison
+(voir core/seasons.py) ; une région peut en corriger des champs dans sa propre
+table "seasons". Chaque région vérifiée reçoit la table complète de ses saisons
+(table commune puis corrections de la région, champ par champ).
+"""
+import json
+import os
+
+import numpy as np
+
+from core.seasons import DEFAULT_SEASON_CYCLE, SEASON_DEFAULTS
+
+# Clé de la table des saisons commune aux régions dans regions_fr.json
+SEASONS_KEY = "seasons"
+
+# Paramètres numériques des cultures, avec leurs valeurs par défaut
+CROP_PARAMS = {
+    "maturation_days": 30,
+    "max_k": 100,
+    "water_need": 60,
+    "max_water_level": 95,
+    "temp_min": 0,
+    "temp_max": 100,
+    "frost_resistant": False,
+}
+
+
+def _data_dir():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data")
+
+
+def default_crops_path():
+    return os.path.join(_data_dir(), "samples", "crops.json")
+
+
+def default_regions_path():
+    return os.path.join(_data_dir(), "regions_fr.json")
+
+
+def _read_json(path, label):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"ERREUR: Fichier '{label}' introuvable ou invalide : {e}")
+        return {}
+    if not isinstance(data, dict):
+        print(f"ERREUR: '{label}' doit contenir un objet JSON (nom -> définition).")
+        return {}
+    return data
+
+
+def validate_crop(name, definition):
+    """Définition de culture vérifiée : paramètres numériques valides, les autres remplacés par leur défaut."""
+    crop = dict(definition)
+    for param, default in CROP_PARAMS.items():
+        value = crop.get(param, default)
+        if isinstance(default, bool):
+            valid = isinstance(value, bool)
+        else:
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value)
+        if not valid:
+            print(f"AVERTISSEMENT: {name}.{param} invalide ({value!r}), valeur par défaut {default!r} utilisée.")
+            value = default
+        crop[param] = value
+    if crop["maturation_days"] <= 0:
+        print(f"AVERTISSEMENT: {name}.maturation_days doit être positif, valeur par défaut utilisée.")
+        crop["maturation_days"] = CROP_PARAMS["maturation_days"]
+    if crop["temp_min"] > crop["temp_max"]:
+        print(f"AVERTISSEMENT: {name} : temp_min > temp_max, plage par défaut utilisée.")
+        crop["temp_min"], crop["temp_max"] = CROP_PARAMS["temp_min"], CROP_PARAMS["temp_max"]
+    return crop
+
+
+def validate_seasons(label, table):
+    """Table de saisons vérifiée (nom -> effets) : champs inconnus ou invalides ignorés."""
+    if not isinstance(table, dict):
+        print(f"AVERTISSEMENT: {label} ignorée (objet attendu).")
+        return {}
+    seasons = {}
+    for season, effects in table.items():
+        if not isinstance(effects, dict):
+            print(f"AVERTISSEMENT: {label}.{season} ignorée (objet attendu).")
+            continue
+        seasons[season] = {}
+        for key, value in effects.items():
+            valid = isinstance(value, str) if key == "icon" else (
+                isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value))
+            if key not in SEASON_DEFAULTS or not valid:
+                print(f"AVERTISSEMENT: {label}.{season}.{key} invalide ({value!r}), ignoré.")
+                continue
+            seasons[season][key] = value
+    return seasons
+
+
+def validate_region(name, region, seasons=None):
+    """
+    Région vérifiée : liste de cultures, cycle de saisons et durées de même longueur, effets des saisons.
+
+    Args:
+        name: Nom de la région (messages d'avertissement).
+        region: Définition de la région (regions_fr.json).
+        seasons: Table des saisons commune, déjà vérifiée (validate_seasons).
+    """
+    region = dict(region)
+    cultures = region.get("cultures", [])
+    if not isinstance(cultures, list) or not all(isinstance(crop, str) for crop in cultures):
+        print(f"AVERTISSEMENT: {name}.cultures doit être une liste de noms, région sans culture.")
+        cultures = []
+    region["cultures"] = cultures
+
+    cycle = region.get("season_cycle")
+    durations = region.get("season_durations")
+    if cycle is not None and durations is not None:
+        valid = (isinstance(durations, list) and len(durations) == len(cycle)
+                 and all(isinstance(days, int) and days > 0 for days in durations))
+        if not valid:
+            print(f"AVERTISSEMENT: {name}.season_durations ne correspond pas à season_cycle, durées par défaut utilisées.")
+            del region["season_durations"]
+
+    # Effets des saisons de la région : table commune, puis corrections de la région champ par champ
+    shared = seasons or {}
+    overrides = validate_seasons(f"{name}.seasons", region.get("seasons", {}))
+    cycle = region.get("season_cycle") or DEFAULT_SEASON_CYCLE
+    region["seasons"] = {}
+    for season in dict.fromkeys(list(cycle) + list(overrides)):
+        effects = {**shared.get(season, {}), **overrides.get(season, {})}
+        missing = [key for key in SEASON_DEFAULTS if key not in effects]
+        if missing and season in cycle:
+            print(f"AVERTISSEMENT: {name} : saison '{season}' sans {', '.join(missing)} dans la table des saisons, "
+                  f"valeurs par défaut utilisées.")
+        region["seasons"][season] = effects
+    return region
+
+
+class Catalog:
+    """
+    Cultures et régions vérifiées.
+
+    Args:
+        crops: Dictionnaire nom -> définition (contenu de crops.json).
+        regions: Dictionnaire nom -> région (contenu de regions_fr.json, sans la table des saisons).
+        seasons: Table des saisons commune aux régions (nom -> effets).
+    """
+
+    def __init__(self, crops, regions, seasons=None):
+        self.seasons = validate_seasons(SEASONS_KEY, seasons or {})
+        self.regions = {name: validate_region(name, region, self.seasons) for name, region in regions.items()
+                        if isinstance(region, dict)}
+        crops = {name: definition for name, definition in crops.items() if isinstance(definition, dict)}
+
+        # Cultures des régions sans définition : identifiant avec les paramètres par défaut
+        missing = [crop for region in self.regions.values() for crop in region["cultures"] if crop not in crops]
+        missing = list(dict.fromkeys(missing))
+        if missing:
+            print(f"AVERTISSEMENT: Cultures sans définition dans crops.json (paramètres par défaut) : {', '.join(missing)}")
+
+        self.crop_definitions = {name: validate_crop(name, definition) for name, definition in crops.items()}
+        self.crop_names = tuple(self.crop_definitions) + tuple(missing)
+        self.crop_ids = {name: i for i, name in enumerate(self.crop_names)}
+
+        for param, default in CROP_PARAMS.items():
+            values = [self.crop_definitions.get(name, {}).get(param, default) for name in self.crop_names]
+            array = np.array(values + [default], dtype=float)
+            array.flags.writeable = False
+            setattr(self, param, array)
+
+    def __len__(self):
+        return len(self.crop_names)
+
+    def crop_id(self, name):
+        """Identifiant d'une culture ; -1 pour une parcelle vide (None) ou une culture inconnue."""
+        return self.crop_ids.get(name, -1)
+
+    def ids_of(self, names):
+        """Identifiants d'une liste de cultures (tableau NumPy), -1 pour les parcelles vides."""
+        crop_ids = self.crop_ids
+        return np.fromiter((crop_ids.get(name, -1) for name in names), dtype=np.intp, count=len(names))
+
+    def params(self, crop_ids):
+        """Paramètres de plusieurs cultures d'un coup : nom du paramètre -> tableau (un élément par identifiant)."""
+        return {param: getattr(self, param)[crop_ids] for param in CROP_PARAMS}
+
+
+def load_catalog(crops_path=None, regions_path=None):
+    """Lit et vérifie les fichiers de cultures et de régions (table des saisons comprise)."""
+    crops = _read_json(crops_path or default_crops_path(), "crops.json")
+    regions = _read_json(regions_path or default_regions_path(), "regions_fr.json")
+    seasons = regions.pop(SEASONS_KEY, {})
+    return Catalog(crops, regions, seasons)
+
+
+_catalog = None
+
+
+def default_catalog():
+    """Le catalogue des fichiers du projet, lu au premier appel puis partagé."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
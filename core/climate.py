@@ -0,0 +1,260 @@
+"""
+Climatologie régionale et générateur de météo synthétique.
+
+La climatologie est calculée à partir de toutes les années NASA POWER en cache
+pour un lieu : pour chaque jour de l'année, moyenne et écart-type de la
+température, écart entre température du sol et de l'air, probabilité de jour
+pluvieux et quantité moyenne de pluie (moyennes glissantes sur quelques
+semaines pour lisser le bruit). La persistance est estimée sur l'historique :
+autocorrélation des anomalies de température et des écarts entre jours de pluie
+et probabilité du jour (le cycle saisonnier seul ne compte pas comme persistance).
+
+Le générateur tire ensuite, pour une graine donnée, autant d'années synthétiques
+que nécessaire (vectorisé sur plusieurs tirages à la fois), au format de
+get_nasa_power_data() : FarmLogic les utilise comme des données réelles.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from core.nasa_api import cached_payloads
+
+DAYS_PER_YEAR = 365
+DATE_FORMAT = "%Y%m%d"
+MISSING_VALUE = -999
+WET_DAY_THRESHOLD = 0.1  # mm
+SMOOTHING_DAYS = 31      # Fenêtre de la moyenne glissante (jours)
+MIN_DAYS = 300           # Historique minimal pour une climatologie
+
+
+def payload_arrays(payloads):
+    """
+    Fusionne des réponses NASA POWER (ponctuelles) en séries journalières continues.
+
+    Returns:
+        (date du premier jour, {"T2M": tableau, "PRECTOTCORR": ..., "TS": ...}) ; NaN pour les jours manquants.
+        (None, {}) si les réponses ne contiennent aucune donnée.
+    """
+    merged = {}
+    for payload in payloads:
+        try:
+            parameters = payload["properties"]["parameter"]
+        except (KeyError, TypeError):
+            continue
+        for name, series in parameters.items():
+            merged.setdefault(name, {}).update(series)
+    if not merged.get("T2M"):
+        return None, {}
+
+    dates = sorted(merged["T2M"])
+    start = datetime.strptime(dates[0], DATE_FORMAT)
+    num_days = (datetime.strptime(dates[-1], DATE_FORMAT) - start).days + 1
+    arrays = {}
+    for name, series in merged.items():
+        values = np.full(num_days, np.nan)
+        offsets = [(datetime.strptime(date, DATE_FORMAT) - start).days for date in series]
+        values[offsets] = list(series.values())
+        values[values == MISSING_VALUE] = np.nan
+        arrays[name] = values
+    return start, arrays
+
+
+def _day_of_year(start, num_days):
+    """Jour de l'année (0 à 364) de chaque jour ; le 31 décembre des années bissextiles rejoint le 30."""
+    days = np.array([(start + timedelta(days=d)).timetuple().tm_yday for d in range(num_days)])
+    return np.minimum(days, DAYS_PER_YEAR) - 1
+
+
+def _circular_smooth(values, window=SMOOTHING_DAYS):
+    """Moyenne glissante circulaire (le 31 décembre est voisin du 1er janvier)."""
+    half = window // 2
+    padded = np.concatenate([values[-half:], values, values[:half]])
+    return np.convolve(padded, np.ones(window), mode="valid")
+
+
+def _smoothed_mean(values, doy, weights=None):
+    """Moyenne par jour de l'année, lissée, des valeurs connues."""
+    known = ~np.isnan(values)
+    if weights is not None:
+        known &= weights
+    sums = np.bincount(doy[known], weights=values[known], minlength=DAYS_PER_YEAR)
+    counts = np.bincount(doy[known], minlength=DAYS_PER_YEAR).astype(float)
+    smoothed_counts = _circular_smooth(counts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(smoothed_counts > 0, _circular_smooth(sums) / smoothed_counts, np.nan)
+
+
+class Climatology:
+    """
+    Statistiques journalières d'un lieu (tableaux de 365 valeurs) et paramètres de persistance.
+    Construite par Climatology.from_arrays() ou Climatology.from_cache().
+    """
+
+    def __init__(self, temp_mean, temp_std, soil_offset_mean, soil_offset_std,
+                 wet_probability, wet_amount, temp_autocorrelation, wet_autocorrelation, num_years):
+        self.temp_mean = temp_mean
+        self.temp_std = temp_std
+        self.soil_offset_mean = soil_offset_mean
+        self.soil_offset_std = soil_offset_std
+        self.wet_probability = wet_probability
+        self.wet_amount = wet_amount
+        self.temp_autocorrelation = temp_autocorrelation
+        self.wet_autocorrelation = wet_autocorrelation
+        self.num_years = num_years
+
+    @classmethod
+    def from_arrays(cls, start, arrays):
+        """Calcule la climatologie depuis des séries journalières (voir payload_arrays())."""
+        temp = arrays["T2M"]
+        precip = arrays.get("PRECTOTCORR", np.full(len(temp), np.nan))
+        soil = arrays.get("TS", np.full(len(temp), np.nan))
+        doy = _day_of_year(start, len(temp))
+
+        temp_mean = _smoothed_mean(temp, doy)
+        temp_mean = np.where(np.isnan(temp_mean), np.nanmean(temp_mean), temp_mean) # Trous de plus d'un mois
+        temp_var = _smoothed_mean((temp - temp_mean[doy]) ** 2, doy)
+        temp_std = np.sqrt(np.nan_to_num(temp_var, nan=1.0)) + 1e-6
+        soil_offset = soil - temp
+        soil_offset_mean = np.nan_to_num(_smoothed_mean(soil_offset, doy))
+        soil_offset_std = np.sqrt(np.nan_to_num(_smoothed_mean((soil_offset - soil_offset_mean[doy]) ** 2, doy)))
+
+        wet = np.where(np.isnan(precip), np.nan, (precip > WET_DAY_THRESHOLD).astype(float))
+        wet_probability = np.clip(np.nan_to_num(_smoothed_mean(wet, doy)), 0.0, 1.0)
+        wet_amount = np.nan_to_num(_smoothed_mean(precip, doy, weights=wet == 1))
+
+        # Persistance : anomalies de température (AR(1)) et écarts des jours de pluie à la probabilité du jour
+        rho = _lag1_autocorrelation((temp - temp_mean[doy]) / temp_std[doy])
+        wet_rho = _lag1_autocorrelation(wet - wet_probability[doy], centered=True)
+
+        return cls(temp_mean, temp_std, soil_offset_mean, soil_offset_std, wet_probability, wet_amount,
+                   rho, wet_rho, num_years=len(temp) / DAYS_PER_YEAR)
+
+    @classmethod
+    def from_payloads(cls, payloads):
+        start, arrays = payload_arrays(payloads)
+        if start is None or np.sum(~np.isnan(arrays["T2M"])) < MIN_DAYS:
+            return None
+        return cls.from_arrays(start, arrays)
+
+    @classmethod
+    def from_cache(cls, latitude, longitude, cache_dir=None):
+        """Climatologie d'un lieu depuis les réponses NASA POWER en cache (None si l'historique est insuffisant)."""
+        return cls.from_payloads(cached_payloads(latitude, longitude, cache_dir))
+
+    # --- Génération ---
+
+    def sample(self, num_days, start_date, seed=None, count=1):
+        """
+        Tire `count` séries météo synthétiques de `num_days` jours à partir de `start_date`.
+
+        Returns:
+            Un dictionnaire {"T2M", "PRECTOTCORR", "TS"} de tableaux (count, num_days).
+        """
+        rng = np.random.default_rng(seed)
+        doy = _day_of_year(start_date, num_days)
+
+        # Anomalies de température AR(1), vectorisées sur les tirages
+        noise = rng.standard_normal((count, num_days))
+        anomaly = np.empty((count, num_days))
+        anomaly[:, 0] = noise[:, 0]
+        innovation = np.sqrt(1 - self.temp_autocorrelation ** 2)
+        for day in range(1, num_days):
+            anomaly[:, day] = self.temp_autocorrelation * anomaly[:, day - 1] + innovation * noise[:, day]
+        temp = self.temp_mean[doy] + self.temp_std[doy] * anomaly
+
+        # Jours de pluie : chaîne de Markov dont la probabilité stationnaire est celle du jour
+        # (p + r(1 - p) après un jour de pluie, p(1 - r) après un jour sec)
+        p = self.wet_probability[doy]
+        after_wet = p + self.wet_autocorrelation * (1 - p)
+        after_dry = p * (1 - self.wet_autocorrelation)
+        draws = rng.random((count, num_days))
+        wet = np.empty((count, num_days), dtype=bool)
+        wet[:, 0] = draws[:, 0] < self.wet_probability[doy[0]]
+        for day in range(1, num_days):
+            wet[:, day] = draws[:, day] < np.where(wet[:, day - 1], after_wet[day], after_dry[day])
+        precip = wet * rng.exponential(1.0, (count, num_days)) * self.wet_amount[doy]
+
+        soil = temp + self.soil_offset_mean[doy] + self.soil_offset_std[doy] * rng.standard_normal((count, num_days))
+        return {"T2M": temp, "PRECTOTCORR": precip, "TS": soil}
+
+    def sample_payload(self, num_years, start_date, seed=None):
+        """`num_years` années synthétiques au format de get_nasa_power_data()."""
+        series = self.sample(num_years * DAYS_PER_YEAR, start_date, seed)
+        return to_payload({name: values[0] for name, values in series.items()}, start_date)
+
+
+def _lag1_autocorrelation(values, centered=False):
+    """Autocorrélation d'un jour au suivant (NaN ignorés), ramenée dans [0, 0.99]."""
+    pairs = ~np.isnan(values[:-1]) & ~np.isnan(values[1:])
+    if pairs.sum() <= 2:
+        return 0.0
+    previous, current = values[:-1][pairs], values[1:][pairs]
+    if centered: # Écarts déjà centrés sur leur espérance : pas de moyenne à retirer
+        variance = np.sum(previous ** 2)
+        rho = np.sum(previous * current) / variance if variance > 0 else 0.0
+    else:
+        rho = np.corrcoef(previous, current)[0, 1]
+    return float(np.clip(np.nan_to_num(rho), 0.0, 0.99))
+
+
+def to_payload(arrays, start_date):
+    """Séries journalières -> dictionnaire au format de get_nasa_power_data() (NaN -> -999)."""
+    num_days = len(next(iter(arrays.values())))
+    dates = [(start_date + timedelta(days=d)).strftime(DATE_FORMAT) for d in range(num_days)]
+    parameter = {}
+    for name, values in arrays.items():
+        values = np.round(np.asarray(values, dtype=float), 2)
+        values[np.isnan(values)] = MISSING_VALUE
+        parameter[name] = dict(zip(dates, values.tolist()))
+    return {"properties": {"parameter": parameter}, "header": {"source": "météo synthétique"}}
+
+
+def weather_for_game(latitude, longitude, num_years, seed, start_date, base_payload=None, cache_dir=None):
+    """
+    Météo d'une partie de `num_years` années, chaque année étant distincte.
+
+    La première année vient de `base_payload` (données réelles) si elle est fournie ; les années
+    suivantes (ou toutes, sans données réelles) sont tirées de la climatologie en cache.
+
+    Returns:
+        Un dictionnaire au format de get_nasa_power_data(), ou `base_payload` si
+        la climatologie du lieu n'est pas disponible.
+    """
+    climatology = Climatology.from_cache(latitude, longitude, cache_dir)
+    if climatology is None:
+        return base_payload
+
+    start, real = payload_arrays([base_payload]) if base_payload else (None, {})
+    real_years = 1 if real else 0
+    if real_years >= num_years:
+        return base_payload
+
+    start = start if real_years else start_date
+    synthetic_start = start + timedelta(days=real_years * DAYS_PER_YEAR)
+    synthetic = climatology.sample((num_years - real_years) * DAYS_PER_YEAR, synthetic_start, seed)
+    arrays = {}
+    for name, values in synthetic.items():
+        head = real.get(name, np.full(DAYS_PER_YEAR, np.nan))[:DAYS_PER_YEAR] if real_years else np.empty(0)
+        head = np.concatenate([head, np.full(DAYS_PER_YEAR * real_years - len(head), np.nan)])
+        arrays[name] = np.concatenate([head, values[0]])
+    return to_payload(arrays, start)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from core.optimizer import load_regions
+
+    parser = argparse.ArgumentParser(description="Climatologie d'une région depuis le cache NASA POWER.")
+    parser.add_argument("region")
+    args = parser.parse_args()
+
+    region = load_regions()[args.region]
+    clim = Climatology.from_cache(region["lat"], region["lon"])
+    if clim is None:
+        raise SystemExit("Historique en cache insuffisant pour cette région.")
+    print(f"{args.region} : {clim.num_years:.1f} années en cache")
+    print(f"Température moyenne {np.mean(clim.temp_mean):.1f} °C (écart-type {np.mean(clim.temp_std):.1f}), "
+          f"autocorrélation {clim.temp_autocorrelation:.2f}")
+    print(f"Jours de pluie {100 * np.mean(clim.wet_probability):.0f} %, "
+          f"pluie moyenne {np.mean(clim.wet_amount):.1f} mm/jour de pluie")
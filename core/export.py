@@ -0,0 +1,262 @@
+"""
+Export des résultats de partie : CSV, NPZ compressé et Parquet (si pyarrow est installé).
+
+Les séries journalières sont écrites en un seul bloc (np.savetxt) au lieu d'une
+ligne à la fois. Le CSV garde la mise en page historique de l'écran de résultats
+(résumé, puis section "Journal Quotidien") pour rester lisible par les outils
+existants. Pour les lots de milliers de parties, EnsembleExporter écrit au fil
+de l'eau un fichier "long" (une ligne par partie et par jour).
+
+Utilisation en ligne de commande (parties automatisées) :
+    python -m core.export Kenya --policy crop_rules --runs 1000 --out rapports/ensemble.csv
+"""
+import csv
+import os
+import threading
+
+import numpy as np
+
+EXPORT_FORMATS = ("csv", "npz", "parquet")
+
+# Colonnes du journal quotidien : (en-tête CSV, clé de la colonne, facteur d'échelle)
+JOURNAL_COLUMNS = (
+    ("Rendement du jour (kg)", "yield", 1),
+    ("Qualité moyenne du sol (%)", "soil_quality", 100),
+    ("Argent (€)", "money", 1),
+    ("Réserve d'eau (L)", "water_reserve", 1),
+    ("Température (°C)", "temp", 1),
+    ("Précipitations (mm)", "precip", 1),
+)
+LEGACY_COLUMNS = 2 # Rendement et qualité du sol : les seules colonnes disponibles sans historique complet
+
+
+def journal_columns(results):
+    """
+    Retourne (en-têtes, matrice jours x colonnes) du journal quotidien d'un résultat.
+    Utilise l'historique complet s'il est présent, sinon les seules listes de rendement et de sol.
+    """
+    history = results.get("history")
+    if history is not None and len(history):
+        columns = JOURNAL_COLUMNS
+        data = [history.column(key) * scale for _, key, scale in columns]
+    else:
+        columns = JOURNAL_COLUMNS[:LEGACY_COLUMNS]
+        yields = np.asarray(results.get("daily_yields", []), dtype=float)
+        soil = np.full(len(yields), np.nan)
+        soil_values = np.asarray(results.get("daily_soil_quality", []), dtype=float)[:len(yields)] * 100
+        soil[:len(soil_values)] = soil_values
+        data = [yields, soil]
+
+    num_days = len(data[0])
+    matrix = np.column_stack([np.arange(1, num_days + 1)] + data) if num_days else np.empty((0, len(columns) + 1))
+    return ["Jour"] + [header for header, _, _ in columns], matrix
+
+
+def summary_rows(results):
+    """Lignes de résumé en tête du CSV (mêmes libellés que l'export historique)."""
+    return [
+        ['Argent Final (€)', f"{results['final_money']:.2f}"],
+        ['Réserve d\'Eau Finale (L)', f"{results['final_water']:.2f}"],
+        ['Score de Durabilité Final (%)', f"{results['sustainability_score']:.2f}"],
+        ['Nombre de Récoltes', list(results.get('actions_taken', [])).count("harvest")],
+    ]
+
+
+def export_results(results, filepath, fmt=None):
+    """
+    Exporte le résultat d'une partie.
+
+    Args:
+        results: Dictionnaire de FarmLogic.get_results().
+        filepath: Fichier de destination.
+        fmt: "csv", "npz" ou "parquet" (déduit de l'extension si None).
+
+    Returns:
+        Le chemin du fichier écrit.
+    """
+    fmt = fmt or os.path.splitext(filepath)[1].lstrip(".").lower() or "csv"
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    headers, matrix = journal_columns(results)
+    if fmt == "csv":
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerows(summary_rows(results))
+            writer.writerow([])
+            if len(matrix):
+                writer.writerow(['Journal Quotidien'])
+                writer.writerow(headers)
+                np.savetxt(f, matrix, fmt=["%d"] + ["%.2f"] * (len(headers) - 1), delimiter=",")
+    elif fmt == "npz":
+        arrays = {_column_key(header): matrix[:, i] for i, header in enumerate(headers)}
+        history = results.get("history")
+        if history is not None and history.record_plots:
+            for name in ("progress", "water_level", "soil_quality", "disease_severity"):
+                arrays[f"plot_{name}"] = history.plot_channel(name)
+        np.savez_compressed(
+            filepath,
+            final_money=results["final_money"],
+            final_water=results["final_water"],
+            sustainability_score=results["sustainability_score"],
+            food_harvested=results.get("food_harvested", 0),
+            food_target=results.get("food_target", 0),
+            **arrays,
+        )
+    else:
+        pyarrow, parquet = _import_pyarrow()
+        table = pyarrow.table({_column_key(header): matrix[:, i] for i, header in enumerate(headers)})
+        parquet.write_table(table, filepath)
+    return filepath
+
+
+def export_in_background(results, filepath, fmt=None, on_done=None):
+    """
+    Lance export_results() dans un thread pour ne pas bloquer l'affichage.
+    `on_done(chemin, erreur)` est appelé à la fin (erreur vaut None en cas de succès).
+    """
+    def worker():
+        try:
+            path = export_results(results, filepath, fmt)
+            error = None
+        except Exception as e:
+            path, error = filepath, e
+        if on_done:
+            on_done(path, error)
+
+    thread = threading.Thread(target=worker, name="export-resultats", daemon=True)
+    thread.start()
+    return thread
+
+
+def _column_key(header):
+    """Nom de colonne court pour les formats binaires ("Rendement du jour (kg)" -> "yield")."""
+    if header == "Jour":
+        return "day"
+    for title, key, _ in JOURNAL_COLUMNS:
+        if title == header:
+            return key
+    return header
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet as parquet
+    except ImportError as e:
+        raise ValueError("Le format parquet nécessite le paquet 'pyarrow'.") from e
+    return pyarrow, parquet
+
+
+class EnsembleExporter:
+    """
+    Écrit les résultats de nombreuses parties au fil de l'eau, sans tout garder en mémoire.
+
+    Format "long" : une ligne par partie et par jour (colonne "run" en tête).
+    CSV par défaut ; Parquet (un groupe de lignes par lot) si le fichier se termine par .parquet.
+    Les lignes sont regroupées par lots de `chunk_rows` avant écriture.
+    """
+
+    def __init__(self, filepath, chunk_rows=50_000):
+        self.filepath = filepath
+        self.chunk_rows = chunk_rows
+        self.fmt = "parquet" if filepath.endswith(".parquet") else "csv"
+        self.num_runs = 0
+        self._pending = []
+        self._pending_rows = 0
+        self._headers = None
+        self._file = None
+        self._writer = None
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def add(self, results):
+        """Ajoute une partie ; les données sont écrites dès qu'un lot est complet."""
+        headers, matrix = journal_columns(results)
+        if self._headers is None:
+            self._headers = ["run"] + headers
+        if len(headers) + 1 != len(self._headers):
+            raise ValueError("Toutes les parties d'un lot doivent avoir les mêmes colonnes.")
+        run_column = np.full((len(matrix), 1), self.num_runs)
+        self._pending.append(np.hstack([run_column, matrix]))
+        self._pending_rows += len(matrix)
+        self.num_runs += 1
+        if self._pending_rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Écrit le lot en attente."""
+        if not self._pending:
+            return
+        block = np.vstack(self._pending)
+        self._pending, self._pending_rows = [], 0
+
+        if self.fmt == "csv":
+            if self._file is None:
+                self._file = open(self.filepath, "w", newline="", encoding="utf-8")
+                self._file.write(",".join(self._headers) + "\n")
+            np.savetxt(self._file, block, fmt=["%d", "%d"] + ["%.2f"] * (len(self._headers) - 2), delimiter=",")
+        else:
+            pyarrow, parquet = _import_pyarrow()
+            names = ["run"] + [_column_key(header) for header in self._headers[1:]]
+            table = pyarrow.table({name: block[:, i] for i, name in enumerate(names)})
+            if self._writer is None:
+                self._writer = parquet.ParquetWriter(self.filepath, table.schema)
+            self._writer.write_table(table)
+
+    def close(self):
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_policy_runs(policy, config, runs, filepath, chunk_rows=50_000):
+    """Joue `runs` parties avec `policy` (graines 0..runs-1) et les exporte au fil de l'eau."""
+    from core.farm_logic import FarmLogic
+    from core.policies import run_policy
+
+    logic = FarmLogic()
+    with EnsembleExporter(filepath, chunk_rows) as exporter:
+        for seed in range(runs):
+            exporter.add(run_policy(policy, dict(config, seed=seed), logic=logic))
+    return filepath
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from core.optimizer import load_regions
+    from core.policies import BUILTIN_POLICIES
+
+    parser = argparse.ArgumentParser(description="Exporte un lot de parties jouées par une politique automatique.")
+    parser.add_argument("region")
+    parser.add_argument("--policy", default="crop_rules", choices=sorted(BUILTIN_POLICIES))
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--plots", type=int, default=6)
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--out", default=os.path.join("rapports", "ensemble.csv"))
+    args = parser.parse_args()
+
+    policy = BUILTIN_POLICIES[args.policy]
+    if isinstance(policy, type):
+        policy = policy()
+    game_config = {"plots": args.plots, "years": args.years, "location": args.region,
+                   "region_data": load_regions()[args.region]}
+    start = time.perf_counter()
+    export_policy_runs(policy, game_config, args.runs, args.out)
+    print(f"{args.runs} parties exportées vers {args.out} en {time.perf_counter() - start:.1f} s")
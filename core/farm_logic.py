@@ -1,10 +1,17 @@
 import random
 import time
+import uuid
 import json
-import os
-from datetime import date, datetime, timedelta
+from datetime import datetime
 import numpy as np
-from scipy.integrate import solve_ivp # Pour résoudre les équations différentielles
+
+from core.catalog import default_catalog
+from core.seasons import SeasonCalendar
+from core.savegame import (COMPACT_EVERY, append_delta, append_delta_in_background, flush_saves,
+                           needs_full_save, read_journal, rng_state_from_json, rng_state_to_json,
+                           save_in_background, slot_path, write_save)
+from core.timeseries import FarmTimeSeries
+from core.weather_dataset import PARAMETER_ALIASES, WeatherDataset
 
 # Constantes pour un meilleur équilibrage
 WATER_COST_PER_ACTION = 5
@@ -19,23 +26,35 @@ SOIL_REGENERATION_RATE = 0.01 # Taux de régénération du sol par jour de jach
 DAILY_COST_OF_LIVING = 10
 HEATWAVE_TEMP_THRESHOLD = 32
 FROST_TEMP_THRESHOLD = 10
+# Événements aléatoires quotidiens (repris en espérance par core/forecast.py)
+DISEASE_ONSET_CHANCE = 0.15 # Apparition d'une maladie sur une parcelle sur-irriguée
+FROST_DAMAGE_CHANCE = 0.15 # Dégâts de gel sur une culture non résistante
+FROST_DAMAGE = 0.5 # Progression perdue lors de dégâts de gel
+
+def logistic_growth_step(progress, rate, days=1.0):
+    """
+    Résout dP/dt = r * P * (1 - P) sur `days` jours à partir de P = `progress`.
+    Utilise la solution exacte de l'équation logistique, P(t) = P0 e^(rt) / (1 - P0 + P0 e^(rt)),
+    ce qui évite un appel au solveur numérique par parcelle et par jour.
+    Accepte des scalaires ou des tableaux NumPy (toutes les parcelles d'un coup).
+    """
+    progress = np.clip(progress, 0.0, 1.0)
+    growth = progress * np.exp(np.multiply(rate, days))
+    return np.clip(growth / (1.0 - progress + growth), 0.0, 1.0)
 
 class FarmLogic:
     def __init__(self):
-        self.crop_definitions = self._load_crop_definitions()
+        # Cultures vérifiées et indexées (tableaux de paramètres par identifiant), partagées entre parties
+        self.catalog = default_catalog()
+        self.crop_definitions = self.catalog.crop_definitions
+        # Générateur aléatoire propre à la partie (reproductible avec une graine)
+        self.rng = random.Random()
+        self.seed = None
+        # Données NASA analysées en tableaux (voir _setup_weather_dataset)
+        self.weather_dataset = None
+        self._weather_dataset_source = None
         self.reset_simulation()
 
-    def _load_crop_definitions(self):
-        """Charge les définitions des cultures depuis un fichier JSON."""
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        crops_path = os.path.join(project_root, "data", "samples", "crops.json")
-        try:
-            with open(crops_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"ERREUR: Fichier 'crops.json' introuvable ou invalide : {e}")
-            return {}
-
     def setup_from_config(self, config):
         """Configure la logique du jeu à partir des paramètres de configuration."""
         self.reset_simulation()
@@ -44,16 +63,19 @@ class FarmLogic:
         num_years = config.get("years", 1)
 
         region_data = config.get("region_data", {})
+        if "seasons" not in region_data:
+            # Configuration enregistrée sans les effets des saisons (anciennes sauvegardes et sessions) :
+            # table de la région dans le catalogue
+            region_seasons = self.catalog.regions.get(config.get("location"), {}).get("seasons", {})
+            region_data = dict(region_data, seasons=region_seasons)
         self.available_crops = region_data.get("cultures", [])
-        # Charger le cycle de saisons et les durées pour UNE année
-        base_seasons = region_data.get("season_cycle", ["Printemps", "Été", "Automne", "Hiver"])
-        base_season_durations = region_data.get("season_durations", [10] * len(base_seasons))
-        
-        # Étendre pour le nombre d'années sélectionné
-        self.seasons = base_seasons * num_years
-        self.season_durations = base_season_durations * num_years
-        self.max_days = sum(self.season_durations)
-        self.season_end_days = np.cumsum(self.season_durations).tolist()
+        # Saisons de la région répétées sur le nombre d'années sélectionné (effets et jour -> saison précalculés)
+        self.calendar = SeasonCalendar(region_data, num_years)
+        self.seasons = self.calendar.names
+        self.season_durations = self.calendar.durations
+        self.max_days = self.calendar.max_days
+        self.season_end_days = self.calendar.end_days
+        self.days_in_one_game_year = self.calendar.days_per_year
 
         # Charger les seuils météo spécifiques à la région
         weather_thresholds = region_data.get("weather_thresholds", {})
@@ -63,21 +85,33 @@ class FarmLogic:
         # L'objectif de nourriture est aussi proportionnel au nombre d'années
         self.food_target = self.plots_config * 80 * num_years
 
+        # Historique préalloué pour toute la partie (canaux par parcelle optionnels)
+        self.history = FarmTimeSeries(self.max_days, self.plots_config, config.get("record_plot_history", True))
+
+        # Graine de la partie : la même graine rejoue exactement la même météo aléatoire et les mêmes événements
+        self.seed = config.get("seed")
+        if self.seed is None:
+            self.seed = random.randrange(2**32)
+            self.config["seed"] = self.seed
+        self.rng.seed(self.seed)
+
         # Intégration des données météo NASA et de la date de début
         self.weather_data = config.get("nasa_weather_data")
         self.start_date = config.get("start_date")
+        self._setup_weather_dataset()
 
-        
 
         self.initialize_plots()
     def reset_simulation(self):
         """Remet à zéro la simulation pour une nouvelle partie."""
         self.current_day = 1
-        self.seasons = []  # Sera défini par la configuration
+        self.calendar = SeasonCalendar() # Sera défini par la configuration
+        self.seasons = []
         self.season_durations = []
         self.current_season_index = 0
         self.max_days = 0
         self.season_end_days = []
+        self.days_in_one_game_year = 1
         
         # Ressources globales
         self.water_reserve = 400 # Réserve d'eau pour l'irrigation
@@ -85,22 +119,25 @@ class FarmLogic:
         self.money = 5000
         self.sustainability_score = 100
 
-        # Suivi
-        self.daily_yields = []
-        self.daily_soil_quality = []
+        # Suivi : historique journalier en colonnes (voir daily_yields / daily_soil_quality)
+        self.history = FarmTimeSeries()
         self.actions_taken = []
         self.harvested_today = 0
         self.plots = []
         self._weather_cache = {}
+        # Fichier de sauvegarde -> {save_id, jours et actions déjà sauvegardés, écritures incrémentales}
+        self._save_marks = {}
+        # Enregistrement de la session (core/replay.py) : sa position est écrite dans les sauvegardes
+        self.session_recorder = None
+        self.resumed_from = None # Après load_game : {save_id, jour, position de la session}
 
         # Nouvelles propriétés pour la météo
         self.weather_data = None
         self.start_date = None
+        self._weather_offset = None
         self.config = {}
         self.food_harvested = 0
         self.food_target = 0
-        if not hasattr(self, 'crop_definitions'):
-            self.crop_definitions = {}
 
     def initialize_plots(self):
         """Initialise les parcelles du potager."""
@@ -129,73 +166,108 @@ class FarmLogic:
             return self._weather_cache['weather']
 
         # Facteur saisonnier pour la température (simpliste)
-        season = self.get_current_season()
-        temp_offset_map = {"Printemps": 0, "Été": 8, "Automne": -2, "Hiver": -10,
-                           "Petite saison des pluies": 0, "Grande saison sèche": 5, "Grande saison des pluies": -2, "Petite saison sèche": 3}
-        precip_factor_map = {"Printemps": 1.0, "Été": 0.5, "Automne": 1.2, "Hiver": 0.8,
-                             "Petite saison des pluies": 1.5, "Grande saison sèche": 0.1, "Grande saison des pluies": 3.0, "Petite saison sèche": 0.2}
-        
-        temp_offset = temp_offset_map.get(season, 0)
-        precip_factor = precip_factor_map.get(season, 1.0)
+        temp_offset, precip_factor, _ = self.calendar.modifiers(self.current_season_index)
 
-        if not self.weather_data or not self.start_date:
+        api_weather = self._api_weather_for_day(self.current_day, temp_offset, precip_factor)
+        if api_weather is None:
             # Météo aléatoire si pas de données API
-            rand_temp = random.uniform(12, 20) + temp_offset
-            precip = (random.uniform(0, 7) if random.random() < 0.4 else 0) * precip_factor
+            rand_temp = self.rng.uniform(12, 20) + temp_offset
+            precip = (self.rng.uniform(0, 7) if self.rng.random() < 0.4 else 0) * precip_factor
             temp = rand_temp
             soil_temp = temp # Assigner une valeur par défaut pour la température du sol
         else:
-            try:
-                # --- LOGIQUE D'ÉCHELONNAGE MULTI-ANNÉES ---
-                # 1. Déterminer la durée en jours d'une seule année de jeu
-                region_data = self.config.get("region_data", {})
-                base_season_durations = region_data.get("season_durations", [10, 10, 10, 10])
-                days_in_one_game_year = sum(base_season_durations)
-                if days_in_one_game_year == 0: days_in_one_game_year = 1
-
-                # 2. Mapper le jour de jeu (ex: 1-80) à un jour dans une année de jeu (ex: 0-39)
-                day_in_game_year = (self.current_day - 1) % days_in_one_game_year
-
-                # 3. "Compresser" l'année de jeu (0-39) en une année météo réelle (0-364)
-                scaling_factor = 365 / days_in_one_game_year
-                day_in_real_year = int(day_in_game_year * scaling_factor)
-                current_sim_date = self.start_date + timedelta(days=day_in_real_year)
-                date_str = current_sim_date.strftime("%Y%m%d")
-                
-                params = self.weather_data['properties']['parameter']
-                temp_from_api = params['T2M'].get(date_str, -999)
-                precip_from_api = params['PRECTOTCORR'].get(date_str, -999)
-                soil_temp_from_api = params['TS'].get(date_str, -999)
+            temp, precip, soil_temp = api_weather
 
-                # Gérer les données manquantes (-999) et appliquer les facteurs saisonniers
-                temp = (temp_from_api if temp_from_api != -999 else 18) + temp_offset
-                precip = (precip_from_api if precip_from_api > 0 else 0) * precip_factor
-                soil_temp = soil_temp_from_api if soil_temp_from_api != -999 else temp
+        result = {"temp": temp, "precip": precip, "soil_temp": soil_temp, "condition": self._weather_condition(temp, precip)}
+        result.update(self._extra_weather_drivers(self.current_day))
 
-            except (KeyError, IndexError, TypeError):
-                # En cas d'erreur avec les données API, on passe en mode aléatoire
-                return self.get_current_day_weather()
+        # Mettre le résultat en cache pour la journée actuelle
+        self._weather_cache = {'day': self.current_day, 'weather': result}
 
-        # Déterminer la condition en utilisant les seuils (spécifiques ou par défaut)
+        return result
+
+    def get_expected_weather(self, day):
+        """
+        Météo attendue pour un jour quelconque de la partie, sans consommer le générateur aléatoire.
+        Identique à la météo réelle avec les données NASA ; en mode aléatoire, retourne l'espérance.
+        """
+        if day == self.current_day:
+            return self.get_current_day_weather()
+
+        temp_offset, precip_factor, _ = self.calendar.modifiers(self.calendar.season_index(day))
+        api_weather = self._api_weather_for_day(day, temp_offset, precip_factor)
+        if api_weather is None:
+            # Espérance de la météo aléatoire de get_current_day_weather()
+            temp = 16 + temp_offset
+            precip = 0.4 * 3.5 * precip_factor
+            soil_temp = temp
+        else:
+            temp, precip, soil_temp = api_weather
+        return {"temp": temp, "precip": precip, "soil_temp": soil_temp, "condition": self._weather_condition(temp, precip)}
+
+    def _setup_weather_dataset(self):
+        """Analyse une seule fois les données NASA en tableaux (réutilisés si la même réponse est rejouée)."""
+        if self.weather_data is not self._weather_dataset_source:
+            self._weather_dataset_source = self.weather_data
+            self.weather_dataset = WeatherDataset.from_payload(self.weather_data) if self.weather_data else None
+        # Position de la date de début de la partie dans les tableaux
+        # et nombre d'années de données complètes à partir de cette date
+        self._weather_offset = None
+        self._weather_years = 1
+        if self.weather_dataset is not None and self.start_date:
+            self._weather_offset = (self.start_date - self.weather_dataset.start_date).days
+            self._weather_years = max(1, (self.weather_dataset.num_days - self._weather_offset) // 365)
+
+    def _weather_index(self, day):
+        """Position dans les données NASA du jour de jeu `day` (échelonnage multi-années)."""
+        # 1. Mapper le jour de jeu (ex: 1-80) à un jour dans une année de jeu (ex: 0-39)
+        day_in_game_year = (day - 1) % self.days_in_one_game_year
+
+        # 2. "Compresser" l'année de jeu (0-39) en une année météo réelle (0-364)
+        scaling_factor = 365 / self.days_in_one_game_year
+        day_in_real_year = int(day_in_game_year * scaling_factor)
+
+        # 3. Chaque année de jeu utilise sa propre année de données si elles couvrent plusieurs années
+        year_index = ((day - 1) // self.days_in_one_game_year) % self._weather_years
+        return self._weather_offset + year_index * 365 + day_in_real_year
+
+    def _api_weather_for_day(self, day, temp_offset, precip_factor):
+        """Retourne (temp, précipitations, temp du sol) depuis les données NASA, ou None si indisponible."""
+        dataset = self.weather_dataset
+        if dataset is None or self._weather_offset is None or "T2M" not in dataset:
+            return None
+        index = self._weather_index(day)
+
+        # Gérer les données manquantes (masquées) et appliquer les facteurs saisonniers
+        temp = dataset.value("T2M", index, 18) + temp_offset
+        precip = max(dataset.value("PRECTOTCORR", index, 0), 0) * precip_factor
+        soil_temp = dataset.value("TS", index, temp)
+        return temp, precip, soil_temp
+
+    def _extra_weather_drivers(self, day):
+        """Paramètres NASA supplémentaires demandés (rayonnement, humidité...) pour un jour de jeu."""
+        dataset = self.weather_dataset
+        if dataset is None or self._weather_offset is None:
+            return {}
+        index = self._weather_index(day)
+        return {
+            PARAMETER_ALIASES.get(name, name): dataset.value(name, index)
+            for name in dataset.parameters if name not in ("T2M", "PRECTOTCORR", "TS")
+        }
+
+    def _weather_condition(self, temp, precip):
+        """Détermine la condition en utilisant les seuils (spécifiques ou par défaut)."""
         if temp >= self.heatwave_threshold:
-            condition = "heatwave"
+            return "heatwave"
         elif temp <= self.frost_threshold and precip > 0.5: # S'il gèle et qu'il y a des précipitations, c'est de la neige
-            condition = "snow"
+            return "snow"
         elif temp <= self.frost_threshold: # S'il gèle sans précipitation, c'est du gel sec
-            condition = "frost"
+            return "frost"
         elif precip > 10: # Seuil plus élevé pour "pluie forte"
-            condition = "Pluie forte"
+            return "Pluie forte"
         elif precip > 2:
-            condition = "Pluie légère"
-        else:
-            condition = "Ensoleillé"
-        
-        result = {"temp": temp, "precip": precip, "soil_temp": soil_temp, "condition": condition}
-
-        # Mettre le résultat en cache pour la journée actuelle
-        self._weather_cache = {'day': self.current_day, 'weather': result}
-
-        return result
+            return "Pluie légère"
+        return "Ensoleillé"
 
     def update_simulation(self):
         """Avance la simulation d'un jour et met à jour l'état du jeu."""
@@ -215,132 +287,128 @@ class FarmLogic:
             self.water_reserve += precip * 0.5
             self.water_reserve = min(self.water_reserve, MAX_WATER_RESERVE)
 
-        # Mise à jour de chaque parcelle
-        for plot in self.plots:
-            # 1. Mise à jour de l'eau dans la parcelle
-            evaporation = max(0, (temp - 15) / 5) # Évaporation si > 15°C
-            # La chaleur extrême augmente l'évaporation
-            if condition == "heatwave":
-                evaporation *= 2.0
-            
-            # La pluie forte peut "laver" les nutriments et le fertilisant du sol (lessivage)
-            if condition == "Pluie forte":
-                plot['fertilizer_bonus'] = max(0, plot['fertilizer_bonus'] - 0.01)
-                plot['soil_quality'] = max(0.2, plot['soil_quality'] - 0.005)
-            plot['water_level'] += precip - evaporation
-            plot['water_level'] = np.clip(plot['water_level'], 0, 100)
-
-            if plot["crop"]:
+        # Facteur de croissance de la saison, identique pour toutes les parcelles
+        season_factor = self.calendar.modifiers(self.current_season_index)[2]
+
+        # État des parcelles et paramètres de leurs cultures, rassemblés en tableaux (une case par parcelle) :
+        # la mise à jour de la journée se fait pour toutes les parcelles d'un coup
+        plots = self.plots
+        params = self.catalog.params(self.catalog.ids_of([plot["crop"] for plot in plots]))
+        state = np.array([(bool(plot["crop"]), bool(plot.get('disease')), plot.get('disease') is None,
+                           plot['water_level'], plot['soil_quality'], plot['fertilizer_bonus'],
+                           plot['disease_severity'], plot['progress']) for plot in plots], dtype=float).reshape(-1, 8).T
+        has_crop, diseased, no_disease = state[:3] > 0
+        water, soil, fertilizer, severity, progress = state[3:]
+        maturation_days = params["maturation_days"]
+        max_water = params["max_water_level"]
+
+        # 1. Mise à jour de l'eau dans les parcelles
+        evaporation = max(0, (temp - 15) / 5) # Évaporation si > 15°C
+        # La chaleur extrême augmente l'évaporation
+        if condition == "heatwave":
+            evaporation *= 2.0
+
+        # La pluie forte peut "laver" les nutriments et le fertilisant du sol (lessivage)
+        if condition == "Pluie forte":
+            fertilizer = np.maximum(fertilizer - 0.01, 0)
+            soil = np.maximum(soil - 0.005, 0.2)
+        water = np.clip(water + (precip - evaporation), 0, 100)
+
+        # --- MODÈLE DE CROISSANCE LOGISTIQUE AVEC ÉQUATION DIFFÉRENTIELLE ---
+        # La croissance est modélisée par dP/dt = r * P * (1 - P), où P est la progression
+        # et 'r' est le taux de croissance qui dépend des conditions environnementales.
+        growing = has_crop & (maturation_days > 0) & (progress < 1.0)
+
+        # Tirages aléatoires, parcelle par parcelle dans l'ordre (mêmes tirages qu'une mise à jour
+        # parcelle par parcelle : une partie avec graine se rejoue à l'identique)
+        onset_draw = has_crop & no_disease & (water > max_water) # Maladie si la plante est sur-irriguée
+        frost_draw = growing & (params["frost_resistant"] == 0) & (condition == "frost") # Gel des plantes non résistantes
+        onset = np.zeros(len(plots), dtype=bool)
+        frost_damage = np.zeros(len(plots), dtype=bool)
+        for i in np.flatnonzero(onset_draw | frost_draw).tolist():
+            if onset_draw[i]:
+                onset[i] = self.rng.random() < DISEASE_ONSET_CHANCE
+            if frost_draw[i]:
+                frost_damage[i] = self.rng.random() < FROST_DAMAGE_CHANCE
+
+        # --- GESTION DES MALADIES ---
+        # 1. Apparition : le sur-arrosage dégrade aussi la qualité du sol
+        severity = np.where(onset, 0.1, severity)
+        soil = np.where(onset, np.maximum(soil - 0.02, 0.2), soil)
+        diseased |= onset
+        # 2. Progression de la maladie si non traitée
+        severity = np.where(has_crop & diseased, np.minimum(severity + 0.05, 1.0), severity)
+
+        # Taux de base calibré pour atteindre la maturité en `maturation_days`, augmenté par le fertilisant
+        r_potential = 10.0 / maturation_days + fertilizer * 5 / maturation_days
+
+        # Facteurs environnementaux qui modulent le taux de croissance
+        water_factor = 1 - np.abs(water - params["water_need"]) / 100
+        # Pénalité si la température est hors de la plage optimale
+        temp_factor = np.where((params["temp_min"] <= soil_temp) & (soil_temp <= params["temp_max"]), 1.0, 0.5)
+        growth_multiplier = water_factor * season_factor * temp_factor * soil
+
+        # La croissance ralentit fortement (-60%) si la plante est "noyée"
+        growth_multiplier = np.where(water > max_water, growth_multiplier * 0.4, growth_multiplier)
+        # Une maladie à 100% de sévérité peut réduire la croissance de 80%
+        growth_multiplier = np.where(diseased, growth_multiplier * (1 - severity * 0.8), growth_multiplier)
+
+        # Météo extrême
+        if condition == "heatwave":
+            growth_multiplier = growth_multiplier * 0.5
+        elif condition == "frost":
+            growth_multiplier = growth_multiplier * 0.1
+            # Le gel peut endommager ou tuer les plantes non résistantes
+            progress = np.where(frost_damage, np.maximum(progress - FROST_DAMAGE, 0), progress)
+        elif condition == "snow":
+            # La neige ralentit la croissance mais protège du gel extrême
+            growth_multiplier = growth_multiplier * 0.2
+
+        # Pénalité de sécheresse sévère : croissance très faible et la plante régresse
+        drought = growing & (water < 10)
+        growth_multiplier = np.where(drought, growth_multiplier * 0.2, growth_multiplier)
+        progress = np.where(drought, np.maximum(progress - 0.02, 0), progress)
+
+        # 2. Résoudre l'équation différentielle sur un jour avec le taux réalisé
+        progress = np.where(growing, logistic_growth_step(progress, r_potential * growth_multiplier), progress)
+
+        # Jachère : le sol des parcelles vides se régénère lentement
+        soil = np.where(has_crop, soil, np.minimum(soil + SOIL_REGENERATION_RATE, 1.0))
+        # Diminution du bonus de fertilisant avec le temps
+        fertilizer = np.maximum(fertilizer - 0.02, 0)
+
+        for plot, crop_planted, started, water_level, soil_quality, bonus, disease_severity, plot_progress in zip(
+                plots, has_crop.tolist(), onset.tolist(), water.tolist(), soil.tolist(), fertilizer.tolist(),
+                severity.tolist(), progress.tolist()):
+            if crop_planted:
                 plot["age"] += 1
-                crop_def = self.crop_definitions.get(plot["crop"], {})
-
-                # --- NOUVELLE LOGIQUE : GESTION DES MALADIES ---
-                # 1. Risque d'apparition de maladie si la plante est sur-irriguée
-                max_water_for_disease = crop_def.get("max_water_level", 95) # Seuil de tolérance à l'excès d'eau
-                if plot.get('disease') is None and plot['water_level'] > max_water_for_disease and random.random() < 0.15: # 15% de chance par jour
-                    plot['disease'] = "Mildiou"
-                    plot['disease_severity'] = 0.1
-                    # Le sur-arrosage dégrade aussi la qualité du sol
-                    plot['soil_quality'] = max(0.2, plot['soil_quality'] - 0.02)
-                    self.actions_taken.append("event:disease_start")
-
-                # 2. Progression de la maladie si non traitée
-                if plot.get('disease'):
-                    plot['disease_severity'] = min(1.0, plot['disease_severity'] + 0.05)
-
-                # --- MODÈLE DE CROISSANCE LOGISTIQUE AVEC ÉQUATION DIFFÉRENTIELLE ---
-                # La croissance est modélisée par dP/dt = r * P * (1 - P), où P est la progression
-                # et 'r' est le taux de croissance qui dépend des conditions environnementales.
-
-                maturation_days = crop_def.get("maturation_days", 30)
-                if maturation_days > 0 and plot["progress"] < 1.0:
-                    # 1. Calculer le taux de croissance 'r' pour la journée
-                    # Taux de base calibré pour atteindre la maturité en `maturation_days`
-                    r_base = 10.0 / maturation_days
-                    
-                    # Effet du fertilisant : augmente le potentiel de croissance
-                    fertilizer_effect = plot["fertilizer_bonus"] * 5 / maturation_days
-                    r_potential = r_base + fertilizer_effect
-
-                    # Facteurs environnementaux qui modulent le taux de croissance
-                    water_factor = 1 - abs(plot['water_level'] - crop_def.get("water_need", 60)) / 100
-                    season_factor_map = {"Printemps": 1.1, "Été": 1.0, "Automne": 0.9, "Hiver": 0.2,
-                                         "Petite saison des pluies": 1.1, "Grande saison sèche": 0.8, "Grande saison des pluies": 1.0, "Petite saison sèche": 0.9}
-                    season_factor = season_factor_map.get(self.get_current_season(), 1.0)
-                    
-                    temp_factor = 1.0
-                    if not (crop_def.get("temp_min", 0) <= soil_temp <= crop_def.get("temp_max", 100)):
-                        temp_factor = 0.5  # Pénalité si la température est hors de la plage optimale
-
-                    # Multiplicateur de croissance global
-                    growth_multiplier = water_factor * season_factor * temp_factor * plot["soil_quality"]
-
-                    # Pénalité de croissance si la plante est sur-irriguée (noyée)
-                    max_water_for_growth = crop_def.get("max_water_level", 95)
-                    if plot['water_level'] > max_water_for_growth:
-                        # La croissance ralentit fortement si la plante est "noyée"
-                        overwater_penalty = 0.4 # Réduit la croissance de 60%
-                        growth_multiplier *= overwater_penalty
-
-                    # Application des pénalités (maladie, météo extrême, sécheresse)
-                    if plot.get('disease'):
-                        # Une maladie à 100% de sévérité peut réduire la croissance de 80%
-                        growth_multiplier *= (1 - plot['disease_severity'] * 0.8)
-
-                    if condition == "heatwave": 
-                        growth_multiplier *= 0.5
-                    elif condition == "frost": 
-                        growth_multiplier *= 0.1
-                        # Le gel peut endommager ou tuer les plantes non résistantes
-                        if not crop_def.get("frost_resistant", False) and random.random() < 0.15: # 15% de chance
-                            plot['progress'] = max(0, plot['progress'] - 0.5) # La plante subit de gros dégâts
-                    
-                    elif condition == "snow":
-                        # La neige ralentit la croissance mais protège du gel extrême
-                        growth_multiplier *= 0.2
-
-                    # Pénalité de sécheresse sévère
-                    if plot['water_level'] < 10:
-                        growth_multiplier *= 0.2 # Croissance très faible
-                        plot['progress'] = max(0, plot['progress'] - 0.02) # La plante régresse
-
-                    # Taux de croissance réalisé pour la journée
-                    r_realized = r_potential * growth_multiplier
-
-                    # 2. Définir et résoudre l'équation différentielle pour un jour
-                    def logistic_growth(t, P):
-                        return r_realized * np.clip(P, 0, 1) * (1 - np.clip(P, 0, 1))
-
-                    solution = solve_ivp(logistic_growth, [0, 1], [plot["progress"]], method='RK45')
-                    
-                    # 3. Mettre à jour la progression
-                    plot["progress"] = np.clip(solution.y[0][-1], 0, 1.0)
-            
-            else:
-                # --- NOUVEAU: Logique de jachère (fallow) ---
-                # Si la parcelle est vide, le sol se régénère lentement.
-                plot['soil_quality'] += SOIL_REGENERATION_RATE
-                plot['soil_quality'] = min(1.0, plot['soil_quality'])
-
-            # Diminution du bonus de fertilisant avec le temps
-            plot["fertilizer_bonus"] = max(0, plot["fertilizer_bonus"] - 0.02)
+            if started:
+                plot['disease'] = "Mildiou"
+                self.actions_taken.append("event:disease_start")
+            plot['water_level'] = water_level
+            plot['soil_quality'] = soil_quality
+            plot['fertilizer_bonus'] = bonus
+            plot['disease_severity'] = disease_severity
+            plot['progress'] = plot_progress
 
         
 
-        # Enregistrer la qualité moyenne du sol pour le graphique
         avg_soil_quality = np.mean([p['soil_quality'] for p in self.plots]) if self.plots else 1.0
-        self.daily_soil_quality.append(avg_soil_quality)
 
         # Mettre à jour le score de durabilité pour qu'il reflète la qualité moyenne du sol
         self._update_sustainability_score()
 
-        # Enregistrer le rendement du jour et réinitialiser pour le jour suivant
-        self.daily_yields.append(self.harvested_today)
-        self.harvested_today = 0
-
         # Déduire le coût de la vie quotidien
         self.money -= DAILY_COST_OF_LIVING
 
+        # Enregistrer la journée (rendement, sol moyen, ressources, météo, parcelles) puis réinitialiser le rendement
+        self.history.record(
+            (self.harvested_today, avg_soil_quality, self.money, self.water_reserve, self.sustainability_score, self.food_harvested),
+            weather_today,
+            self.plots,
+        )
+        self.harvested_today = 0
+
         # Avancer au jour suivant
         self.current_day += 1
 
@@ -348,11 +416,31 @@ class FarmLogic:
         if self.current_season_index < len(self.seasons) - 1 and self.current_day > self.season_end_days[self.current_season_index]:
             self.current_season_index += 1
             
+    @property
+    def daily_yields(self):
+        """Rendement de chaque jour écoulé (vue sur l'historique, sans copie)."""
+        return self.history.column("yield")
+
+    @daily_yields.setter
+    def daily_yields(self, values):
+        self.history.load_column("yield", values)
+
+    @property
+    def daily_soil_quality(self):
+        """Qualité moyenne du sol de chaque jour écoulé (vue sur l'historique, sans copie)."""
+        return self.history.column("soil_quality")
+
+    @daily_soil_quality.setter
+    def daily_soil_quality(self, values):
+        self.history.load_column("soil_quality", values)
+
     def get_current_season(self):
         """Retourne le nom de la saison actuelle."""
-        if self.seasons:
-            return self.seasons[self.current_season_index]
-        return "Saison Indéfinie"
+        return self.calendar.name(self.current_season_index)
+
+    def get_season_for_day(self, day):
+        """Retourne le nom de la saison d'un jour quelconque de la partie."""
+        return self.calendar.name(self.calendar.season_index(day))
 
     def _update_sustainability_score(self):
         """Met à jour le score de durabilité pour qu'il corresponde à la qualité moyenne du sol."""
@@ -421,9 +509,9 @@ class FarmLogic:
         if 0 <= plot_index < len(self.plots):
             plot = self.plots[plot_index]
             if plot["crop"] and plot["progress"] >= 0.9: # Récolte possible si très mature
-                crop_def = self.crop_definitions.get(plot["crop"], {})
+                max_k = float(self.catalog.max_k[self.catalog.crop_id(plot["crop"])])
                 # Le rendement final dépend de la qualité du sol (K) et de la maturité finale
-                final_yield = crop_def.get("max_k", 100) * plot["soil_quality"] * plot["progress"]
+                final_yield = max_k * plot["soil_quality"] * plot["progress"]
                 self.money += final_yield
                 self.harvested_today += final_yield # Ajouter au rendement du jour
                 
@@ -437,12 +525,31 @@ class FarmLogic:
                 return final_yield
         return 0
     
-    # --- Sauvegarde et Chargement ---
+    def get_results(self):
+        """Retourne les résultats de la partie (écran de résultats, runs automatisés)."""
+        return {
+            "daily_yields": self.daily_yields,
+            "daily_soil_quality": self.daily_soil_quality,
+            "sustainability_score": self.sustainability_score,
+            "food_harvested": self.food_harvested,
+            "food_target": self.food_target,
+            "final_money": self.money,
+            "final_water": self.water_reserve,
+            "actions_taken": self.actions_taken,
+            "plots_data": self.plots,
+            "history": self.history,
+            "config": self.config
+        }
 
-    def save_game(self, filepath="data/savegame.json"):
-        """Sauvegarde l'état actuel du jeu dans un fichier JSON."""
-        state = {
-            'config': self.config,
+    # --- Instantanés en mémoire (simulations "et si") ---
+
+    def snapshot(self):
+        """
+        Capture l'état dynamique de la partie en mémoire, sans passer par le disque.
+        La configuration, les données météo NASA et les définitions de cultures ne
+        sont pas copiées : elles ne changent pas en cours de partie.
+        """
+        return {
             'current_day': self.current_day,
             'current_season_index': self.current_season_index,
             'water_reserve': self.water_reserve,
@@ -450,25 +557,134 @@ class FarmLogic:
             'sustainability_score': self.sustainability_score,
             'food_harvested': self.food_harvested,
             'food_target': self.food_target,
-            'daily_yields': self.daily_yields,
-            'daily_soil_quality': self.daily_soil_quality,
-            'actions_taken': self.actions_taken,
-            'plots': self.plots,
+            'harvested_today': self.harvested_today,
+            'history': self.history.copy(),
+            'actions_taken': list(self.actions_taken),
+            'plots': [plot.copy() for plot in self.plots], # Les parcelles ne contiennent que des valeurs simples
+            'weather_cache': self._weather_cache,
+            'rng_state': self.rng.getstate(),
+            'session': self.session_recorder.position() if self.session_recorder else None,
+        }
+
+    def restore(self, snapshot):
+        """Revient à un état capturé par snapshot(). Un même instantané peut être restauré plusieurs fois."""
+        self.current_day = snapshot['current_day']
+        self.current_season_index = snapshot['current_season_index']
+        self.water_reserve = snapshot['water_reserve']
+        self.money = snapshot['money']
+        self.sustainability_score = snapshot['sustainability_score']
+        self.food_harvested = snapshot['food_harvested']
+        self.harvested_today = snapshot['harvested_today']
+        self.history = snapshot['history'].copy()
+        self.actions_taken = list(snapshot['actions_taken'])
+        self._weather_cache = snapshot['weather_cache']
+        self.rng.setstate(snapshot['rng_state'])
+        self._save_marks = {} # L'historique a pu reculer : la prochaine sauvegarde sera complète
+
+        # Mise à jour en place : l'interface garde des références vers les dictionnaires des parcelles
+        if len(self.plots) == len(snapshot['plots']):
+            for plot, saved_plot in zip(self.plots, snapshot['plots']):
+                plot.update(saved_plot)
+        else:
+            self.plots = [plot.copy() for plot in snapshot['plots']]
+
+    def fork(self):
+        """
+        Crée une copie indépendante de la partie en cours.
+        La copie partage (en lecture seule) la configuration, la météo et les définitions
+        de cultures, et reprend l'état du générateur aléatoire : sans action différente,
+        elle évolue exactement comme l'original.
+        """
+        clone = FarmLogic.__new__(FarmLogic)
+        clone.__dict__.update(self.__dict__)
+        clone.rng = random.Random()
+        clone.plots = []
+        clone.restore(self.snapshot())
+        return clone
+
+    def simulate_days(self, num_days):
+        """Avance la simulation de `num_days` jours (sans dépasser la fin de partie)."""
+        for _ in range(num_days):
+            if self.current_day > self.max_days:
+                break
+            self.update_simulation()
+
+    # --- Sauvegarde et Chargement ---
+
+    def save_summary(self):
+        """Résumé de la partie pour l'index des sauvegardes (affiché par le menu)."""
+        return {
+            "region": self.config.get("location"),
+            "day": self.current_day,
+            "max_days": self.max_days,
+            "money": self.money,
+            "sustainability": self.sustainability_score,
+        }
+
+    def delta_snapshot(self, since_days, since_actions):
+        """
+        Ce qui a changé depuis une sauvegarde (sauvegarde incrémentale) : valeurs courantes,
+        jours d'historique et actions ajoutés depuis, état des parcelles.
+        """
+        return {
+            'current_day': self.current_day,
+            'current_season_index': self.current_season_index,
+            'water_reserve': self.water_reserve,
+            'money': self.money,
+            'sustainability_score': self.sustainability_score,
+            'food_harvested': self.food_harvested,
+            'history_start': since_days,
+            'history': self.history.to_dict(since_days),
+            'actions_start': since_actions,
+            'actions': self.actions_taken[since_actions:],
+            'plots': [plot.copy() for plot in self.plots],
+            'rng_state': rng_state_to_json(self.rng.getstate()),
+            'weather_cache': self._weather_cache,
+            'session': self.session_recorder.position() if self.session_recorder else None,
         }
 
-        def json_serializer(obj):
-            """Gère la sérialisation des objets non-standard comme datetime."""
-            if isinstance(obj, (datetime, date)):
-                return obj.isoformat()
-            raise TypeError(f"Le type {type(obj)} n'est pas sérialisable en JSON")
+    def save_game(self, filepath=None, background=False, incremental=False):
+        """
+        Sauvegarde l'état actuel du jeu dans un fichier JSON (écriture atomique), par défaut
+        dans l'emplacement 1. L'état est capturé immédiatement ; avec background=True, la
+        conversion en JSON et l'écriture se font dans un thread (voir core/savegame.py).
+
+        Avec incremental=True, seul ce qui a changé depuis la dernière sauvegarde de ce fichier
+        est ajouté à son journal ; la sauvegarde est réécrite en entière s'il n'y en a pas
+        encore eu dans cette partie, toutes les COMPACT_EVERY écritures, ou si une écriture
+        précédente de ce fichier a échoué.
 
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(state, f, indent=4, default=json_serializer)
-        print(f"Partie sauvegardée dans {filepath}")
+        Le repère de sauvegarde n'avance qu'après une écriture directe réussie ; en arrière-plan,
+        il avance tout de suite et un échec fait réécrire la sauvegarde en entier la fois suivante.
+        """
+        filepath = filepath or slot_path(1)
+        mark = self._save_marks.get(filepath)
+        if incremental and mark and mark['deltas'] < COMPACT_EVERY and not needs_full_save(filepath):
+            delta = self.delta_snapshot(mark['days'], mark['actions'])
+            delta['save_id'] = mark['save_id']
+            new_mark = dict(mark, days=len(self.history), actions=len(self.actions_taken), deltas=mark['deltas'] + 1)
+            if background:
+                self._save_marks[filepath] = new_mark
+                append_delta_in_background(delta, filepath, self.save_summary())
+            else:
+                append_delta(delta, filepath, self.save_summary())
+                self._save_marks[filepath] = new_mark
+            return
 
-    def load_game(self, filepath="data/savegame.json"):
-        """Charge l'état du jeu depuis un fichier JSON."""
+        save_id = uuid.uuid4().hex
+        new_mark = {'save_id': save_id, 'days': len(self.history), 'actions': len(self.actions_taken), 'deltas': 0}
+        snapshot = self.snapshot()
+        if background:
+            self._save_marks[filepath] = new_mark
+            save_in_background(snapshot, self.config, filepath, self.save_summary(), save_id)
+        else:
+            write_save(snapshot, self.config, filepath, self.save_summary(), save_id)
+            self._save_marks[filepath] = new_mark
+
+    def load_game(self, filepath=None):
+        """Charge l'état du jeu depuis un fichier JSON (par défaut l'emplacement 1)."""
+        flush_saves() # Une sauvegarde en cours d'écriture doit être terminée avant d'être relue
+        filepath = filepath or slot_path(1)
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 state = json.load(f)
@@ -486,10 +702,30 @@ class FarmLogic:
             self.sustainability_score = state['sustainability_score']
             self.food_harvested = state['food_harvested']
             self.food_target = state.get('food_target', self.plots_config * 80)
-            self.daily_yields = state['daily_yields']
-            self.daily_soil_quality = state['daily_soil_quality']
+            if 'history' in state:
+                self.history.load_dict(state['history'])
+            else:
+                # Anciennes sauvegardes : seuls le rendement et la qualité du sol étaient conservés
+                self.daily_yields = state['daily_yields']
+                self.daily_soil_quality = state['daily_soil_quality']
             self.actions_taken = state['actions_taken']
             self.plots = state['plots']
+            # Reprise du tirage aléatoire là où la partie en était (les anciennes sauvegardes
+            # gardent le générateur réinitialisé avec la graine par setup_from_config)
+            if state.get('rng_state'):
+                self.rng.setstate(rng_state_from_json(state['rng_state']))
+            self._weather_cache = state.get('weather_cache') or {}
+
+            # Sauvegardes incrémentales écrites depuis la dernière sauvegarde complète
+            deltas = read_journal(filepath, state['save_id']) if state.get('save_id') else []
+            for delta in deltas:
+                self._apply_delta(delta)
+            if state.get('save_id'):
+                self._save_marks[filepath] = {'save_id': state['save_id'], 'days': len(self.history),
+                                              'actions': len(self.actions_taken), 'deltas': len(deltas)}
+            # Session enregistrée au moment de la sauvegarde (reprise par GameInterface.load_save)
+            session = deltas[-1].get('session') if deltas else state.get('session')
+            self.resumed_from = {'save_id': state.get('save_id'), 'day': self.current_day, 'session': session}
 
             # Migration pour les anciennes sauvegardes
             for plot in self.plots:
@@ -499,10 +735,22 @@ class FarmLogic:
             self.last_day_change = time.time()
             print(f"Partie chargée depuis {filepath}")
             return True
-        except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
             print(f"Erreur lors du chargement de la sauvegarde : {e}")
             return False
 
+    def _apply_delta(self, delta):
+        """Applique une sauvegarde incrémentale produite par delta_snapshot()."""
+        for key in ('current_day', 'current_season_index', 'water_reserve', 'money',
+                    'sustainability_score', 'food_harvested'):
+            setattr(self, key, delta[key])
+        self.history.load_dict(delta['history'], start=delta['history_start'])
+        self.actions_taken[delta['actions_start']:] = delta['actions']
+        self.plots = delta['plots']
+        if delta.get('rng_state'):
+            self.rng.setstate(rng_state_from_json(delta['rng_state']))
+            self._weather_cache = delta.get('weather_cache') or {}
+
     # --- Conditions de fin de jeu ---
 
     def check_win_condition(self):
@@ -0,0 +1,243 @@
+"""
+Prévision de rendement à quelques jours pour le "Conseil IA".
+
+Le prévisionniste projette, pour toutes les parcelles à la fois, la progression,
+le niveau d'eau et le rendement attendu (`max_k * soil_quality * progress`) sur
+les N prochains jours, avec la météo attendue de FarmLogic. Chaque action
+possible (arroser, drainer, fertiliser, traiter, récolter, planter) est simulée
+comme un scénario supplémentaire : tous les scénarios avancent ensemble dans un
+même pas de croissance vectorisé (tableaux scénarios x parcelles).
+
+Les événements aléatoires (apparition de maladie sur une parcelle sur-irriguée,
+dégâts de gel) sont remplacés par leur espérance : chaque scénario suit la
+probabilité que la parcelle soit malade, la sévérité et la qualité de sol
+attendues, si bien que drainer une parcelle noyée réduit le risque prévu. La
+réserve d'eau et l'argent ne sont pas partagés entre parcelles : la prévision
+sert à classer les actions, pas à rejouer la partie.
+"""
+import numpy as np
+
+from core.farm_logic import (
+    DISEASE_ONSET_CHANCE, FERTILIZER_COST, FROST_DAMAGE, FROST_DAMAGE_CHANCE, TREATMENT_COST,
+    WATER_CONSUMPTION_PER_ACTION, logistic_growth_step
+)
+from core.policies import FarmState, HARVEST_PROGRESS
+
+HORIZON_DAYS = 10
+
+# Scénarios communs à toutes les parcelles ; les scénarios "plant" (un par culture) suivent
+BASE_SCENARIOS = ("wait", "water", "drain", "fertilize", "treat")
+
+
+class YieldForecaster:
+    """
+    Projette l'état des parcelles d'une FarmLogic et classe les actions par gain attendu.
+
+    Args:
+        logic: La FarmLogic à prévoir (elle n'est pas modifiée).
+        horizon: Nombre de jours projetés.
+    """
+
+    def __init__(self, logic, horizon=HORIZON_DAYS):
+        self.logic = logic
+        self.horizon = horizon
+
+    def _weather(self):
+        """Météo attendue des prochains jours, sous forme de tableaux (un élément par jour)."""
+        logic = self.logic
+        days = range(logic.current_day, min(logic.current_day + self.horizon, logic.max_days + 1))
+        weather = [logic.get_expected_weather(day) for day in days]
+        calendar = logic.calendar
+        conditions = np.array([w["condition"] for w in weather])
+        return {
+            "temp": np.array([w["temp"] for w in weather], dtype=float),
+            "precip": np.array([w["precip"] for w in weather], dtype=float),
+            "soil_temp": np.array([w["soil_temp"] for w in weather], dtype=float),
+            "season_factor": calendar.growth_factor[calendar.season_indices(np.array(days))],
+            "heatwave": conditions == "heatwave",
+            "frost": conditions == "frost",
+            "snow": conditions == "snow",
+            "heavy_rain": conditions == "Pluie forte",
+        }
+
+    def forecast(self, state=None):
+        """
+        Projection sans action du joueur.
+
+        Returns:
+            Un dictionnaire de tableaux de forme (jours + 1, parcelles) : "progress",
+            "water_level", "soil_quality" et "expected_yield" (la ligne 0 est l'état actuel).
+        """
+        state = state or FarmState(self.logic)
+        crop_id = np.array(state.crop_id)
+        plots = {
+            "progress": np.array(state.progress)[None, :],
+            "water_level": np.array(state.water_level)[None, :],
+            "soil_quality": np.array(state.soil_quality)[None, :],
+            "fertilizer_bonus": np.array(state.fertilizer_bonus)[None, :],
+            "disease_severity": np.array(state.disease_severity)[None, :],
+        }
+        history = _simulate(state, crop_id[None, :], plots, self._weather(), record=True)
+        return {key: values[:, 0, :] for key, values in history.items()}
+
+    def rank_actions(self, state=None, limit=None):
+        """
+        Classe les actions possibles par gain attendu sur l'horizon, coût déduit.
+
+        Returns:
+            Une liste de dictionnaires {"plot", "action", "crop", "gain", "value"} triée
+            par gain décroissant. Seules les actions au gain strictement positif sont gardées.
+        """
+        logic = self.logic
+        state = state or FarmState(logic)
+        num_plots = len(state.crop_id)
+        if num_plots == 0:
+            return []
+
+        crop_ids = state.available_crop_ids
+        scenarios = list(BASE_SCENARIOS) + ["plant"] * len(crop_ids)
+        rows = len(scenarios)
+        has_crop = np.array(state.has_crop)
+        ready = has_crop & (state.progress >= HARVEST_PROGRESS)
+
+        # État de départ de chaque scénario : une ligne par scénario, une colonne par parcelle
+        crop_id = np.tile(state.crop_id, (rows, 1))
+        plots = {
+            key: np.tile(getattr(state, key), (rows, 1))
+            for key in ("progress", "water_level", "soil_quality", "fertilizer_bonus", "disease_severity")
+        }
+        plots["water_level"][1] = np.minimum(100, plots["water_level"][1] + 20)
+        plots["water_level"][2] = np.maximum(0, plots["water_level"][2] - 30)
+        plots["fertilizer_bonus"][3] += 0.1
+        plots["soil_quality"][3] = np.maximum(0.2, plots["soil_quality"][3] - 0.05)
+        plots["disease_severity"][4] = 0.0
+        # Plantation : la parcelle est (ou sera, après récolte) vide et reçoit une nouvelle culture
+        first_plant = len(BASE_SCENARIOS)
+        crop_id[first_plant:] = crop_ids[:, None]
+        plots["progress"][first_plant:] = 0.01
+
+        values = _simulate(state, crop_id, plots, self._weather())
+
+        harvest_now = state.crop_max_k[state.crop_id] * state.soil_quality * state.progress
+        baseline = values[0]
+
+        # Disponibilité de chaque action, parcelle par parcelle (mêmes conditions que FarmLogic)
+        growing = has_crop & (state.progress < 1.0)
+        allowed = np.zeros((rows, num_plots), dtype=bool)
+        allowed[1] = growing & (state.water_reserve >= WATER_CONSUMPTION_PER_ACTION)
+        allowed[2] = growing & (state.water_level > 0)
+        allowed[3] = growing & (state.money >= FERTILIZER_COST)
+        allowed[4] = np.array(state.has_disease) & (state.money >= TREATMENT_COST)
+        allowed[first_plant:] = ~has_crop
+
+        # Gain de chaque action disponible (lignes = scénarios), coût déduit
+        gains = values - baseline
+        gains[3] -= FERTILIZER_COST
+        gains[4] -= TREATMENT_COST
+        action_values = values.copy()
+
+        # Récolte : rendement immédiat + meilleure replantation sur la parcelle libérée
+        if len(crop_ids):
+            best_plant = np.argmax(values[first_plant:], axis=0)
+            harvest_value = harvest_now + values[first_plant:][best_plant, np.arange(num_plots)]
+            scenarios.append("harvest")
+            gains = np.vstack([gains, harvest_value - baseline])
+            action_values = np.vstack([action_values, harvest_value])
+            allowed = np.vstack([allowed, ready])
+            crop_id = np.vstack([crop_id, crop_ids[best_plant]])
+        allowed[0] = False
+
+        rows, plot_indices = np.nonzero(allowed & (gains > 0))
+        order = np.argsort(-gains[rows, plot_indices], kind="stable")
+        if limit:
+            order = order[:limit]
+
+        ranking = []
+        for row, plot in zip(rows[order].tolist(), plot_indices[order].tolist()):
+            action = scenarios[row]
+            ranking.append({
+                "plot": plot,
+                "action": action,
+                "crop": state.crop_names[crop_id[row, plot]] if action in ("plant", "harvest") else None,
+                "gain": float(gains[row, plot]),
+                "value": float(action_values[row, plot]),
+            })
+        return ranking
+
+
+def _simulate(state, crop_id, plots, weather, record=False):
+    """
+    Avance tous les scénarios jour par jour (modèle de FarmLogic.update_simulation en espérance).
+
+    `crop_id` et les tableaux de `plots` ont la forme (scénarios, parcelles) ; ils sont modifiés en place.
+    Retourne la valeur attendue (rendement `max_k * sol * progression`) à l'horizon, ou
+    l'historique complet si `record` est vrai.
+    """
+    progress = plots["progress"]
+    water = plots["water_level"]
+    soil = plots["soil_quality"]
+    fertilizer = plots["fertilizer_bonus"]
+    severity = plots["disease_severity"]
+
+    # Paramètres de culture rassemblés une fois pour toutes (crop_id = -1 -> valeurs par défaut)
+    has_crop = crop_id >= 0
+    maturation = state.crop_maturation_days[crop_id]
+    water_need = state.crop_water_need[crop_id]
+    max_water = state.crop_max_water_level[crop_id]
+    temp_min = state.crop_temp_min[crop_id]
+    temp_max = state.crop_temp_max[crop_id]
+    frost_damage = FROST_DAMAGE_CHANCE * FROST_DAMAGE * (state.crop_frost_resistant[crop_id] == 0)
+    max_k = state.crop_max_k[crop_id]
+    # Probabilité que la parcelle soit malade (certaine si une maladie est déjà déclarée)
+    disease_chance = (severity > 0).astype(float)
+
+    history = {key: [values.copy()] for key, values in plots.items() if key != "fertilizer_bonus"} if record else None
+
+    for day in range(len(weather["temp"])):
+        if weather["heavy_rain"][day]:
+            np.maximum(fertilizer - 0.01, 0, out=fertilizer)
+            np.maximum(soil - 0.005, 0.2, out=soil)
+        evaporation = max(0.0, (weather["temp"][day] - 15) / 5) * (2.0 if weather["heatwave"][day] else 1.0)
+        np.clip(water + weather["precip"][day] - evaporation, 0, 100, out=water)
+
+        # Apparition attendue d'une maladie sur les parcelles sur-irriguées, puis progression
+        onset = (1 - disease_chance) * DISEASE_ONSET_CHANCE * (has_crop & (water > max_water))
+        disease_chance += onset
+        severity += 0.1 * onset
+        np.maximum(soil - 0.02 * onset, 0.2, out=soil)
+        np.minimum(severity + 0.05 * disease_chance, 1.0, out=severity)
+
+        growing = has_crop & (progress < 1.0)
+        rate = (10.0 + fertilizer * 5) / maturation
+        rate *= 1 - np.abs(water - water_need) / 100
+        rate *= weather["season_factor"][day] * soil
+        soil_temp = weather["soil_temp"][day]
+        rate *= np.where((temp_min <= soil_temp) & (soil_temp <= temp_max), 1.0, 0.5)
+        rate *= np.where(water > max_water, 0.4, 1.0)
+        rate *= 1 - severity * 0.8
+        if weather["heatwave"][day]:
+            rate *= 0.5
+        elif weather["frost"][day]:
+            rate *= 0.1
+            progress -= frost_damage * growing
+        elif weather["snow"][day]:
+            rate *= 0.2
+        drought = growing & (water < 10)
+        rate *= np.where(drought, 0.2, 1.0)
+        progress -= 0.02 * drought
+        np.maximum(progress, 0, out=progress)
+        progress[:] = np.where(growing, logistic_growth_step(progress, rate), progress)
+
+        # Jachère : le sol des parcelles vides se régénère
+        np.minimum(soil + 0.01 * ~has_crop, 1.0, out=soil)
+        np.maximum(fertilizer - 0.02, 0, out=fertilizer)
+
+        if record:
+            for key in history:
+                history[key].append(plots[key].copy())
+
+    if record:
+        history = {key: np.stack(values) for key, values in history.items()}
+        history["expected_yield"] = max_k * history["soil_quality"] * history["progress"] * has_crop
+        return history
+    return max_k * soil * progress * has_crop
@@ -1,7 +1,257 @@
-import requests
-from typing import Dict, Any
+import glob
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
 
-def get_nasa_power_data(latitude: float, longitude: float, start_date: str, end_date: str, api_key: str) -> Dict[str, Any]:
+# T2M: Température à 2m
+# PRECTOTCORR: Précipitations corrigées
+# TS: Température de la surface du sol (Earth Skin Temperature)
+DEFAULT_PARAMETERS = "T2M,PRECTOTCORR,TS"
+# Pilotes supplémentaires disponibles : rayonnement solaire, humidité relative, humidité du sol (zone racinaire)
+EXTENDED_PARAMETERS = DEFAULT_PARAMETERS + ",ALLSKY_SFC_SW_DWN,RH2M,GWETROOT"
+
+POINT_API_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
+REGIONAL_API_URL = "https://power.larc.nasa.gov/api/temporal/daily/regional"
+# Réponses HTTP temporaires pour lesquelles la requête est renvoyée
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+DATE_FORMAT = "%Y%m%d"
+# Requêtes simultanées au plus pour un téléchargement découpé
+MAX_PARALLEL_CHUNKS = 4
+
+
+def normalize_parameters(parameters) -> str:
+    """Liste de paramètres (liste Python ou chaîne "A,B,C") -> chaîne attendue par l'API."""
+    if isinstance(parameters, str):
+        parameters = parameters.split(",")
+    return ",".join(name.strip().upper() for name in parameters if name.strip())
+
+
+def default_cache_dir() -> str:
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "weather_cache")
+
+
+def _cache_path(latitude: float, longitude: float, start_date: str, end_date: str, cache_dir: Optional[str] = None,
+                parameters: str = DEFAULT_PARAMETERS) -> str:
+    """Fichier de cache d'une requête ponctuelle (coordonnées arrondies au centième de degré)."""
+    parameters = normalize_parameters(parameters)
+    suffix = "" if parameters == DEFAULT_PARAMETERS else "_" + parameters.replace(",", "-")
+    filename = f"{latitude:.2f}_{longitude:.2f}_{start_date}_{end_date}{suffix}.json"
+    return os.path.join(cache_dir or default_cache_dir(), filename)
+
+
+def load_cached_payload(latitude: float, longitude: float, start_date: str, end_date: str,
+                        cache_dir: Optional[str] = None, parameters: str = DEFAULT_PARAMETERS) -> Optional[Dict[str, Any]]:
+    """Retourne la réponse en cache pour cette requête, ou None."""
+    try:
+        with open(_cache_path(latitude, longitude, start_date, end_date, cache_dir, parameters), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_payload_to_cache(payload: Dict[str, Any], latitude: float, longitude: float, start_date: str, end_date: str,
+                          cache_dir: Optional[str] = None, parameters: str = DEFAULT_PARAMETERS) -> None:
+    """Enregistre une réponse de l'API dans le cache disque."""
+    path = _cache_path(latitude, longitude, start_date, end_date, cache_dir, parameters)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Écriture dans un fichier temporaire puis remplacement : un lecteur concurrent ne voit jamais un fichier partiel
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(temp_path, path)
+
+
+def cached_payloads(latitude: float, longitude: float, cache_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Toutes les réponses en cache pour ce lieu, quelle que soit la période."""
+    pattern = os.path.join(cache_dir or default_cache_dir(), f"{latitude:.2f}_{longitude:.2f}_*.json")
+    payloads = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                payloads.append(json.load(f))
+        except (OSError, ValueError) as e: # Fichier illisible, JSON ou UTF-8 invalide (écriture interrompue)
+            print(f"Fichier de cache météo invalide ignoré : {path} ({e})")
+    return payloads
+
+
+def _import_requests():
+    """Import différé : requests n'est chargé qu'à la première requête réseau (démarrage du jeu plus rapide)."""
+    import requests
+    return requests
+
+
+class PowerClientMetrics:
+    """Compteurs d'un PowerClient (partagés entre threads)."""
+
+    def __init__(self, max_samples: int = 1000):
+        self._lock = threading.Lock()
+        self.requests = 0         # Requêtes HTTP envoyées, nouveaux essais compris
+        self.retries = 0          # Nouveaux essais après une erreur temporaire
+        self.failures = 0         # Appels abandonnés (erreur remontée à l'appelant)
+        self.coalesced = 0        # Appels servis par une requête identique déjà en cours
+        self.bytes_received = 0
+        self.latencies = deque(maxlen=max_samples) # Durées des dernières requêtes (s)
+
+    def record_response(self, latency: float, num_bytes: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes_received += num_bytes
+            self.latencies.append(latency)
+
+    def increment(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def summary(self) -> Dict[str, float]:
+        """Instantané des compteurs et des latences (moyenne, médiane, 95e centile, en secondes)."""
+        with self._lock:
+            latencies = sorted(self.latencies)
+            summary = {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "coalesced": self.coalesced,
+                "bytes_received": self.bytes_received,
+            }
+        if latencies:
+            summary["latency_mean"] = sum(latencies) / len(latencies)
+            summary["latency_p50"] = latencies[len(latencies) // 2]
+            summary["latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return summary
+
+
+class PowerClient:
+    """
+    Client HTTP de l'API NASA POWER.
+
+    - Une session requests partagée garde les connexions ouvertes (pool) d'un appel à l'autre.
+    - Chaque requête a un délai de connexion et de lecture : une réponse lente ne bloque plus le jeu.
+    - Les erreurs réseau et les réponses temporaires (429, 5xx) sont réessayées un nombre limité
+      de fois, avec une attente exponentielle tirée au hasard ("full jitter").
+    - Des appels concurrents pour la même requête partagent une seule requête HTTP
+      (et reçoivent le même dictionnaire, à ne pas modifier).
+
+    Args:
+        connect_timeout, read_timeout: Délais en secondes.
+        max_retries: Nombre de nouveaux essais après le premier.
+        backoff: Attente de base avant le premier nouvel essai (s), doublée à chaque essai.
+        max_backoff: Attente maximale entre deux essais (s).
+        pool_size: Nombre de connexions gardées ouvertes par hôte.
+    """
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 60.0, max_retries: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 30.0, pool_size: int = 8,
+                 session=None, seed: Optional[int] = None):
+        requests = _import_requests()
+        self.session = session or requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = PowerClientMetrics()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Tuple, Future] = {}
+
+    def get_json(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Envoie une requête GET et retourne la réponse JSON.
+
+        Raises:
+            requests.RequestException: si la requête échoue encore après tous les essais.
+        """
+        key = (url, tuple(sorted((name, str(value)) for name, value in params.items())))
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+        if not owner:
+            self.metrics.increment("coalesced")
+            return future.result()
+
+        try:
+            data = self._get_with_retries(url, params)
+        except BaseException as e:
+            self.metrics.increment("failures")
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(data)
+            return data
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _get_with_retries(self, url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        requests = _import_requests()
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.metrics.record_response(time.perf_counter() - start, 0)
+                if last_attempt:
+                    raise
+                delay = self._retry_delay(attempt)
+                print(f"NASA POWER injoignable ({type(e).__name__}), nouvel essai dans {delay:.1f} s...")
+            else:
+                self.metrics.record_response(time.perf_counter() - start, len(response.content))
+                if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                    response.raise_for_status()  # Lève une exception pour les codes d'erreur HTTP
+                    return response.json()
+                delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                print(f"NASA POWER a répondu {response.status_code}, nouvel essai dans {delay:.1f} s...")
+            self.metrics.increment("retries")
+            time.sleep(delay)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Attente avant le prochain essai : Retry-After du serveur s'il est donné, sinon tirage dans [0, backoff * 2^essai]."""
+        if retry_after is not None:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                pass # Date HTTP : on garde l'attente exponentielle
+        return self._rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+
+_default_client: Optional[PowerClient] = None
+_default_client_lock = threading.Lock()
+
+
+def default_client() -> PowerClient:
+    """Client partagé par tout le jeu (créé au premier appel)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = PowerClient()
+        return _default_client
+
+
+def get_nasa_power_data(latitude: float, longitude: float, start_date: str, end_date: str, api_key: str,
+                        use_cache: bool = True, parameters=DEFAULT_PARAMETERS,
+                        client: Optional[PowerClient] = None) -> Dict[str, Any]:
     """
     Récupère les données météo et sol de l'API NASA POWER.
 
@@ -11,17 +261,22 @@ def get_nasa_power_data(latitude: float, longitude: float, start_date: str, end_
         start_date: La date de début au format 'YYYYMMDD'.
         end_date: La date de fin au format 'YYYYMMDD'.
         api_key: Votre clé API pour NASA POWER.
+        use_cache: Réutiliser (et alimenter) le cache disque data/weather_cache/.
+        parameters: Paramètres NASA demandés (liste ou chaîne "T2M,PRECTOTCORR,...").
+        client: Client HTTP à utiliser (le client partagé par défaut).
 
     Returns:
         Un dictionnaire contenant les données JSON de l'API.
     """
-    api_url = "https://power.larc.nasa.gov/api/temporal/daily/point"
-    
-    # T2M: Température à 2m
-    # PRECTOTCORR: Précipitations corrigées
-    # TS: Température de la surface du sol (Earth Skin Temperature)
+    parameters = normalize_parameters(parameters)
+    if use_cache:
+        cached = load_cached_payload(latitude, longitude, start_date, end_date, parameters=parameters)
+        if cached is not None:
+            print(f"Données NASA POWER du {start_date} au {end_date} lues depuis le cache.")
+            return cached
+
     params = {
-        "parameters": "T2M,PRECTOTCORR,TS",
+        "parameters": parameters,
         "community": "AG", # Agroclimatology
         "longitude": longitude,
         "latitude": latitude,
@@ -33,10 +288,148 @@ def get_nasa_power_data(latitude: float, longitude: float, start_date: str, end_
 
     print(f"Interrogation de l'API NASA POWER pour la période du {start_date} au {end_date}...")
 
-    response = requests.get(api_url, params=params)
-    response.raise_for_status()  # Lève une exception pour les codes d'erreur HTTP
-
-    data = response.json()
+    data = (client or default_client()).get_json(POINT_API_URL, params)
     print("Données NASA POWER récupérées avec succès !")
+    if use_cache:
+        save_payload_to_cache(data, latitude, longitude, start_date, end_date, parameters=parameters)
+    return data
+
+
+def split_date_range(start_date: str, end_date: str) -> List[Tuple[str, str]]:
+    """
+    Découpe une période ('YYYYMMDD') en années civiles (premier et dernier morceau éventuellement partiels).
+    Les morceaux étant alignés sur les années, deux périodes qui se recouvrent partagent leurs fichiers de cache.
+    """
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    end = datetime.strptime(end_date, DATE_FORMAT)
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, datetime(start.year, 12, 31))
+        chunks.append((start.strftime(DATE_FORMAT), chunk_end.strftime(DATE_FORMAT)))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def missing_days(payload: Dict[str, Any], start_date: str, end_date: str) -> List[str]:
+    """Jours de la période absents de la réponse (tous si elle n'a pas de séries)."""
+    start = datetime.strptime(start_date, DATE_FORMAT)
+    days = [(start + timedelta(days=d)).strftime(DATE_FORMAT)
+            for d in range((datetime.strptime(end_date, DATE_FORMAT) - start).days + 1)]
+    try:
+        series = payload["properties"]["parameter"]
+    except (KeyError, TypeError):
+        return days
+    if not series:
+        return days
+    return [day for day in days if any(day not in values for values in series.values())]
+
+
+def merge_payloads(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fusionne des réponses ponctuelles consécutives (dans l'ordre chronologique) en une seule."""
+    merged = dict(payloads[0])
+    parameter = {}
+    for payload in payloads:
+        for name, series in payload["properties"]["parameter"].items():
+            parameter.setdefault(name, {}).update(series)
+    merged["properties"] = dict(payloads[0]["properties"], parameter=parameter)
+    return merged
+
+
+def get_nasa_power_data_chunked(latitude: float, longitude: float, start_date: str, end_date: str, api_key: str,
+                                use_cache: bool = True, parameters=DEFAULT_PARAMETERS,
+                                client: Optional[PowerClient] = None,
+                                max_workers: int = MAX_PARALLEL_CHUNKS) -> Dict[str, Any]:
+    """
+    Comme get_nasa_power_data(), pour une longue période (plusieurs années) : la période est découpée
+    en années civiles, téléchargées en parallèle (au plus `max_workers` à la fois) puis fusionnées.
+    Chaque année est mise en cache séparément ; celles déjà en cache ne sont pas retéléchargées.
+
+    Raises:
+        L'erreur du premier morceau en échec (requests.RequestException, ou ValueError pour une
+        réponse incomplète, retirée du cache), une fois tous les morceaux terminés ; les
+        morceaux en échec sont affichés. Aucun morceau n'est omis en silence.
+    """
+    chunks = split_date_range(start_date, end_date)
+    client = client or default_client()
+
+    def fetch(chunk):
+        payload = get_nasa_power_data(latitude, longitude, chunk[0], chunk[1], api_key,
+                                      use_cache=use_cache, parameters=parameters, client=client)
+        missing = missing_days(payload, chunk[0], chunk[1])
+        if missing:
+            if use_cache:
+                cache_path = _cache_path(latitude, longitude, chunk[0], chunk[1], parameters=parameters)
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+            raise ValueError(f"{len(missing)} jour(s) absent(s) de la réponse (premier : {missing[0]})")
+        return payload
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        futures = [executor.submit(fetch, chunk) for chunk in chunks]
+    failures = [(chunk, future.exception()) for chunk, future in zip(chunks, futures) if future.exception()]
+    if failures:
+        for (chunk_start, chunk_end), error in failures:
+            print(f"Morceau NASA POWER du {chunk_start} au {chunk_end} en échec : {error}")
+        raise failures[0][1]
+    return merge_payloads([future.result() for future in futures])
+
+
+def get_nasa_power_regional_data(lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                                 start_date: str, end_date: str, api_key: str,
+                                 client: Optional[PowerClient] = None) -> Dict[str, Any]:
+    """
+    Récupère les données météo d'une zone rectangulaire (point de grille tous les 0,5°).
+
+    L'API régionale de NASA POWER impose une zone de 2° à 10° de côté.
+
+    Args:
+        lat_min, lat_max, lon_min, lon_max: Limites de la zone.
+        start_date: La date de début au format 'YYYYMMDD'.
+        end_date: La date de fin au format 'YYYYMMDD'.
+        api_key: Votre clé API pour NASA POWER.
+        client: Client HTTP à utiliser (le client partagé par défaut).
+
+    Returns:
+        Un dictionnaire GeoJSON (une "feature" par point de grille).
+    """
+    params = {
+        "parameters": DEFAULT_PARAMETERS,
+        "community": "AG",
+        "latitude-min": lat_min,
+        "latitude-max": lat_max,
+        "longitude-min": lon_min,
+        "longitude-max": lon_max,
+        "start": start_date,
+        "end": end_date,
+        "format": "JSON",
+        "api_key": api_key
+    }
+
+    print(f"Interrogation de l'API régionale NASA POWER ({lat_min}..{lat_max}, {lon_min}..{lon_max})...")
+
+    data = (client or default_client()).get_json(REGIONAL_API_URL, params)
+    print("Grille NASA POWER récupérée avec succès !")
     return data
 
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Télécharge plusieurs années NASA POWER pour un lieu (cache pour la climatologie).")
+    parser.add_argument("latitude", type=float)
+    parser.add_argument("longitude", type=float)
+    parser.add_argument("start", help="YYYYMMDD")
+    parser.add_argument("end", help="YYYYMMDD")
+    parser.add_argument("--parameters", default=DEFAULT_PARAMETERS)
+    parser.add_argument("--workers", type=int, default=MAX_PARALLEL_CHUNKS)
+    args = parser.parse_args()
+
+    key = os.getenv("NASA_API_KEY")
+    if not key:
+        raise SystemExit("La variable d'environnement NASA_API_KEY n'est pas définie.")
+    data = get_nasa_power_data_chunked(args.latitude, args.longitude, args.start, args.end, key,
+                                       parameters=args.parameters, max_workers=args.workers)
+    num_days = max(len(series) for series in data["properties"]["parameter"].values())
+    print(f"{num_days} jours en cache pour ({args.latitude}, {args.longitude}).")
+    print(default_client().metrics.summary())
@@ -0,0 +1,227 @@
+"""
+Recherche des seuils d'irrigation et de fertilisation qui maximisent la récolte
+tout en préservant le score de durabilité, région par région.
+
+Chaque candidat (jeu de paramètres de ThresholdIrrigationPolicy) est évalué sur
+plusieurs graines, en parallèle dans des processus qui gardent une FarmLogic
+"chaude" (crops.json chargé une seule fois par processus). L'évaluation se fait
+par tours : après chaque tour, les candidats nettement moins bons que le
+meilleur sont abandonnés (arrêt anticipé).
+
+Utilisation en ligne de commande :
+    python -m core.optimizer [région] [--seeds N] [--processes N]
+"""
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+from core.catalog import default_catalog
+from core.farm_logic import FarmLogic
+from core.policies import ThresholdIrrigationPolicy, run_policy
+from core.scoring import MIN_SUSTAINABILITY, score_run
+
+DEFAULT_IRRIGATION_THRESHOLDS = (20, 30, 40, 50, 60, 70)
+DEFAULT_FERTILIZATION_THRESHOLDS = (None, 0.5, 0.6, 0.7, 0.8, 0.9)
+SYNTHETIC_START_DATE = datetime(2001, 1, 1) # Début des années synthétiques (sans date de la partie)
+
+# FarmLogic réutilisée par chaque processus de travail
+_worker_logic = None
+_worker_config = None
+_worker_climatology = None
+
+
+def load_regions():
+    """Régions de data/regions_fr.json (vérifiées, voir core/catalog.py)."""
+    return default_catalog().regions
+
+
+def grid_candidates(irrigation_thresholds=DEFAULT_IRRIGATION_THRESHOLDS,
+                    fertilization_thresholds=DEFAULT_FERTILIZATION_THRESHOLDS):
+    """Toutes les combinaisons de seuils (recherche par grille)."""
+    return [
+        {"irrigation_threshold": irrigation, "fertilization_threshold": fertilization}
+        for irrigation, fertilization in itertools.product(irrigation_thresholds, fertilization_thresholds)
+    ]
+
+
+def random_candidates(count, irrigation_range=(10, 80), fertilization_range=(0.3, 1.0), seed=None):
+    """Tire `count` candidats uniformément dans les plages données (recherche aléatoire)."""
+    rng = random.Random(seed)
+    return [
+        {
+            "irrigation_threshold": round(rng.uniform(*irrigation_range), 1),
+            "fertilization_threshold": round(rng.uniform(*fertilization_range), 2),
+        }
+        for _ in range(count)
+    ]
+
+
+def _init_worker(config, climatology=None):
+    global _worker_logic, _worker_config, _worker_climatology
+    _worker_logic = FarmLogic()
+    _worker_config = config
+    _worker_climatology = climatology
+
+
+def _evaluate(task):
+    """Joue une politique sur plusieurs graines avec la FarmLogic du processus."""
+    candidate_index, params, seeds = task
+    policy = ThresholdIrrigationPolicy(**params)
+    outcomes = []
+    for seed in seeds:
+        config = dict(_worker_config, seed=seed)
+        if _worker_climatology is not None:
+            # Une météo synthétique distincte par graine, tirée de la climatologie de la région
+            start_date = config.get("start_date") or SYNTHETIC_START_DATE
+            config["nasa_weather_data"] = _worker_climatology.sample_payload(config["years"], start_date, seed)
+            config["start_date"] = start_date
+        results = run_policy(policy, config, logic=_worker_logic)
+        outcomes.append((results["food_harvested"], results["sustainability_score"]))
+    return candidate_index, outcomes
+
+
+def optimize_region(region_name, candidates=None, seeds_per_candidate=16, rounds=4, plots=6, years=1,
+                    processes=None, min_sustainability=MIN_SUSTAINABILITY, weather_data=None, start_date=None,
+                    regions=None, climatology=None):
+    """
+    Évalue les candidats pour une région et retourne un tableau classé.
+
+    Args:
+        region_name: Nom de la région dans regions_fr.json.
+        candidates: Liste de dictionnaires de paramètres (par défaut : grid_candidates()).
+        seeds_per_candidate: Nombre total de graines par candidat (réparties sur `rounds` tours).
+        rounds: Nombre de tours d'évaluation ; l'arrêt anticipé a lieu entre deux tours.
+        plots, years: Taille de la partie simulée.
+        processes: Nombre de processus (None = nombre de CPU, 1 = sans parallélisme).
+        min_sustainability: Durabilité visée (voir score_run).
+        weather_data, start_date: Données NASA optionnelles (météo aléatoire sinon).
+        climatology: core.climate.Climatology ; chaque graine reçoit alors sa propre météo synthétique.
+
+    Returns:
+        Une liste de lignes (dictionnaires) triée du meilleur au moins bon score moyen.
+    """
+    regions = regions or load_regions()
+    candidates = candidates or grid_candidates()
+    config = {
+        "plots": plots,
+        "years": years,
+        "location": region_name,
+        "region_data": regions[region_name],
+        "nasa_weather_data": weather_data,
+        "start_date": start_date,
+    }
+
+    # Les mêmes graines pour tous les candidats : les comparaisons portent sur les mêmes météos
+    seeds = list(range(seeds_per_candidate))
+    seed_batches = [batch.tolist() for batch in np.array_split(seeds, max(1, min(rounds, seeds_per_candidate)))]
+    scores = {i: [] for i in range(len(candidates))}
+    foods = {i: [] for i in range(len(candidates))}
+    sustainabilities = {i: [] for i in range(len(candidates))}
+    active = set(scores)
+    stopped = set()
+
+    executor = None
+    if processes != 1:
+        executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(config, climatology))
+    else:
+        _init_worker(config, climatology)
+
+    try:
+        for round_index, batch in enumerate(seed_batches):
+            tasks = [(i, candidates[i], batch) for i in sorted(active)]
+            outcomes = executor.map(_evaluate, tasks) if executor else map(_evaluate, tasks)
+            for candidate_index, runs in outcomes:
+                for food, sustainability in runs:
+                    foods[candidate_index].append(food)
+                    sustainabilities[candidate_index].append(sustainability)
+                    scores[candidate_index].append(score_run(food, sustainability, min_sustainability))
+
+            if round_index < len(seed_batches) - 1:
+                dropped = _clearly_worse(scores, active)
+                active -= dropped
+                stopped |= dropped
+    finally:
+        if executor:
+            executor.shutdown()
+
+    table = []
+    for i, params in enumerate(candidates):
+        values = np.array(scores[i])
+        table.append({
+            "region": region_name,
+            **params,
+            "score_mean": float(values.mean()),
+            "score_std": float(values.std()),
+            "food_mean": float(np.mean(foods[i])),
+            "sustainability_mean": float(np.mean(sustainabilities[i])),
+            "num_seeds": len(values),
+            "stopped_early": i in stopped,
+        })
+    # Les candidats évalués jusqu'au bout passent devant ceux abandonnés en route
+    table.sort(key=lambda row: (row["stopped_early"], -row["score_mean"]))
+    return table
+
+
+def _clearly_worse(scores, active, z=2.0):
+    """Candidats dont la borne haute reste sous la borne basse du meilleur candidat."""
+    stats = {}
+    for i in active:
+        values = np.array(scores[i])
+        if len(values) < 2:
+            return set() # Pas assez de graines pour estimer l'incertitude
+        stats[i] = (values.mean(), values.std(ddof=1) / math.sqrt(len(values)))
+
+    best_mean, best_stderr = max(stats.values())
+    best_lower = best_mean - z * best_stderr
+    return {i for i, (mean, stderr) in stats.items() if mean + z * stderr < best_lower}
+
+
+def optimize_all_regions(**kwargs):
+    """Lance optimize_region() pour chaque région de regions_fr.json."""
+    regions = load_regions()
+    return {name: optimize_region(name, regions=regions, **kwargs) for name in regions}
+
+
+def format_table(table, limit=10):
+    """Met en forme les meilleures lignes d'un tableau de résultats pour la console."""
+    lines = [f"{'Irrigation':>10} {'Fertil.':>8} {'Score':>8} {'±':>6} {'Récolte':>8} {'Durab.':>7} {'Graines':>7}"]
+    for row in table[:limit]:
+        fertilization = row["fertilization_threshold"]
+        fertilization = "-" if fertilization is None else f"{fertilization:.2f}"
+        lines.append(
+            f"{row['irrigation_threshold']:>10} {fertilization:>8} {row['score_mean']:>8.1f} {row['score_std']:>6.1f} "
+            f"{row['food_mean']:>8.1f} {row['sustainability_mean']:>7.1f} {row['num_seeds']:>7}"
+            + (" (arrêté)" if row["stopped_early"] else "")
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Optimise les seuils d'irrigation et de fertilisation par région.")
+    parser.add_argument("region", nargs="?", help="Région à optimiser (toutes par défaut)")
+    parser.add_argument("--seeds", type=int, default=16, help="Graines par candidat")
+    parser.add_argument("--processes", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--years", type=int, default=1)
+    parser.add_argument("--plots", type=int, default=6)
+    parser.add_argument("--climatology", action="store_true",
+                        help="Météo synthétique tirée des données NASA en cache (une région)")
+    args = parser.parse_args()
+
+    options = dict(seeds_per_candidate=args.seeds, processes=args.processes, years=args.years, plots=args.plots)
+    if args.region:
+        if args.climatology:
+            from core.climate import Climatology
+            region = load_regions()[args.region]
+            options["climatology"] = Climatology.from_cache(region["lat"], region["lon"])
+        all_tables = {args.region: optimize_region(args.region, **options)}
+    else:
+        all_tables = optimize_all_regions(**options)
+    for name, region_table in all_tables.items():
+        print(f"\n=== {name} ===")
+        print(format_table(region_table))
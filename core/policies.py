@@ -0,0 +1,223 @@
+"""
+Interface de politiques pour piloter FarmLogic sans interface graphique.
+
+Une politique est un simple appelable `policy(state) -> actions` :
+- `state` est un FarmState, un instantané en lecture seule de la ferme
+  sous forme de tableaux NumPy (une case par parcelle) ;
+- `actions` est une liste (éventuellement vide) de tuples
+  `(nom_action, index_parcelle)` ou `("plant", index_parcelle, culture)`.
+
+Les noms d'action sont ceux enregistrés dans `FarmLogic.actions_taken` :
+"plant", "water", "drain", "fertilize", "treat", "harvest".
+"""
+from operator import itemgetter
+
+import numpy as np
+
+from core.catalog import CROP_PARAMS
+from core.farm_logic import FarmLogic
+
+# Colonnes numériques copiées depuis les dictionnaires de parcelles
+PLOT_FIELDS = ("age", "progress", "soil_quality", "water_level", "fertilizer_bonus", "disease_severity")
+
+HARVEST_PROGRESS = 0.9 # Maturité minimale pour récolter (voir FarmLogic.harvest_action)
+
+
+class FarmState:
+    """
+    Instantané en lecture seule de l'état d'une FarmLogic.
+
+    Les tableaux par parcelle (`progress`, `water_level`, ...) et les tableaux
+    par culture (`crop_water_need`, ...) sont des vues non modifiables.
+    L'objet est réutilisé d'un jour à l'autre : `refresh()` réécrit les
+    données en place, sans nouvelle allocation.
+
+    `crop_id` vaut -1 pour une parcelle vide. Les tableaux par culture sont ceux
+    du catalogue (core/catalog.py) : ils ont une case supplémentaire en fin de
+    tableau (valeurs par défaut), si bien que `state.crop_water_need[state.crop_id]`
+    est toujours valide.
+    """
+
+    def __init__(self, logic):
+        catalog = logic.catalog
+        self._catalog = catalog
+        self.crop_names = catalog.crop_names
+        self.crop_ids = dict(catalog.crop_ids)
+        self.crop_ids[None] = -1
+        self.available_crop_ids = np.array([catalog.crop_id(c) for c in logic.available_crops
+                                            if c in catalog.crop_ids], dtype=np.intp)
+
+        for param in CROP_PARAMS:
+            setattr(self, f"crop_{param}", getattr(catalog, param)) # Déjà non modifiables
+
+        num_plots = len(logic.plots)
+        self._plot_data = np.zeros((num_plots, len(PLOT_FIELDS)), order="F")
+        self._crop_id = np.full(num_plots, -1, dtype=np.intp)
+        self._get_fields = itemgetter(*PLOT_FIELDS)
+        self._get_crop = itemgetter("crop")
+        for column, field in enumerate(PLOT_FIELDS):
+            setattr(self, field, _read_only(self._plot_data[:, column]))
+        self.crop_id = _read_only(self._crop_id)
+
+        self.refresh(logic)
+
+    def refresh(self, logic):
+        """Recopie l'état courant de `logic` dans les tableaux existants."""
+        plots = logic.plots
+        if plots:
+            self._plot_data[:] = list(map(self._get_fields, plots))
+            self._crop_id[:] = self._catalog.ids_of(list(map(self._get_crop, plots)))
+
+        self.day = logic.current_day
+        self.max_days = logic.max_days
+        self.season = logic.get_current_season()
+        self.money = logic.money
+        self.water_reserve = logic.water_reserve
+        self.sustainability_score = logic.sustainability_score
+        self.food_harvested = logic.food_harvested
+        self.food_target = logic.food_target
+
+        weather = logic.get_current_day_weather()
+        self.temp = weather["temp"]
+        self.precip = weather["precip"]
+        self.condition = weather["condition"]
+        return self
+
+    @property
+    def has_crop(self):
+        return self.crop_id >= 0
+
+    @property
+    def has_disease(self):
+        return self.disease_severity > 0
+
+
+def _read_only(array):
+    """Retourne une vue non modifiable d'un tableau (le tableau source reste modifiable)."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+# --- Politiques intégrées ---
+
+def greedy_harvest(state):
+    """Récolte dès que possible et replante la culture la plus rentable par jour de croissance."""
+    actions = [("harvest", i) for i in np.flatnonzero(state.has_crop & (state.progress >= HARVEST_PROGRESS))]
+
+    if len(state.available_crop_ids):
+        ids = state.available_crop_ids
+        best_crop = state.crop_names[ids[np.argmax(state.crop_max_k[ids] / state.crop_maturation_days[ids])]]
+        actions.extend(("plant", i, best_crop) for i in np.flatnonzero(~state.has_crop))
+    return actions
+
+
+class ThresholdIrrigationPolicy:
+    """
+    Arrose sous un seuil d'humidité et fertilise au-dessus d'un seuil de qualité du sol.
+
+    Args:
+        irrigation_threshold: Niveau d'eau (0-100) sous lequel une parcelle cultivée est arrosée.
+        fertilization_threshold: Qualité de sol (0-1) minimale pour fertiliser. None désactive la fertilisation.
+        drain_threshold: Niveau d'eau au-dessus duquel on draine. None désactive le drainage.
+        harvest: Si True, récolte et replante comme `greedy_harvest`.
+    """
+
+    def __init__(self, irrigation_threshold=40, fertilization_threshold=None, drain_threshold=None, harvest=True):
+        self.irrigation_threshold = irrigation_threshold
+        self.fertilization_threshold = fertilization_threshold
+        self.drain_threshold = drain_threshold
+        self.harvest = harvest
+
+    def __call__(self, state):
+        actions = greedy_harvest(state) if self.harvest else []
+        growing = state.has_crop & (state.progress < HARVEST_PROGRESS)
+
+        actions.extend(("water", i) for i in np.flatnonzero(growing & (state.water_level < self.irrigation_threshold)))
+        if self.drain_threshold is not None:
+            actions.extend(("drain", i) for i in np.flatnonzero(state.water_level > self.drain_threshold))
+        if self.fertilization_threshold is not None:
+            # Un seul apport à la fois : on attend que le bonus précédent soit presque épuisé
+            can_fertilize = growing & (state.fertilizer_bonus < 0.05) & (state.soil_quality >= self.fertilization_threshold)
+            actions.extend(("fertilize", i) for i in np.flatnonzero(can_fertilize))
+        return actions
+
+
+class CropRulePolicy:
+    """
+    Politique à règles fondée sur les besoins de chaque culture (`crops.json`).
+
+    Arrose quand le niveau d'eau passe sous `water_need - margin`, draine au-dessus
+    de `max_water_level`, traite les maladies, puis récolte et replante.
+    """
+
+    def __init__(self, margin=10, treat=True):
+        self.margin = margin
+        self.treat = treat
+
+    def __call__(self, state):
+        actions = greedy_harvest(state)
+        has_crop = state.has_crop
+        water_need = state.crop_water_need[state.crop_id]
+        max_water = state.crop_max_water_level[state.crop_id]
+
+        actions.extend(("water", i) for i in np.flatnonzero(has_crop & (state.water_level < water_need - self.margin)))
+        actions.extend(("drain", i) for i in np.flatnonzero(has_crop & (state.water_level > max_water)))
+        if self.treat:
+            actions.extend(("treat", i) for i in np.flatnonzero(state.has_disease))
+        return actions
+
+
+BUILTIN_POLICIES = {
+    "greedy_harvest": greedy_harvest,
+    "threshold_irrigation": ThresholdIrrigationPolicy,
+    "crop_rules": CropRulePolicy,
+}
+
+
+# --- Exécution ---
+
+def action_table(logic):
+    """Associe chaque nom d'action à la méthode correspondante de `logic`."""
+    return {
+        "plant": logic.plant_action,
+        "water": logic.water_action,
+        "drain": logic.drain_action,
+        "fertilize": logic.fertilize_action,
+        "treat": logic.treat_action,
+        "harvest": logic.harvest_action,
+    }
+
+
+def run_policy(policy, config=None, logic=None, max_days=None):
+    """
+    Joue une partie complète sans interface en appliquant `policy` chaque jour.
+
+    Args:
+        policy: Appelable `policy(state) -> actions`.
+        config: Configuration de partie (comme ConfigInterface.get_config()). Si None,
+                `logic` doit déjà être configurée.
+        logic: FarmLogic à réutiliser (évite de recharger crops.json à chaque partie).
+        max_days: Limite optionnelle du nombre de jours simulés.
+
+    Returns:
+        Un dictionnaire de résultats au même format que GameInterface.get_results().
+    """
+    if logic is None:
+        logic = FarmLogic()
+    if config is not None:
+        logic.setup_from_config(config)
+
+    last_day = logic.max_days if max_days is None else min(logic.max_days, logic.current_day + max_days - 1)
+    apply = action_table(logic)
+    state = FarmState(logic)
+    update = logic.update_simulation
+
+    # Même condition de fin que GameInterface.draw()
+    while logic.current_day <= last_day:
+        actions = policy(state.refresh(logic))
+        for action in actions:
+            apply[action[0]](*action[1:])
+        update()
+
+    return logic.get_results()
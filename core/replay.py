@@ -0,0 +1,305 @@
+"""
+Enregistrement et rejeu déterministe des parties.
+
+Une session est un fichier texte d'une ligne JSON par enregistrement :
+- un en-tête {"type": "session", ...} qui suffit à reconstruire la partie : région,
+  nombre de parcelles et d'années, date de début, graine et clé de la météo ;
+- une ligne compacte par action réussie : [jour, secondes depuis le début, action, parcelle, culture] ;
+- une ligne {"type": "end", ...} avec les résultats obtenus par le joueur.
+
+Les sauvegardes notent la session en cours et son nombre d'actions. Quand le
+joueur reprend une sauvegarde, l'enregistrement continue dans le même fichier
+après une ligne {"type": "resume", "day": ..., "actions": n} : seules les n
+premières actions précèdent la reprise, celles jouées ensuite sans être
+sauvegardées (arrêt brutal) restent dans le fichier mais ne sont pas rejouées.
+Si la session d'une sauvegarde est introuvable (ancienne sauvegarde, fichier
+supprimé), une session partielle commence au jour chargé ; son en-tête porte
+"resumed_from" (identifiant de la sauvegarde, jour) et elle ne peut pas être rejouée.
+
+Le rejeu reconstruit la partie sans interface, applique chaque action le jour où
+elle a été jouée et vérifie que `daily_yields`, `daily_soil_quality` et l'argent
+final sont identiques.
+
+Les données météo ne sont pas recopiées dans chaque session : elles sont rangées
+une seule fois dans data/replays/weather/, sous une clé tirée de leur contenu
+(empreinte SHA-256), et l'en-tête ne garde que cette clé.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime
+
+import numpy as np
+
+from core.catalog import default_catalog
+from core.farm_logic import FarmLogic
+from core.policies import action_table
+from core.savegame import write_atomic
+
+REPLAY_FORMAT_VERSION = 2
+
+
+def _replays_dir():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "replays")
+
+
+def default_replay_path():
+    """Chemin d'un nouveau fichier de session dans data/replays/."""
+    filename = datetime.now().strftime("session_%Y%m%d_%H%M%S.jsonl")
+    return os.path.join(_replays_dir(), filename)
+
+
+def weather_key(payload):
+    """Clé d'une réponse météo : empreinte de son contenu (None sans données)."""
+    if not payload:
+        return None
+    text = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def store_weather(payload, directory=None):
+    """Range une réponse météo sous sa clé (une seule fois) et retourne la clé."""
+    key = weather_key(payload)
+    if key is None:
+        return None
+    path = os.path.join(directory or os.path.join(_replays_dir(), "weather"), f"{key}.json")
+    if not os.path.exists(path):
+        write_atomic(json.dumps(payload, separators=(",", ":")), path)
+    return key
+
+
+def load_weather(key, directory=None):
+    """Réponse météo rangée sous `key` ; None si la clé est vide, le fichier absent ou altéré."""
+    if key is None:
+        return None
+    path = os.path.join(directory or os.path.join(_replays_dir(), "weather"), f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"ERREUR: Météo de la session introuvable ou invalide ({key}) : {e}")
+        return None
+    if weather_key(payload) != key:
+        print(f"ERREUR: La météo rangée sous {key} ne correspond plus à sa clé.")
+        return None
+    return payload
+
+
+def _json_default(obj):
+    """Sérialise les dates de la configuration (comme FarmLogic.save_game)."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Le type {type(obj)} n'est pas sérialisable en JSON")
+
+
+class SessionRecorder:
+    """
+    Enregistre une partie au fil de l'eau. Chaque ligne est écrite immédiatement :
+    une session interrompue (fermeture du jeu) reste rejouable jusqu'à la dernière action.
+    """
+
+    def __init__(self, config, path=None, weather_dir=None, resumed_from=None):
+        self.path = path or default_replay_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.start_time = time.time()
+        self.actions = 0
+        self.file = open(self.path, "w", encoding="utf-8")
+        header = {
+            "type": "session",
+            "version": REPLAY_FORMAT_VERSION,
+            "seed": config.get("seed"),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "region": config.get("location"),
+            "plots": config.get("plots"),
+            "years": config.get("years"),
+            "start_date": config.get("start_date"),
+            "weather_key": store_weather(config.get("nasa_weather_data"), weather_dir),
+        }
+        if resumed_from:
+            header["resumed_from"] = resumed_from # Session partielle : l'état de départ est celui d'une sauvegarde
+        self._write(header)
+
+    @classmethod
+    def resume(cls, position, day):
+        """
+        Continue la session notée dans une sauvegarde (voir position()). Retourne None si
+        le fichier est introuvable ou ne contient pas les actions jouées avant la sauvegarde.
+        """
+        if not position or not position.get("path"):
+            return None
+        try:
+            _header, actions, _end = load_session(position["path"])
+        except (OSError, ValueError) as e:
+            print(f"Session de la sauvegarde introuvable ou invalide ({position['path']}) : {e}")
+            return None
+        if len(actions) < position["actions"]:
+            return None
+
+        recorder = cls.__new__(cls)
+        recorder.path = position["path"]
+        recorder.start_time = time.time() - position.get("elapsed", 0)
+        recorder.actions = position["actions"]
+        torn = not _ends_with_newline(recorder.path)
+        recorder.file = open(recorder.path, "a", encoding="utf-8")
+        if torn: # Ligne interrompue par un arrêt brutal : la reprise commence sur une nouvelle ligne
+            recorder.file.write("\n")
+        recorder._write({
+            "type": "resume",
+            "day": day,
+            "actions": recorder.actions,
+            "resumed_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        return recorder
+
+    def position(self):
+        """Point atteint par l'enregistrement, écrit dans les sauvegardes pour reprendre la session."""
+        return {"path": self.path, "actions": self.actions, "elapsed": round(time.time() - self.start_time, 3)}
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":"), default=_json_default) + "\n")
+        self.file.flush()
+
+    def record(self, day, action, plot_index, crop=None):
+        """Enregistre une action réussie du joueur."""
+        if self.file is None:
+            return
+        elapsed = round(time.time() - self.start_time, 3)
+        entry = [day, elapsed, action, int(plot_index)]
+        if crop is not None:
+            entry.append(crop)
+        self._write(entry)
+        self.actions += 1
+
+    def finish(self, logic):
+        """Écrit les résultats de fin de session et ferme le fichier."""
+        if self.file is None:
+            return
+        self._write({
+            "type": "end",
+            "day": logic.current_day,
+            "money": logic.money,
+            "daily_yields": list(logic.daily_yields),
+            "daily_soil_quality": list(logic.daily_soil_quality),
+        })
+        self.file.close()
+        self.file = None
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def load_session(path):
+    """
+    Lit un fichier de session : retourne (en-tête, actions, fin ou None). Après une reprise,
+    seules les actions qui précédaient la sauvegarde reprise sont gardées.
+    """
+    header, actions, end = None, [], None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue # Ligne interrompue par un arrêt brutal
+            if isinstance(record, list):
+                actions.append(record)
+            elif record.get("type") == "session":
+                header = record
+            elif record.get("type") == "resume":
+                actions = actions[:record["actions"]]
+                end = None
+            elif record.get("type") == "end":
+                end = record
+    if header is None:
+        raise ValueError(f"Fichier de session sans en-tête : {path}")
+    return header, actions, end
+
+
+def session_config(header, weather_dir=None):
+    """Reconstruit la configuration de la partie à partir de l'en-tête d'une session."""
+    if "config" in header: # Sessions de la version 1 : configuration complète
+        config = dict(header["config"])
+    else:
+        region = header.get("region")
+        config = {
+            "plots": header.get("plots"),
+            "years": header.get("years"),
+            "location": region,
+            "region_data": default_catalog().regions.get(region, {}),
+            "nasa_weather_data": load_weather(header.get("weather_key"), weather_dir),
+            "start_date": header.get("start_date"),
+            "seed": header.get("seed"),
+        }
+        # Champs absents : valeurs par défaut de FarmLogic.setup_from_config
+        config = {key: value for key, value in config.items() if value is not None}
+    if isinstance(config.get("start_date"), str):
+        config["start_date"] = datetime.fromisoformat(config["start_date"])
+    return config
+
+
+def replay_session(path, logic=None, weather_dir=None):
+    """
+    Rejoue une session enregistrée à pleine vitesse et la compare à l'original.
+
+    Returns:
+        Un dictionnaire {"matches": bool, "mismatches": [...], "results": ..., "end": ...}.
+        `matches` est None si la session n'a pas de ligne de fin (partie interrompue).
+
+    Raises:
+        ValueError: Session partielle (commencée depuis une sauvegarde dont la session était introuvable).
+    """
+    header, actions, end = load_session(path)
+    if header.get("resumed_from"):
+        resumed_from = header["resumed_from"]
+        raise ValueError(f"Session partielle (reprise de la sauvegarde {resumed_from.get('save_id')} "
+                         f"au jour {resumed_from.get('day')}) : impossible à rejouer depuis le début")
+    config = session_config(header, weather_dir)
+
+    logic = logic or FarmLogic()
+    logic.setup_from_config(config)
+    apply = action_table(logic)
+
+    for day, _elapsed, action, plot_index, *crop in actions:
+        while logic.current_day < day:
+            logic.update_simulation()
+        apply[action](plot_index, *crop)
+
+    last_day = end["day"] if end else (actions[-1][0] if actions else logic.current_day)
+    while logic.current_day < last_day:
+        logic.update_simulation()
+
+    mismatches = []
+    if end:
+        for key in ("daily_yields", "daily_soil_quality"):
+            replayed, recorded = np.asarray(getattr(logic, key), dtype=float), np.asarray(end[key], dtype=float)
+            if replayed.shape != recorded.shape or not np.allclose(replayed, recorded, rtol=1e-9, atol=1e-9):
+                mismatches.append(key)
+        if not np.isclose(logic.money, end["money"], rtol=1e-9, atol=1e-9):
+            mismatches.append("money")
+
+    return {
+        "matches": (not mismatches) if end else None,
+        "mismatches": mismatches,
+        "results": logic.get_results(),
+        "end": end,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    for session_path in sys.argv[1:]:
+        start = time.perf_counter()
+        report = replay_session(session_path)
+        duration = (time.perf_counter() - start) * 1000
+        status = {True: "identique", False: "DIFFÉRENT", None: "session interrompue"}[report["matches"]]
+        details = f" ({', '.join(report['mismatches'])})" if report["mismatches"] else ""
+        print(f"{session_path}: {status}{details} en {duration:.1f} ms")
@@ -0,0 +1,228 @@
+"""
+Base de résultats locale (SQLite) : une ligne par partie terminée.
+
+Chaque partie enregistre sa configuration (sans les données météo brutes), ses
+résultats finaux et ses séries journalières (blobs NumPy). Les colonnes region,
+player et score sont indexées : classements ("top 10 durabilité au Kenya") et
+percentiles se calculent directement par SQL, sans relire les exports CSV.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from core.scoring import score_run
+from core.timeseries import FARM_CHANNELS, WEATHER_CHANNELS
+
+# Métriques classables (nom public -> colonne SQL)
+RANKED_METRICS = {
+    "score": "score",
+    "sustainability": "sustainability",
+    "food": "food_harvested",
+    "money": "final_money",
+}
+# Clés de configuration trop volumineuses pour être recopiées dans chaque ligne
+HEAVY_CONFIG_KEYS = ("nasa_weather_data", "region_data")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished_at TEXT NOT NULL,
+    player TEXT,
+    region TEXT,
+    seed INTEGER,
+    plots INTEGER,
+    years INTEGER,
+    final_money REAL,
+    final_water REAL,
+    sustainability REAL,
+    food_harvested REAL,
+    food_target REAL,
+    harvests INTEGER,
+    score REAL,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS run_series (
+    run_id INTEGER PRIMARY KEY REFERENCES runs(id) ON DELETE CASCADE,
+    num_days INTEGER NOT NULL,
+    farm BLOB,
+    weather BLOB
+);
+CREATE INDEX IF NOT EXISTS idx_runs_region_score ON runs(region, score);
+CREATE INDEX IF NOT EXISTS idx_runs_region_sustainability ON runs(region, sustainability);
+CREATE INDEX IF NOT EXISTS idx_runs_player ON runs(player);
+CREATE INDEX IF NOT EXISTS idx_runs_score ON runs(score);
+"""
+
+
+def default_database_path():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "results.db")
+
+
+class ResultsDatabase:
+    """
+    Accès à la base de résultats. Une instance garde sa connexion ouverte ;
+    la base est créée au premier accès.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_database_path()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    # --- Écriture ---
+
+    def record_run(self, results, config=None, player=None):
+        """
+        Enregistre une partie terminée (dictionnaire de FarmLogic.get_results()).
+
+        Returns:
+            L'identifiant de la partie dans la base.
+        """
+        config = config if config is not None else results.get("config", {})
+        light_config = {key: value for key, value in config.items() if key not in HEAVY_CONFIG_KEYS}
+        row = {
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "player": player,
+            "region": config.get("location"),
+            "seed": config.get("seed"),
+            "plots": config.get("plots"),
+            "years": config.get("years"),
+            "final_money": float(results["final_money"]),
+            "final_water": float(results["final_water"]),
+            "sustainability": float(results["sustainability_score"]),
+            "food_harvested": float(results.get("food_harvested", 0)),
+            "food_target": float(results.get("food_target", 0)),
+            "harvests": list(results.get("actions_taken", [])).count("harvest"),
+            "score": score_run(results.get("food_harvested", 0), results["sustainability_score"]),
+            "config": json.dumps(light_config, default=str),
+        }
+        with self.connection:
+            cursor = self.connection.execute(
+                f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})", list(row.values())
+            )
+            run_id = cursor.lastrowid
+            history = results.get("history")
+            if history is not None and len(history):
+                days = len(history)
+                self.connection.execute(
+                    "INSERT INTO run_series (run_id, num_days, farm, weather) VALUES (?, ?, ?, ?)",
+                    (run_id, days, history.farm[:, :days].tobytes(), history.weather[:, :days].tobytes()),
+                )
+        return run_id
+
+    def set_player(self, run_id, player):
+        """Associe un nom de joueur à une partie (par exemple au moment de l'export)."""
+        with self.connection:
+            self.connection.execute("UPDATE runs SET player = ? WHERE id = ?", (player, run_id))
+
+    # --- Requêtes ---
+
+    def get_run(self, run_id):
+        row = self.connection.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def top_runs(self, metric="score", region=None, limit=10):
+        """Meilleures parties selon `metric` (voir RANKED_METRICS), éventuellement pour une seule région."""
+        column = _metric_column(metric)
+        where, params = ("WHERE region = ?", [region]) if region else ("", [])
+        rows = self.connection.execute(
+            f"SELECT * FROM runs {where} ORDER BY {column} DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def percentile(self, value, metric="score", region=None):
+        """
+        Pourcentage des parties enregistrées dont `metric` est inférieur ou égal à `value`
+        (None si aucune partie ne correspond).
+        """
+        column = _metric_column(metric)
+        where, params = ("WHERE region = ?", [region]) if region else ("", [])
+        total, below = self.connection.execute(
+            f"SELECT COUNT(*), COALESCE(SUM({column} <= ?), 0) FROM runs {where}", [value] + params
+        ).fetchone()
+        return 100.0 * below / total if total else None
+
+    def run_percentile(self, run_id, metric="score"):
+        """Percentile d'une partie parmi celles de sa région."""
+        run = self.get_run(run_id)
+        if run is None:
+            return None
+        return self.percentile(run[RANKED_METRICS[metric]], metric, run["region"])
+
+    def player_runs(self, player, limit=50):
+        rows = self.connection.execute(
+            "SELECT * FROM runs WHERE player = ? ORDER BY finished_at DESC LIMIT ?", (player, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load_series(self, run_id):
+        """Séries journalières d'une partie : dictionnaire canal -> tableau (vide si non enregistrées)."""
+        row = self.connection.execute(
+            "SELECT num_days, farm, weather FROM run_series WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        if row is None:
+            return {}
+        days = row["num_days"]
+        farm = np.frombuffer(row["farm"], dtype=float).reshape(len(FARM_CHANNELS), days)
+        weather = np.frombuffer(row["weather"], dtype=float).reshape(len(WEATHER_CHANNELS), days)
+        series = dict(zip(FARM_CHANNELS, farm))
+        series.update(zip(WEATHER_CHANNELS, weather))
+        return series
+
+
+def run_in_background(job, on_done=None, path=None, after=None):
+    """
+    Lance `job(base)` dans un thread, avec une connexion propre au thread (une connexion
+    SQLite ne sert que dans le thread qui l'a ouverte), pour ne pas bloquer l'affichage.
+    `after` : thread à attendre avant de commencer (écritures dans l'ordre de l'écran).
+    `on_done(valeur, erreur)` est appelé à la fin (erreur vaut None en cas de succès).
+    """
+    def worker():
+        if after is not None:
+            after.join()
+        try:
+            database = ResultsDatabase(path)
+            try:
+                value, error = job(database), None
+            finally:
+                database.close()
+        except sqlite3.Error as e:
+            value, error = None, e
+        if on_done:
+            on_done(value, error)
+
+    thread = threading.Thread(target=worker, name="base-resultats", daemon=True)
+    thread.start()
+    return thread
+
+
+def _metric_column(metric):
+    if metric not in RANKED_METRICS:
+        raise ValueError(f"Métrique inconnue : {metric}")
+    return RANKED_METRICS[metric]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Classement des parties enregistrées.")
+    parser.add_argument("--region")
+    parser.add_argument("--metric", default="score", choices=sorted(RANKED_METRICS))
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    database = ResultsDatabase()
+    for rank, run in enumerate(database.top_runs(args.metric, args.region, args.limit), start=1):
+        print(f"{rank:>3}. {run['player'] or '-':<20} {run['region'] or '-':<15} "
+              f"{run[RANKED_METRICS[args.metric]]:>10.1f}  ({run['finished_at']})")
+    database.close()
@@ -0,0 +1,348 @@
+"""
+Écriture des sauvegardes de partie, sans bloquer l'affichage.
+
+Le thread principal ne fait qu'un instantané de l'état (FarmLogic.snapshot(),
+quelques copies de tableaux). La conversion en JSON et l'écriture se font dans
+un thread dédié : le fichier est d'abord écrit à côté de la sauvegarde, puis
+renommé par-dessus (os.replace, atomique). Un arrêt brutal en cours d'écriture
+laisse donc toujours la sauvegarde précédente intacte.
+
+Si plusieurs sauvegardes du même fichier attendent, seule la plus récente est écrite.
+
+Les parties sont rangées dans des emplacements (data/saves/slot_<n>.json). Un
+petit index (data/saves/index.json) résume chaque emplacement (région, jour,
+argent, durabilité, date) : le menu liste les parties sans relire les
+sauvegardes complètes. L'index est mis à jour après chaque écriture.
+
+Sauvegardes incrémentales : la sauvegarde complète porte un identifiant
+("save_id"). Les sauvegardes suivantes n'ajoutent qu'une ligne JSON au journal
+<sauvegarde>.delta : les nouveaux jours d'historique, les nouvelles actions,
+les valeurs courantes, l'état des parcelles et celui du générateur aléatoire
+(une partie rechargée poursuit le même tirage). Leur coût dépend de l'activité
+récente, pas de la durée de la partie. Toutes les COMPACT_EVERY écritures (ou
+lors d'une sauvegarde complète demandée), le fichier est réécrit en entier et
+le journal supprimé. Au chargement, seules les lignes du journal portant
+l'identifiant de la sauvegarde complète sont appliquées (une ligne incomplète,
+écrite pendant un arrêt brutal, est ignorée). Après l'échec d'une écriture, les
+sauvegardes incrémentales de ce fichier sont abandonnées jusqu'à la prochaine
+sauvegarde complète réussie (needs_full_save()) : le journal ne saute jamais de jours.
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import date, datetime
+
+NUM_SLOTS = 3
+INDEX_FILENAME = "index.json"
+JOURNAL_SUFFIX = ".delta"
+# Écritures incrémentales avant une réécriture complète (compactage du journal)
+COMPACT_EVERY = 10
+
+_index_lock = threading.Lock()
+_index_version = 0 # Incrémenté à chaque modification de l'index (le menu ne relit l'index que s'il a changé)
+
+
+def json_serializer(obj):
+    """Gère la sérialisation des objets non-standard comme datetime."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Le type {type(obj)} n'est pas sérialisable en JSON")
+
+
+def state_from_snapshot(snapshot, config, save_id=None):
+    """Contenu du fichier de sauvegarde, à partir d'un instantané de FarmLogic.snapshot()."""
+    history = snapshot['history']
+    return {
+        'save_id': save_id,
+        'config': config,
+        'current_day': snapshot['current_day'],
+        'current_season_index': snapshot['current_season_index'],
+        'water_reserve': snapshot['water_reserve'],
+        'money': snapshot['money'],
+        'sustainability_score': snapshot['sustainability_score'],
+        'food_harvested': snapshot['food_harvested'],
+        'food_target': snapshot['food_target'],
+        'history': history.to_dict(),
+        'actions_taken': snapshot['actions_taken'],
+        'plots': snapshot['plots'],
+        # Suite du tirage aléatoire et météo du jour déjà tirée : la partie rechargée continue à l'identique
+        'rng_state': rng_state_to_json(snapshot['rng_state']),
+        'weather_cache': snapshot['weather_cache'],
+        'session': snapshot.get('session'), # Enregistrement de la partie à reprendre (core/replay.py)
+    }
+
+
+def rng_state_to_json(state):
+    """État d'un random.Random (tuples imbriqués) sous forme de listes JSON."""
+    version, internal_state, gauss_next = state
+    return [version, list(internal_state), gauss_next]
+
+
+def rng_state_from_json(data):
+    """Inverse de rng_state_to_json(), pour random.Random.setstate()."""
+    version, internal_state, gauss_next = data
+    return version, tuple(internal_state), gauss_next
+
+
+def write_atomic(text, filepath):
+    """Écrit un fichier texte via un fichier temporaire renommé à la fin (jamais de fichier à moitié écrit)."""
+    directory = os.path.dirname(filepath)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filepath)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def journal_path(filepath):
+    return filepath + JOURNAL_SUFFIX
+
+
+def write_save(snapshot, config, filepath, summary=None, save_id=None):
+    """
+    Sérialise un instantané complet et l'écrit de façon atomique, supprime le journal
+    devenu inutile, puis met à jour l'index du dossier.
+    """
+    text = json.dumps(state_from_snapshot(snapshot, config, save_id), default=json_serializer)
+    write_atomic(text, filepath)
+    if os.path.exists(journal_path(filepath)):
+        os.remove(journal_path(filepath))
+    print(f"Partie sauvegardée dans {filepath}")
+    if summary is not None:
+        update_index(filepath, summary)
+
+
+def append_delta(delta, filepath, summary=None):
+    """Ajoute une sauvegarde incrémentale (une ligne JSON) au journal de la sauvegarde."""
+    line = json.dumps(delta, default=json_serializer) + "\n"
+    with open(journal_path(filepath), "ab+") as f:
+        # Ligne interrompue par un arrêt brutal : la nouvelle ligne commence après elle
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                line = "\n" + line
+        f.write(line.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+    if summary is not None:
+        update_index(filepath, summary)
+
+
+def read_journal(filepath, save_id):
+    """Sauvegardes incrémentales du journal qui complètent la sauvegarde complète `save_id`, dans l'ordre."""
+    deltas = []
+    try:
+        with open(journal_path(filepath), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    delta = json.loads(line)
+                except json.JSONDecodeError:
+                    continue # Ligne interrompue par un arrêt brutal
+                if delta.get("save_id") == save_id:
+                    deltas.append(delta)
+    except FileNotFoundError:
+        pass
+    return deltas
+
+
+# --- Emplacements et index ---
+
+def default_saves_dir():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "saves")
+
+
+def legacy_save_path():
+    """Ancienne sauvegarde unique (copiée dans l'emplacement 1 s'il est libre)."""
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "savegame.json")
+
+
+def slot_path(slot, directory=None):
+    return os.path.join(directory or default_saves_dir(), f"slot_{slot}.json")
+
+
+def index_version():
+    return _index_version
+
+
+def _read_index_file(directory):
+    try:
+        with open(os.path.join(directory, INDEX_FILENAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_index_file(index, directory):
+    global _index_version
+    write_atomic(json.dumps(index, ensure_ascii=False, indent=2), os.path.join(directory, INDEX_FILENAME))
+    _index_version += 1
+
+
+def update_index(filepath, summary):
+    """Enregistre le résumé d'une sauvegarde dans l'index de son dossier."""
+    directory = os.path.dirname(filepath)
+    entry = dict(summary, saved_at=datetime.now().isoformat(timespec="seconds"))
+    with _index_lock:
+        index = _read_index_file(directory) or {}
+        index[os.path.basename(filepath)] = entry
+        _write_index_file(index, directory)
+
+
+def _summary_from_file(filepath):
+    """Résumé d'une sauvegarde complète (reconstruction de l'index seulement)."""
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        config = state.get("config", {})
+        return {
+            "region": config.get("location"),
+            "day": state["current_day"],
+            "max_days": None,
+            "money": state["money"],
+            "sustainability": state["sustainability_score"],
+            "saved_at": datetime.fromtimestamp(os.path.getmtime(filepath)).isoformat(timespec="seconds"),
+        }
+    except (OSError, json.JSONDecodeError, KeyError) as e:
+        print(f"Sauvegarde illisible ignorée ({filepath}) : {e}")
+        return None
+
+
+def read_index(directory=None):
+    """
+    Index des emplacements : nom de fichier -> résumé. Reprend l'ancienne sauvegarde unique
+    dans l'emplacement 1, et reconstruit l'index (une seule fois) s'il manque ou ne
+    correspond plus aux fichiers présents.
+    """
+    directory = directory or default_saves_dir()
+    with _index_lock:
+        if directory == default_saves_dir() and os.path.exists(legacy_save_path()) \
+                and not os.path.exists(slot_path(1, directory)):
+            os.makedirs(directory, exist_ok=True)
+            shutil.copy2(legacy_save_path(), slot_path(1, directory))
+
+        index = _read_index_file(directory)
+        files = {os.path.basename(slot_path(slot, directory)) for slot in range(1, NUM_SLOTS + 1)
+                 if os.path.exists(slot_path(slot, directory))}
+        if index is None or set(index) != files:
+            index = {name: entry for name, entry in (index or {}).items() if name in files}
+            for name in files - set(index):
+                summary = _summary_from_file(os.path.join(directory, name))
+                if summary:
+                    index[name] = summary
+            _write_index_file(index, directory)
+        return index
+
+
+def list_slots(directory=None):
+    """Emplacements occupés, par numéro : [{"slot", "path", "region", "day", ...}]."""
+    directory = directory or default_saves_dir()
+    index = read_index(directory)
+    slots = []
+    for slot in range(1, NUM_SLOTS + 1):
+        entry = index.get(os.path.basename(slot_path(slot, directory)))
+        if entry:
+            slots.append(dict(entry, slot=slot, path=slot_path(slot, directory)))
+    return slots
+
+
+def free_slot_path(directory=None):
+    """
+    Emplacement pour une nouvelle partie : le premier libre, ou None si tous sont occupés
+    (aucune partie n'est remplacée sans que le joueur ait choisi laquelle).
+    """
+    used = {entry["slot"] for entry in list_slots(directory)}
+    for slot in range(1, NUM_SLOTS + 1):
+        if slot not in used:
+            return slot_path(slot, directory)
+    return None
+
+
+class SaveWriter:
+    """Thread d'écriture des sauvegardes (démarré à la première sauvegarde), dans l'ordre de soumission."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = []     # (fichier, fonction d'écriture, sauvegarde complète)
+        self._writing = False
+        self._thread = None
+        self._failed = set()   # Fichiers dont une écriture a échoué depuis leur dernière sauvegarde complète
+
+    def submit(self, filepath, write, replaces=False):
+        """
+        Programme une écriture ; retourne immédiatement. Avec replaces=True (sauvegarde
+        complète), les écritures encore en attente pour ce fichier sont abandonnées.
+        """
+        with self._condition:
+            if replaces:
+                self._pending = [job for job in self._pending if job[0] != filepath]
+            self._pending.append((filepath, write, replaces))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="savegame", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Attend que toutes les sauvegardes programmées soient écrites. Retourne False si le délai expire."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def failed(self, filepath):
+        """Vrai si une écriture de ce fichier a échoué depuis sa dernière sauvegarde complète réussie."""
+        with self._condition:
+            return filepath in self._failed
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                filepath, write, replaces = self._pending.pop(0)
+                # Un ajout au journal après un échec laisserait un trou : il attend la sauvegarde complète
+                if not replaces and filepath in self._failed:
+                    self._condition.notify_all()
+                    continue
+                self._writing = True
+            try:
+                write()
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Erreur lors de la sauvegarde dans {filepath} : {e}")
+                with self._condition:
+                    self._failed.add(filepath)
+            else:
+                if replaces:
+                    with self._condition:
+                        self._failed.discard(filepath)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+
+_writer = SaveWriter()
+
+
+def save_in_background(snapshot, config, filepath, summary=None, save_id=None):
+    _writer.submit(filepath, lambda: write_save(snapshot, config, filepath, summary, save_id), replaces=True)
+
+
+def append_delta_in_background(delta, filepath, summary=None):
+    _writer.submit(filepath, lambda: append_delta(delta, filepath, summary))
+
+
+def needs_full_save(filepath):
+    """Vrai si la prochaine sauvegarde de ce fichier doit être complète (écriture précédente en échec)."""
+    return _writer.failed(filepath)
+
+
+def flush_saves(timeout=None):
+    """Attend la fin des sauvegardes en cours (avant un chargement ou la fermeture du jeu)."""
+    return _writer.flush(timeout)
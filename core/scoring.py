@@ -0,0 +1,13 @@
+"""
+Score d'une partie : la récolte totale, pénalisée si la durabilité finale passe
+sous l'objectif. Partagé par l'optimiseur de seuils (core/optimizer.py) et la
+base de résultats (core/results_db.py), qui classent les parties de la même façon.
+"""
+
+MIN_SUSTAINABILITY = 70          # Score de durabilité visé
+SUSTAINABILITY_PENALTY = 20      # Pénalité (kg) par point de durabilité sous l'objectif
+
+
+def score_run(food_harvested, sustainability_score, min_sustainability=MIN_SUSTAINABILITY):
+    """Récolte totale, pénalisée si la durabilité finale passe sous l'objectif."""
+    return food_harvested - SUSTAINABILITY_PENALTY * max(0, min_sustainability - sustainability_score)
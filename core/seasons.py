@@ -0,0 +1,90 @@
+"""
+Calendrier des saisons d'une partie.
+
+Chaque région décrit ses saisons dans regions_fr.json : l'ordre ("season_cycle")
+et la durée de chacune en jours ("season_durations"). Les effets des saisons
+(décalage de température, facteur de précipitations, facteur de croissance,
+icône) viennent de la table "seasons" du même fichier, partagée par les régions
+et qu'une région peut compléter ou corriger champ par champ dans sa propre table
+"seasons". core/catalog.py lit et vérifie ces tables une seule fois et range dans
+chaque région les effets de ses saisons. Une saison ou un champ absent prend la
+valeur de SEASON_DEFAULTS (saison inconnue).
+
+Le calendrier est construit une fois par partie. Les effets sont rangés par
+saison de la partie (le cycle répété sur toutes les années), avec une case par
+défaut en fin de tableau (saison -1, partie non configurée), et un tableau
+jour -> saison donne la saison d'un jour par simple indexation.
+"""
+import numpy as np
+
+DEFAULT_SEASON_CYCLE = ["Printemps", "Été", "Automne", "Hiver"]
+DEFAULT_SEASON_DURATION = 10
+UNDEFINED_SEASON = "Saison Indéfinie"
+
+# Effets d'une saison absente de la table des saisons
+SEASON_DEFAULTS = {"temp_offset": 0, "precip_factor": 1.0, "growth_factor": 1.0, "icon": "❓"}
+
+
+class SeasonCalendar:
+    """
+    Saisons d'une partie de `num_years` années dans une région.
+
+    Args:
+        region_data: Données de la région vérifiées par core/catalog.py (effets des saisons compris).
+                     None : calendrier vide.
+        num_years: Nombre d'années de la partie.
+    """
+
+    def __init__(self, region_data=None, num_years=1):
+        if region_data is None:
+            region_data, num_years = {}, 0
+        cycle = list(region_data.get("season_cycle", DEFAULT_SEASON_CYCLE))
+        cycle_durations = list(region_data.get("season_durations", [DEFAULT_SEASON_DURATION] * len(cycle)))
+        self.days_per_year = sum(cycle_durations) or 1
+
+        self.names = cycle * num_years
+        self.durations = cycle_durations * num_years
+        self.end_days = np.cumsum(self.durations).tolist()
+        self.max_days = sum(self.durations)
+
+        # Effets par saison de la partie (table de la région, sinon saison inconnue),
+        # puis la case par défaut (saison -1)
+        region_seasons = region_data.get("seasons", {})
+        rows = [{**SEASON_DEFAULTS, **region_seasons.get(name, {})} for name in self.names] + [SEASON_DEFAULTS]
+        self.temp_offset = np.array([row["temp_offset"] for row in rows], dtype=float)
+        self.precip_factor = np.array([row["precip_factor"] for row in rows], dtype=float)
+        self.growth_factor = np.array([row["growth_factor"] for row in rows], dtype=float)
+        self.icons = [row["icon"] for row in rows]
+        self._modifiers = [(row["temp_offset"], row["precip_factor"], row["growth_factor"]) for row in rows]
+
+        # Jour -> saison pour les jours 0 à max_days (le jour 0 appartient à la première saison)
+        if self.names:
+            self.day_season = np.concatenate(([0], np.repeat(np.arange(len(self.names)), self.durations)))
+        else:
+            self.day_season = np.array([-1])
+        self._day_season = self.day_season.tolist() # Accès à un seul jour, sans passer par NumPy
+
+    def __len__(self):
+        return len(self.names)
+
+    def season_index(self, day):
+        """Saison d'un jour de la partie ; les jours après la fin restent dans la dernière saison."""
+        return self._day_season[min(max(day, 0), self.max_days)]
+
+    def season_indices(self, days):
+        """Saisons de plusieurs jours d'un coup (tableau NumPy)."""
+        return self.day_season[np.clip(days, 0, self.max_days)]
+
+    def name(self, index):
+        return self.names[index] if self.names else UNDEFINED_SEASON
+
+    def icon(self, index):
+        return self.icons[index] if self.names else SEASON_DEFAULTS["icon"]
+
+    def modifiers(self, index):
+        """(décalage de température, facteur de précipitations, facteur de croissance) d'une saison."""
+        return self._modifiers[index] if self.names else self._modifiers[-1]
+
+    def year_of(self, day):
+        """Année de jeu (à partir de 1) d'un jour de la partie."""
+        return (day - 1) // self.days_per_year + 1
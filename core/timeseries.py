@@ -0,0 +1,139 @@
+"""
+Historique journalier de la partie, stocké en colonnes NumPy préallouées.
+
+Chaque jour simulé ajoute une ligne : les totaux de la ferme, la météo réellement
+utilisée et, en option, l'état de chaque parcelle. Les colonnes sont lues sous
+forme de vues (aucune copie) par l'écran de résultats, l'export et les analyses.
+"""
+import numpy as np
+
+# Totaux de la ferme, un point par jour
+FARM_CHANNELS = ("yield", "soil_quality", "money", "water_reserve", "sustainability", "food_harvested")
+# Météo utilisée par la simulation
+WEATHER_CHANNELS = ("temp", "precip", "soil_temp")
+WEATHER_CONDITIONS = ("Ensoleillé", "Pluie légère", "Pluie forte", "heatwave", "frost", "snow")
+# Canaux par parcelle (optionnels), un point par jour et par parcelle
+PLOT_CHANNELS = ("progress", "water_level", "soil_quality", "disease_severity")
+
+
+class FarmTimeSeries:
+    """
+    Séries temporelles d'une partie, dimensionnées pour `max_days` jours.
+
+    Les valeurs inconnues (par exemple après le chargement d'une ancienne sauvegarde)
+    valent NaN. Si la partie dépasse la capacité prévue, les tableaux sont agrandis.
+    """
+
+    def __init__(self, max_days=0, num_plots=0, record_plots=True):
+        self.length = 0
+        self.num_plots = num_plots
+        self.record_plots = record_plots and num_plots > 0
+        self._allocate(max_days)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.farm = np.full((len(FARM_CHANNELS), capacity), np.nan)
+        self.weather = np.full((len(WEATHER_CHANNELS), capacity), np.nan)
+        self.conditions = np.full(capacity, -1, dtype=np.int8)
+        plot_shape = (len(PLOT_CHANNELS), capacity, self.num_plots) if self.record_plots else (len(PLOT_CHANNELS), 0, 0)
+        self.plots = np.full(plot_shape, np.nan)
+
+    def _grow(self, capacity):
+        old = (self.farm, self.weather, self.conditions, self.plots)
+        self._allocate(capacity)
+        self.farm[:, :self.length] = old[0][:, :self.length]
+        self.weather[:, :self.length] = old[1][:, :self.length]
+        self.conditions[:self.length] = old[2][:self.length]
+        if self.record_plots:
+            self.plots[:, :self.length] = old[3][:, :self.length]
+
+    def record(self, totals, weather, plots=None):
+        """
+        Ajoute un jour à l'historique.
+
+        Args:
+            totals: Valeurs des FARM_CHANNELS, dans le même ordre.
+            weather: Dictionnaire météo de FarmLogic.get_current_day_weather().
+            plots: Liste des dictionnaires de parcelles (ignorée si les canaux par parcelle sont désactivés).
+        """
+        day = self.length
+        if day >= self.capacity:
+            self._grow(max(1, 2 * self.capacity))
+
+        self.farm[:, day] = totals
+        self.weather[:, day] = (weather["temp"], weather["precip"], weather.get("soil_temp", weather["temp"]))
+        condition = weather.get("condition")
+        self.conditions[day] = WEATHER_CONDITIONS.index(condition) if condition in WEATHER_CONDITIONS else -1
+        if self.record_plots and plots is not None and len(plots) == self.num_plots:
+            self.plots[:, day, :] = [[plot[channel] for plot in plots] for channel in PLOT_CHANNELS]
+        self.length = day + 1
+
+    # --- Lecture (vues, sans copie) ---
+
+    def column(self, name):
+        """Série d'un total de la ferme ou d'un canal météo sur les jours écoulés."""
+        if name in FARM_CHANNELS:
+            return self.farm[FARM_CHANNELS.index(name), :self.length]
+        return self.weather[WEATHER_CHANNELS.index(name), :self.length]
+
+    def plot_channel(self, name):
+        """Tableau (jours, parcelles) d'un canal par parcelle ; vide si non enregistré."""
+        if not self.record_plots:
+            return np.empty((self.length, 0))
+        return self.plots[PLOT_CHANNELS.index(name), :self.length]
+
+    def condition_names(self):
+        """Conditions météo de chaque jour, sous forme de noms."""
+        return [WEATHER_CONDITIONS[code] if code >= 0 else None for code in self.conditions[:self.length]]
+
+    def __len__(self):
+        return self.length
+
+    # --- Chargement, copie, sérialisation ---
+
+    def load_column(self, name, values):
+        """Remplace un total de la ferme par une liste (chargement des anciennes sauvegardes)."""
+        values = np.asarray(values, dtype=float)
+        if len(values) > self.capacity:
+            self._grow(len(values))
+        row = FARM_CHANNELS.index(name)
+        self.length = max(self.length, len(values))
+        self.farm[row, :len(values)] = values
+        self.farm[row, len(values):] = np.nan
+
+    def copy(self):
+        """Copie indépendante (instantanés de FarmLogic)."""
+        clone = FarmTimeSeries.__new__(FarmTimeSeries)
+        clone.__dict__.update(self.__dict__)
+        clone.farm = self.farm.copy()
+        clone.weather = self.weather.copy()
+        clone.conditions = self.conditions.copy()
+        clone.plots = self.plots.copy()
+        return clone
+
+    def to_dict(self, start=0):
+        """Colonnes des jours écoulés (à partir du jour `start`) sous forme de listes (sauvegarde JSON)."""
+        data = {name: self.column(name)[start:].tolist() for name in FARM_CHANNELS + WEATHER_CHANNELS}
+        data["condition"] = self.conditions[start:self.length].tolist()
+        if self.record_plots:
+            data["plots"] = {name: self.plot_channel(name)[start:].tolist() for name in PLOT_CHANNELS}
+        return data
+
+    def load_dict(self, data, start=0):
+        """Recharge des colonnes produites par to_dict(), à partir du jour `start` (sauvegardes incrémentales)."""
+        count = len(data.get("yield", []))
+        length = start + count
+        if length > self.capacity:
+            self._grow(length)
+        self.length = length
+        for row, name in enumerate(FARM_CHANNELS):
+            self.farm[row, start:length] = data.get(name, [np.nan] * count)
+        for row, name in enumerate(WEATHER_CHANNELS):
+            self.weather[row, start:length] = data.get(name, [np.nan] * count)
+        self.conditions[start:length] = data.get("condition", [-1] * count)
+        plots = data.get("plots")
+        if self.record_plots and plots:
+            for row, name in enumerate(PLOT_CHANNELS):
+                values = np.asarray(plots.get(name, []), dtype=float)
+                if values.shape == (count, self.num_plots):
+                    self.plots[row, start:length] = values
@@ -0,0 +1,112 @@
+"""
+Données météo NASA POWER sous forme de tableaux NumPy indexés par date.
+
+La réponse JSON (une série {"YYYYMMDD": valeur} par paramètre) est analysée une
+seule fois : chaque paramètre devient un tableau masqué couvrant toute la
+période, les valeurs manquantes (-999 ou dates absentes) étant masquées. L'accès
+à un jour est alors une simple indexation, et les accesseurs sur une plage de
+jours renvoient des vues.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+MISSING_VALUE = -999
+DATE_FORMAT = "%Y%m%d"
+
+# Noms courts des paramètres NASA POWER utilisés par le jeu
+PARAMETER_ALIASES = {
+    "T2M": "temp",
+    "PRECTOTCORR": "precip",
+    "TS": "soil_temp",
+    "ALLSKY_SFC_SW_DWN": "solar",
+    "RH2M": "humidity",
+    "GWETROOT": "soil_wetness",
+}
+
+
+class WeatherDataset:
+    """
+    Séries journalières de plusieurs paramètres sur une période continue.
+
+    Args:
+        start_date: Date (datetime) du premier jour.
+        values: Dictionnaire paramètre NASA -> tableau masqué (jours,).
+    """
+
+    def __init__(self, start_date, values):
+        self.start_date = start_date
+        self.values = values
+        self.num_days = len(next(iter(values.values()))) if values else 0
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Analyse une réponse de get_nasa_power_data() ; retourne None si elle ne contient aucune série."""
+        try:
+            parameters = payload["properties"]["parameter"]
+        except (KeyError, TypeError):
+            return None
+        days = {name: _parse_dates(series) for name, series in parameters.items() if series}
+        if not days:
+            return None
+        first = min(dates.min() for dates in days.values())
+        num_days = int((max(dates.max() for dates in days.values()) - first).astype(int)) + 1
+
+        values = {}
+        for name, dates in days.items():
+            data = np.full(num_days, MISSING_VALUE, dtype=float)
+            data[(dates - first).astype(int)] = list(parameters[name].values())
+            values[name] = np.ma.masked_values(data, MISSING_VALUE, shrink=False)
+        start_date = datetime.strptime(str(first), "%Y-%m-%d")
+        return cls(start_date, values)
+
+    # --- Accès ---
+
+    @property
+    def parameters(self):
+        return list(self.values)
+
+    @property
+    def end_date(self):
+        return self.start_date + timedelta(days=self.num_days - 1)
+
+    def __contains__(self, parameter):
+        return parameter in self.values
+
+    def index_of(self, date):
+        """Position d'une date (datetime ou 'YYYYMMDD') dans les tableaux, ou None hors de la période."""
+        if isinstance(date, str):
+            date = datetime.strptime(date, DATE_FORMAT)
+        index = (date - self.start_date).days
+        return index if 0 <= index < self.num_days else None
+
+    def series(self, parameter, start=0, stop=None):
+        """Vue masquée d'un paramètre entre deux positions (toute la période par défaut)."""
+        return self.values[parameter][start:stop]
+
+    def value(self, parameter, index, default=None):
+        """Valeur d'un paramètre à une position ; `default` si elle est manquante ou hors de la période."""
+        data = self.values.get(parameter)
+        if data is None or not 0 <= index < self.num_days or data.mask[index]:
+            return default
+        return float(data.data[index])
+
+    def day(self, index):
+        """Tous les paramètres disponibles à une position, sous leur nom court (None si manquant)."""
+        return {PARAMETER_ALIASES.get(name, name): self.value(name, index) for name in self.values}
+
+    def take(self, parameter, indices, default=np.nan):
+        """Valeurs d'un paramètre à plusieurs positions (vectorisé) ; `default` pour les manquantes."""
+        indices = np.asarray(indices)
+        inside = (indices >= 0) & (indices < self.num_days)
+        data = self.values[parameter]
+        result = np.full(indices.shape, default, dtype=float)
+        clipped = np.clip(indices, 0, max(self.num_days - 1, 0))
+        known = inside & ~np.ma.getmaskarray(data)[clipped]
+        result[known] = data.data[clipped[known]]
+        return result
+
+
+def _parse_dates(series):
+    """Clés 'YYYYMMDD' d'une série -> tableau datetime64[D] (dans l'ordre du dictionnaire)."""
+    return np.array([f"{date[:4]}-{date[4:6]}-{date[6:]}" for date in series], dtype="datetime64[D]")
@@ -0,0 +1,231 @@
+"""
+Grilles météo NASA POWER mises en cache sur disque et interpolées en tout point.
+
+Une grille est téléchargée une fois avec l'API régionale, puis stockée dans
+data/weather_grids/ sous forme de deux fichiers :
+- <nom>.npy : tableau float32 (paramètres, jours, latitudes, longitudes), ouvert
+  en mémoire partagée (memmap) : seules les cellules lues sont chargées ;
+- <nom>.json : coordonnées, paramètres et date de début.
+
+Tout point situé dans une grille en cache est servi par interpolation bilinéaire
+des quatre points de grille voisins, sans requête réseau. Le résultat a la même
+forme que la réponse de get_nasa_power_data(), FarmLogic l'utilise sans changement.
+"""
+import glob
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from core.nasa_api import DEFAULT_PARAMETERS
+
+MISSING_VALUE = -999
+DATE_FORMAT = "%Y%m%d"
+
+
+def default_grid_dir():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "data", "weather_grids")
+
+
+class WeatherGrid:
+    """
+    Grille météo journalière. Les valeurs manquantes valent NaN.
+
+    Args:
+        values: Tableau (paramètres, jours, latitudes, longitudes).
+        lats, lons: Coordonnées croissantes des points de grille.
+        start_date: Date (datetime) du premier jour.
+        parameters: Noms des paramètres NASA, dans l'ordre du premier axe.
+    """
+
+    def __init__(self, values, lats, lons, start_date, parameters, path=None):
+        self.values = values
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.start_date = start_date
+        self.parameters = list(parameters)
+        self.path = path
+
+    @property
+    def num_days(self):
+        return self.values.shape[1]
+
+    @property
+    def end_date(self):
+        return self.start_date + timedelta(days=self.num_days - 1)
+
+    # --- Construction et stockage ---
+
+    @classmethod
+    def from_regional_payload(cls, payload, parameters=None):
+        """Construit une grille depuis la réponse GeoJSON de get_nasa_power_regional_data()."""
+        features = payload["features"]
+        parameters = parameters or DEFAULT_PARAMETERS.split(",")
+        lats = sorted({feature["geometry"]["coordinates"][1] for feature in features})
+        lons = sorted({feature["geometry"]["coordinates"][0] for feature in features})
+        dates = sorted({date for feature in features
+                        for series in feature["properties"]["parameter"].values() for date in series})
+        start_date = datetime.strptime(dates[0], DATE_FORMAT)
+        num_days = (datetime.strptime(dates[-1], DATE_FORMAT) - start_date).days + 1
+
+        values = np.full((len(parameters), num_days, len(lats), len(lons)), np.nan, dtype=np.float32)
+        lat_index = {lat: i for i, lat in enumerate(lats)}
+        lon_index = {lon: j for j, lon in enumerate(lons)}
+        for feature in features:
+            lon, lat = feature["geometry"]["coordinates"][:2]
+            series_by_param = feature["properties"]["parameter"]
+            for p, name in enumerate(parameters):
+                series = series_by_param.get(name, {})
+                if not series:
+                    continue
+                days = np.array([(datetime.strptime(date, DATE_FORMAT) - start_date).days for date in series])
+                column = np.array(list(series.values()), dtype=np.float32)
+                column[column == MISSING_VALUE] = np.nan
+                values[p, days, lat_index[lat], lon_index[lon]] = column
+        return cls(values, lats, lons, start_date, parameters)
+
+    def save(self, name, directory=None):
+        """Écrit la grille (<nom>.npy + <nom>.json) et la rouvre en memmap."""
+        directory = directory or default_grid_dir()
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, name)
+        np.save(base + ".npy", np.asarray(self.values, dtype=np.float32))
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({
+                "lats": self.lats.tolist(),
+                "lons": self.lons.tolist(),
+                "start_date": self.start_date.strftime(DATE_FORMAT),
+                "parameters": self.parameters,
+            }, f)
+        return WeatherGrid.open(base + ".json")
+
+    @classmethod
+    def open(cls, metadata_path):
+        """Ouvre une grille enregistrée ; les valeurs restent sur disque (memmap, lecture seule)."""
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+        values = np.load(os.path.splitext(metadata_path)[0] + ".npy", mmap_mode="r")
+        start_date = datetime.strptime(metadata["start_date"], DATE_FORMAT)
+        return cls(values, metadata["lats"], metadata["lons"], start_date, metadata["parameters"], metadata_path)
+
+    # --- Interrogation ---
+
+    def contains(self, lat, lon, start_date=None, end_date=None):
+        """Vrai si le point (et la période, si elle est donnée) est couvert par la grille."""
+        inside = self.lats[0] <= lat <= self.lats[-1] and self.lons[0] <= lon <= self.lons[-1]
+        if start_date is not None and _as_date(start_date) < self.start_date:
+            return False
+        if end_date is not None and _as_date(end_date) > self.end_date:
+            return False
+        return inside
+
+    def interpolate(self, lat, lon, parameters=None):
+        """
+        Séries journalières au point (lat, lon) par interpolation bilinéaire.
+        Les voisins sans donnée sont ignorés (poids renormalisés).
+
+        Returns:
+            Un dictionnaire paramètre -> tableau (jours,), NaN si aucun voisin n'a de donnée.
+        """
+        i0, i1, ty = _bracket(self.lats, lat)
+        j0, j1, tx = _bracket(self.lons, lon)
+        weights = np.array([[(1 - ty) * (1 - tx), (1 - ty) * tx],
+                            [ty * (1 - tx), ty * tx]])
+
+        parameters = parameters or self.parameters
+        rows = [self.parameters.index(name) for name in parameters]
+        # Seules les quatre colonnes voisines sont lues depuis le disque
+        block = np.asarray(self.values[:, :, i0:i1 + 1, j0:j1 + 1], dtype=float)
+        corners = block[rows][:, :, [0, i1 - i0]][:, :, :, [0, j1 - j0]]
+        known = ~np.isnan(corners)
+        total = np.sum(np.where(known, corners, 0.0) * weights, axis=(2, 3))
+        norm = np.sum(known * weights, axis=(2, 3))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            series = np.where(norm > 0, total / norm, np.nan)
+        return dict(zip(parameters, series))
+
+    def point_payload(self, lat, lon, start_date=None, end_date=None):
+        """
+        Données au point (lat, lon) dans le format de get_nasa_power_data()
+        (valeurs manquantes à -999), éventuellement limitées à une période.
+        """
+        first = 0 if start_date is None else (_as_date(start_date) - self.start_date).days
+        last = self.num_days - 1 if end_date is None else (_as_date(end_date) - self.start_date).days
+        dates = [(self.start_date + timedelta(days=d)).strftime(DATE_FORMAT) for d in range(first, last + 1)]
+
+        parameter = {}
+        for name, series in self.interpolate(lat, lon).items():
+            window = np.round(series[first:last + 1], 2)
+            window[np.isnan(window)] = MISSING_VALUE
+            parameter[name] = dict(zip(dates, window.tolist()))
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+            "properties": {"parameter": parameter},
+            "header": {"source": "grille locale", "grid": self.path},
+        }
+
+
+def _as_date(value):
+    return datetime.strptime(value, DATE_FORMAT) if isinstance(value, str) else value
+
+
+def _bracket(coords, x):
+    """Indices des deux points de grille qui encadrent x et position relative entre eux (0 à 1)."""
+    if len(coords) == 1:
+        return 0, 0, 0.0
+    i = int(np.clip(np.searchsorted(coords, x), 1, len(coords) - 1))
+    t = (x - coords[i - 1]) / (coords[i] - coords[i - 1])
+    return i - 1, i, float(np.clip(t, 0.0, 1.0))
+
+
+def list_grids(directory=None):
+    """Grilles enregistrées dans le dossier (ouvertes en memmap)."""
+    directory = directory or default_grid_dir()
+    return [WeatherGrid.open(path) for path in sorted(glob.glob(os.path.join(directory, "*.json")))]
+
+
+def find_cached_point_data(lat, lon, num_days=365, directory=None):
+    """
+    Les `num_days` derniers jours disponibles au point (lat, lon), depuis une grille en cache.
+
+    Returns:
+        (données au format de get_nasa_power_data(), date du premier jour), ou (None, None)
+        si aucune grille assez longue ne couvre le point.
+    """
+    grids = [grid for grid in list_grids(directory) if grid.contains(lat, lon) and grid.num_days >= num_days]
+    if not grids:
+        return None, None
+    grid = max(grids, key=lambda g: g.end_date) # La grille la plus récente
+    start_date = grid.end_date - timedelta(days=num_days - 1)
+    return grid.point_payload(lat, lon, start_date, grid.end_date), start_date
+
+
+def fetch_region_grid(lat_min, lat_max, lon_min, lon_max, start_date, end_date, api_key, name=None, directory=None):
+    """Télécharge une zone avec l'API régionale et l'enregistre comme grille locale."""
+    from core.nasa_api import get_nasa_power_regional_data
+
+    payload = get_nasa_power_regional_data(lat_min, lat_max, lon_min, lon_max, start_date, end_date, api_key)
+    name = name or f"grid_{lat_min}_{lat_max}_{lon_min}_{lon_max}_{start_date}_{end_date}"
+    return WeatherGrid.from_regional_payload(payload).save(name, directory)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Télécharge une grille NASA POWER pour un usage hors-ligne.")
+    parser.add_argument("lat_min", type=float)
+    parser.add_argument("lat_max", type=float)
+    parser.add_argument("lon_min", type=float)
+    parser.add_argument("lon_max", type=float)
+    parser.add_argument("start", help="YYYYMMDD")
+    parser.add_argument("end", help="YYYYMMDD")
+    args = parser.parse_args()
+
+    key = os.getenv("NASA_API_KEY")
+    if not key:
+        raise SystemExit("La variable d'environnement NASA_API_KEY n'est pas définie.")
+    grid = fetch_region_grid(args.lat_min, args.lat_max, args.lon_min, args.lon_max, args.start, args.end, key)
+    print(f"Grille enregistrée : {grid.path} ({len(grid.lats)} x {len(grid.lons)} points, {grid.num_days} jours)")
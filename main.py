@@ -1,13 +1,67 @@
-import pygame
+import time
+START_TIME = time.perf_counter()
+
+import importlib
 import sys
+import threading
+
+import pygame
+
+from core.savegame import flush_saves
+from ui.assets import AssetPreloader
+from ui.widgets import preload_fonts
+
+# Module et classe de chaque écran. Les modules ne sont importés (et les écrans
+# construits) qu'à leur première utilisation : le menu s'affiche sans attendre
+# le chargement de la logique de jeu, de l'API NASA, etc.
+SCREENS = {
+    "menu": ("ui.menu", "MenuInterface"),
+    "config": ("ui.config", "ConfigInterface"),
+    "game": ("ui.game", "GameInterface"),
+    "results": ("ui.results", "ResultsInterface"),
+}
+# Option de ligne de commande : affiche le temps de chargement de chaque écran
+PROFILE_FLAG = "--profile-startup"
 
-# Importer les classes d'interface depuis le dossier ui
-from ui.menu import MenuInterface
-from ui.config import ConfigInterface
-from ui.game import GameInterface
-from ui.results import ResultsInterface
-# Importer FarmLogic pour le chargement de partie
-from core.farm_logic import FarmLogic
+
+class ScreenManager:
+    """
+    Crée les écrans à la demande.
+
+    Après la première image, preload_in_background() importe les modules des
+    autres écrans dans un thread : quand le joueur quitte le menu, il ne reste
+    que la construction de l'écran (quelques millisecondes).
+    """
+
+    def __init__(self, screen, profile=False):
+        self.screen = screen
+        self.profile = profile
+        self._screens = {}
+
+    def __getitem__(self, name):
+        if name not in self._screens:
+            module_name, class_name = SCREENS[name]
+            start = time.perf_counter()
+            modules_before = len(sys.modules)
+            module = importlib.import_module(module_name)
+            imported = time.perf_counter()
+            self._screens[name] = getattr(module, class_name)(self.screen)
+            if self.profile:
+                print(f"[profil] {module_name} : import {1000 * (imported - start):.0f} ms "
+                      f"({len(sys.modules) - modules_before} nouveaux modules), "
+                      f"construction {1000 * (time.perf_counter() - imported):.0f} ms")
+        return self._screens[name]
+
+    def preload_in_background(self):
+        """Importe les modules de tous les écrans dans un thread (les imports ne touchent pas à l'affichage)."""
+        def import_modules():
+            start = time.perf_counter()
+            for module_name, _ in SCREENS.values():
+                importlib.import_module(module_name)
+            if self.profile:
+                print(f"[profil] Modules des écrans importés en arrière-plan en {1000 * (time.perf_counter() - start):.0f} ms")
+
+        threading.Thread(target=import_modules, daemon=True).start()
 
 def main():
     """
@@ -20,15 +74,18 @@ def main():
     screen_height = 750
     screen = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption("Farm Navigator")
+    # Polices chargées une fois pour toutes (partagées par les écrans et les boutons)
+    preload_fonts()
 
-    # 2. Instanciation des gestionnaires d'interface pour chaque écran
-    menu_interface = MenuInterface(screen)
-    config_interface = ConfigInterface(screen)
-    game_interface = GameInterface(screen)
-    results_interface = ResultsInterface(screen)
+    # 2. Gestionnaire des écrans (chaque écran est créé à sa première utilisation)
+    profile = PROFILE_FLAG in sys.argv
+    screens = ScreenManager(screen, profile)
+    first_frame = True
+    emoji_preloader = None # Emojis décodés en arrière-plan pendant que le menu est affiché
 
     # 3. État du jeu
     current_screen = "menu"
+    new_game_slot_path = None # Emplacement choisi dans le menu pour la prochaine partie
     running = True
     clock = pygame.time.Clock()
 
@@ -53,34 +110,38 @@ def main():
         if not transition_state:
             if current_screen == "menu":
                 for event in events:
-                    action = menu_interface.handle_event(event)
+                    action = screens["menu"].handle_event(event)
                     if action:
                         if action == "quit":
                             running = False
                         else:
                             transition_target = action # "new_game" ou "continue"
                             transition_state = 'out'
+                            if action == "new_game":
+                                new_game_slot_path = screens["menu"].new_game_slot_path
             
             elif current_screen == "config":
                 action_to_take = None
                 # Ne gérer les événements que si l'écran de config n'est pas déjà en chargement
-                if not config_interface.loading:
+                if not screens["config"].loading:
                     for event in events:
-                        action = config_interface.handle_event(event)
+                        action = screens["config"].handle_event(event)
                         if action:
                             action_to_take = action
                             break
                 
                 if action_to_take == "prepare_game":
                     # Cas spécial : on affiche le chargement, on fait le travail, PUIS on lance la transition
-                    config_interface.draw()
+                    screens["config"].draw()
                     pygame.display.flip()
 
-                    config_interface.prepare_game_config()
-                    game_config = config_interface.get_config()
+                    screens["config"].prepare_game_config()
+                    game_config = screens["config"].get_config()
 
                     if game_config and "error" not in game_config:
-                        game_interface.setup_from_config(game_config)
+                        screens["game"].setup_from_config(game_config, new_game_slot_path)
+                        # Toutes les images de la partie sont chargées avant le premier jour
+                        screens["game"].asset_preloader().run(screen, screens["config"].draw)
                         transition_target = "game"
                         transition_state = 'out'
                     # En cas d'erreur, on reste sur l'écran de config, sans transition
@@ -91,37 +152,38 @@ def main():
 
             elif current_screen == "game":
                 # La fin de partie est gérée par draw(), qui renvoie "game_over"
-                game_action = game_interface.draw()
+                game_action = screens["game"].draw()
                 if game_action == "game_over":
-                    results = game_interface.get_results()
-                    results_interface.setup_from_game(results)
+                    results = screens["game"].get_results()
+                    screens["results"].setup_from_game(results)
                     transition_target = "results"
                     transition_state = 'out'
                 else:
                     for event in events:
-                        action = game_interface.handle_event(event)
+                        action = screens["game"].handle_event(event)
                         if action == "menu":
                             transition_target = "menu"
                             transition_state = 'out'
 
             elif current_screen == "results":
                 for event in events:
-                    action = results_interface.handle_event(event)
+                    action = screens["results"].handle_event(event)
                     if action: # "replay" ou "menu"
                         transition_target = "config" if action == "replay" else "menu"
                         transition_state = 'out'
+                        new_game_slot_path = None # "Rejouer" : emplacement libre ou celui de la partie terminée
 
         # --- Dessin des écrans ---
         # On dessine toujours l'écran actuel, même pendant la transition
         if current_screen == "menu":
-            menu_interface.draw()
+            screens["menu"].draw()
         elif current_screen == "config":
-            config_interface.draw()
+            screens["config"].draw()
         elif current_screen == "game":
             # draw() est déjà appelé plus haut pour la logique de fin de partie
             pass
         elif current_screen == "results":
-            results_interface.draw()
+            screens["results"].draw()
 
         # --- Gestion de l'animation de transition ---
         if transition_state == 'out':
@@ -134,8 +196,8 @@ def main():
                 if transition_target == "new_game":
                     current_screen = "config"
                 elif transition_target == "continue":
-                    if game_interface.logic.load_game():
-                        game_interface.generate_crop_cards_from_logic()
+                    if screens["game"].load_save(screens["menu"].selected_slot_path):
+                        screens["game"].asset_preloader().run(screen)
                         current_screen = "game"
                     else: # Si le chargement échoue, on retourne au menu
                         current_screen = "menu"
@@ -157,10 +219,24 @@ def main():
         # 6. Mise à jour de l'affichage global
         pygame.display.flip()
 
+        if first_frame:
+            first_frame = False
+            if profile:
+                print(f"[profil] Menu affiché {1000 * (time.perf_counter() - START_TIME):.0f} ms après le lancement")
+            screens.preload_in_background()
+            emoji_preloader = AssetPreloader()
+            emoji_preloader.add_emojis()
+            emoji_preloader.start()
+        elif emoji_preloader:
+            emoji_preloader.poll()
+            if emoji_preloader.done:
+                emoji_preloader = None
+
         # 7. Limiter la vitesse de la boucle
         clock.tick(60)
 
-    # 8. Quitter Pygame
+    # 8. Terminer les sauvegardes en cours d'écriture, puis quitter Pygame
+    flush_saves()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,102 @@
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from core.climate import DAYS_PER_YEAR, WET_DAY_THRESHOLD, Climatology, payload_arrays, to_payload
+from core.nasa_api import cached_payloads
+
+START = datetime(2015, 1, 1)
+
+
+def _history(years=8, seed=0, wet_persistence=0.0):
+    """
+    Historique artificiel : cycle saisonnier de température, saison des pluies en début d'année,
+    jours de pluie en chaîne de Markov de persistance `wet_persistence`.
+    """
+    rng = np.random.default_rng(seed)
+    num_days = years * DAYS_PER_YEAR
+    doy = np.arange(num_days) % DAYS_PER_YEAR
+    temp = 15 + 10 * np.sin(2 * np.pi * doy / DAYS_PER_YEAR) + rng.normal(0, 2, num_days)
+    p = np.where(doy < 150, 0.6, 0.15)
+    draws = rng.random(num_days)
+    wet = np.zeros(num_days, dtype=bool)
+    for day in range(num_days):
+        chance = p[day] + wet_persistence * ((1 - p[day]) if wet[day - 1] else -p[day]) if day else p[day]
+        wet[day] = draws[day] < chance
+    precip = wet * (0.5 + rng.exponential(5.0, num_days))
+    return {"T2M": temp, "PRECTOTCORR": precip, "TS": temp + 2.0}
+
+
+@pytest.fixture(scope="module")
+def climatology():
+    return Climatology.from_arrays(START, _history())
+
+
+def _monthly(values, num_days):
+    dates = np.arange(np.datetime64("2015-01-01"), np.datetime64("2015-01-01") + num_days)
+    months = dates.astype("datetime64[M]").astype(int) % 12
+    return np.array([np.mean(values[..., months == month]) for month in range(12)])
+
+
+def test_same_seed_same_years(climatology):
+    first = climatology.sample_payload(2, START, seed=42)
+    assert climatology.sample_payload(2, START, seed=42) == first
+    assert len(first["properties"]["parameter"]["T2M"]) == 2 * DAYS_PER_YEAR
+
+
+def test_different_seeds_different_years(climatology):
+    first = climatology.sample_payload(1, START, seed=1)["properties"]["parameter"]
+    second = climatology.sample_payload(1, START, seed=2)["properties"]["parameter"]
+    for name in ("T2M", "PRECTOTCORR", "TS"):
+        assert first[name] != second[name]
+        assert list(first[name]) == list(second[name]) # Mêmes dates
+
+
+def test_samples_follow_climatology(climatology):
+    history = _history()
+    num_days = len(history["T2M"])
+    samples = climatology.sample(num_days, START, seed=7, count=20)
+
+    wet_history = history["PRECTOTCORR"] > WET_DAY_THRESHOLD
+    wet_samples = samples["PRECTOTCORR"] > WET_DAY_THRESHOLD
+    assert np.mean(wet_samples) == pytest.approx(np.mean(wet_history), abs=0.02)
+    # Saison des pluies conservée mois par mois, lissage de la climatologie compris
+    assert np.abs(_monthly(wet_samples, num_days) - _monthly(wet_history, num_days)).max() < 0.12
+
+    assert np.abs(_monthly(samples["T2M"], num_days) - _monthly(history["T2M"], num_days)).max() < 1.0
+    assert np.abs(_monthly(samples["PRECTOTCORR"], num_days) - _monthly(history["PRECTOTCORR"], num_days)).max() < 1.0
+    assert np.mean(samples["TS"] - samples["T2M"]) == pytest.approx(2.0, abs=0.05)
+
+
+def test_wet_day_persistence_kept():
+    history = _history(wet_persistence=0.4)
+    climatology = Climatology.from_arrays(START, history)
+    assert climatology.wet_autocorrelation == pytest.approx(0.4, abs=0.05)
+
+    wet_history = history["PRECTOTCORR"] > WET_DAY_THRESHOLD
+    wet_samples = climatology.sample(len(wet_history), START, seed=5, count=20)["PRECTOTCORR"] > WET_DAY_THRESHOLD
+    assert np.mean(wet_samples) == pytest.approx(np.mean(wet_history), abs=0.02)
+    after_wet = np.sum(wet_samples[:, 1:] & wet_samples[:, :-1]) / np.sum(wet_samples[:, :-1])
+    assert after_wet == pytest.approx(np.sum(wet_history[1:] & wet_history[:-1]) / np.sum(wet_history[:-1]), abs=0.03)
+
+
+def test_payload_round_trip(climatology):
+    payload = climatology.sample_payload(1, START, seed=3)
+    start, arrays = payload_arrays([payload])
+    assert start == START and len(arrays["T2M"]) == DAYS_PER_YEAR
+    assert to_payload(arrays, start)["properties"] == payload["properties"]
+
+
+def test_unreadable_cache_files_are_skipped(tmp_path):
+    history = {name: values[:2 * DAYS_PER_YEAR] for name, values in _history().items()}
+    (tmp_path / "1.00_2.00_2015.json").write_text(
+        json.dumps(to_payload(history, START)), encoding="utf-8")
+    (tmp_path / "1.00_2.00_2017.json").write_bytes(b'{"properties": {"parameter": {"T2M": {"\xc3')
+    (tmp_path / "1.00_2.00_2018.json").write_text('{"properties": ', encoding="utf-8")
+    (tmp_path / "1.00_2.00_2019.json").mkdir() # Illisible comme fichier
+
+    payloads = cached_payloads(1.0, 2.0, str(tmp_path))
+    assert len(payloads) == 1
+    assert Climatology.from_cache(1.0, 2.0, str(tmp_path)) is not None
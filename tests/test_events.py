@@ -0,0 +1,64 @@
+import pygame
+
+from ui.events import EventDispatcher
+
+
+class _Widget:
+    def __init__(self, x, y, width=100, height=40):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.hovered = False
+
+
+def _motion(pos):
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+
+def _click(pos):
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1)
+
+
+def _menu():
+    """Menu réduit : un bouton principal et une liste modale fermée par son bouton 'Retour'."""
+    state = {"open": True}
+    events = EventDispatcher()
+    main_layer = events.layer()
+    slots_layer = events.layer(active=lambda: state["open"], modal=True)
+    main_button = main_layer.add(_Widget(0, 0))
+    close_button = slots_layer.add(_Widget(0, 0), lambda: state.update(open=False))
+    return events, state, slots_layer, main_button, close_button
+
+
+def test_click_closing_layer_moves_hover_to_widget_below():
+    events, state, _, main_button, close_button = _menu()
+    events.dispatch(_motion((10, 10)))
+    assert events.hovered is close_button and close_button.hovered
+
+    events.dispatch(_click((10, 10)))
+    assert not state["open"]
+    assert not close_button.hovered
+    assert events.hovered is main_button and main_button.hovered
+
+
+def test_layer_deactivated_elsewhere_drops_hover_on_next_event():
+    events, state, _, main_button, close_button = _menu()
+    events.dispatch(_motion((10, 10)))
+    state["open"] = False # Fermeture au clavier, hors du dispatcher
+    events.dispatch(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+    assert events.hovered is None and not close_button.hovered
+
+    # Réouverture sans mouvement de souris : le bouton n'est pas resté survolé
+    state["open"] = True
+    assert not close_button.hovered and not main_button.hovered
+
+
+def test_clear_resets_hover_of_its_widgets_only():
+    events, _, slots_layer, _, close_button = _menu()
+    events.dispatch(_motion((10, 10)))
+    slots_layer.clear()
+    assert events.hovered is None and not close_button.hovered
+
+    events, state, slots_layer, main_button, _ = _menu()
+    state["open"] = False
+    events.dispatch(_motion((10, 10)))
+    slots_layer.clear()
+    assert events.hovered is main_button and main_button.hovered
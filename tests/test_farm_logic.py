@@ -0,0 +1,95 @@
+import numpy as np
+
+from core.catalog import default_catalog
+from core.farm_logic import FarmLogic
+
+
+def _logic(seed=5, plots=6):
+    regions = default_catalog().regions
+    name = next(iter(regions))
+    logic = FarmLogic()
+    logic.setup_from_config({"plots": plots, "years": 1, "location": name, "region_data": regions[name], "seed": seed})
+    for i in range(plots - 1): # La dernière parcelle reste en jachère
+        logic.plant_action(i, logic.available_crops[i % len(logic.available_crops)])
+    return logic
+
+
+def _play(logic, days):
+    for _ in range(days):
+        logic.plots[0]["water_level"] = 100.0 # Parcelle noyée : risque de maladie chaque jour
+        logic.update_simulation()
+
+
+def test_seeded_runs_are_identical():
+    first, second = _logic(), _logic()
+    _play(first, 30)
+    _play(second, 30)
+    assert first.plots == second.plots
+    assert first.actions_taken == second.actions_taken
+    assert np.array_equal(first.history.farm[:, :len(first.history)], second.history.farm[:, :len(second.history)])
+    assert first.rng.random() == second.rng.random()
+
+
+def test_daily_update_per_plot():
+    logic = _logic()
+    soil_before = logic.plots[-1]["soil_quality"] = 0.5
+    _play(logic, 20)
+
+    drowned, fallow = logic.plots[0], logic.plots[-1]
+    assert drowned["disease"] == "Mildiou" and 0.1 < drowned["disease_severity"] <= 1.0
+    assert "event:disease_start" in logic.actions_taken
+    assert all(plot["age"] == 20 for plot in logic.plots[:-1]) and fallow["age"] == 0
+    assert fallow["progress"] == 0 and fallow["soil_quality"] > soil_before
+    assert all(0 <= plot["water_level"] <= 100 and 0 <= plot["progress"] <= 1 for plot in logic.plots)
+    assert all(isinstance(plot[key], float) for plot in logic.plots
+               for key in ("water_level", "soil_quality", "progress", "disease_severity"))
+
+
+def _game_state(logic):
+    days = len(logic.history)
+    return (logic.current_day, logic.money, logic.water_reserve, logic.sustainability_score, logic.food_harvested,
+            [dict(plot) for plot in logic.plots], list(logic.actions_taken),
+            logic.history.farm[:, :days].tolist(), logic.history.weather[:, :days].tolist(),
+            logic.history.plots[:, :days].tolist())
+
+
+def test_restore_then_simulate_matches_uninterrupted_run():
+    logic = _logic()
+    _play(logic, 8)
+    snapshot = logic.snapshot()
+    logic.simulate_days(15)
+    expected, expected_draw = _game_state(logic), logic.rng.random()
+
+    # Le même instantané peut être restauré plusieurs fois
+    for _ in range(2):
+        logic.restore(snapshot)
+        assert logic.current_day == 9 and len(logic.history) == 8
+        logic.simulate_days(15)
+        assert _game_state(logic) == expected
+        assert logic.rng.random() == expected_draw
+
+
+def test_fork_shares_no_mutable_state():
+    logic = _logic()
+    _play(logic, 8)
+    before = _game_state(logic)
+    clone = logic.fork()
+
+    assert clone.rng is not logic.rng and clone.history is not logic.history
+    assert not np.shares_memory(clone.history.farm, logic.history.farm)
+    assert not np.shares_memory(clone.history.weather, logic.history.weather)
+    assert not np.shares_memory(clone.history.plots, logic.history.plots)
+    assert all(a is not b for a, b in zip(clone.plots, logic.plots))
+    assert clone.actions_taken is not logic.actions_taken
+
+    clone.harvest_action(1)
+    clone.plots[2]["water_level"] = 0.0
+    clone.simulate_days(10)
+    assert _game_state(logic) == before
+
+    # Sans action différente, la copie et l'original évoluent à l'identique
+    twin = logic.fork()
+    logic.simulate_days(10)
+    twin.simulate_days(10)
+    assert _game_state(twin) == _game_state(logic)
+    assert twin.rng.random() == logic.rng.random()
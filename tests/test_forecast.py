@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from core.catalog import default_catalog
+from core.farm_logic import FarmLogic, logistic_growth_step
+from core.forecast import YieldForecaster
+
+
+def _logic(seed=3):
+    regions = default_catalog().regions
+    name = next(iter(regions))
+    logic = FarmLogic()
+    logic.setup_from_config({"plots": 4, "years": 1, "location": name, "region_data": regions[name], "seed": seed})
+    return logic
+
+
+@pytest.mark.parametrize("rate", [0.0, 0.05, 0.33, 0.8, 1.5])
+def test_logistic_step_matches_rk45(rate):
+    # L'ancien pas de croissance résolvait l'équation avec solve_ivp (RK45, tolérances par défaut)
+    solve_ivp = pytest.importorskip("scipy.integrate").solve_ivp
+    for progress in np.linspace(0.01, 0.99, 15):
+        solution = solve_ivp(lambda t, p: rate * p * (1 - p), [0, 1], [progress], method="RK45")
+        expected = np.clip(solution.y[0][-1], 0, 1.0)
+        assert logistic_growth_step(progress, rate) == pytest.approx(expected, abs=1e-3)
+
+
+def test_logistic_step_vectorized():
+    progress = np.array([0.0, 0.2, 0.5, 1.0])
+    rates = np.array([0.3, 0.3, 0.0, 0.3])
+    stepped = logistic_growth_step(progress, rates)
+    assert stepped.tolist() == [float(logistic_growth_step(p, r)) for p, r in zip(progress, rates)]
+    assert stepped[0] == 0.0 and stepped[2] == 0.5 and stepped[3] == 1.0
+
+
+def test_overwatered_plot_expects_disease():
+    logic = _logic()
+    crop = logic.available_crops[0]
+    logic.plant_action(0, crop)
+    logic.plant_action(1, crop)
+    max_water = logic.catalog.max_water_level[logic.catalog.crop_id(crop)]
+    logic.plots[0]["water_level"] = 100.0
+    logic.plots[1]["water_level"] = float(min(max_water - 30, logic.catalog.water_need[logic.catalog.crop_id(crop)]))
+
+    forecast = YieldForecaster(logic).forecast()
+    assert forecast["disease_severity"][1, 0] > 0
+    assert forecast["disease_severity"][1, 1] == 0
+    assert forecast["soil_quality"][1, 0] < logic.plots[0]["soil_quality"]
+
+
+def test_drain_is_credited_on_overwatered_plot():
+    logic = _logic()
+    logic.plant_action(0, logic.available_crops[0])
+    logic.plots[0]["progress"] = 0.5
+    logic.plots[0]["water_level"] = 100.0
+    logic.money = 0 # Seules les actions gratuites restent disponibles
+
+    ranking = YieldForecaster(logic).rank_actions()
+    assert ranking and ranking[0]["plot"] == 0 and ranking[0]["action"] == "drain"
+    assert ranking[0]["gain"] > 0
@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from core import nasa_api
+from core.nasa_api import PowerClient, get_nasa_power_data_chunked, merge_payloads, split_date_range
+
+PAYLOAD = {"properties": {"parameter": {"T2M": {"20240101": 21.5}}}}
+
+
+class StandInServer:
+    """Serveur local qui joue un scénario de réponses : "ok", "503", "slow" (dépasse le délai) ou "hold"."""
+
+    def __init__(self):
+        self.plan = []
+        self.hits = 0
+        self.release = threading.Event() # Débloque les réponses "hold"
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.hits += 1
+                mode = server.plan.pop(0) if server.plan else "ok"
+                if mode == "slow":
+                    time.sleep(0.5)
+                elif mode == "hold":
+                    server.release.wait(5)
+                if mode == "503":
+                    body, status = b"busy", 503
+                else:
+                    body, status = json.dumps(PAYLOAD).encode(), 200
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/temporal/daily/point"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.release.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.close()
+
+
+@pytest.fixture
+def client():
+    with PowerClient(read_timeout=0.2, max_retries=3, backoff=0, seed=42) as power_client:
+        yield power_client
+
+
+def test_retries_503_then_timeout(server, client):
+    server.plan = ["503", "slow", "ok"]
+    assert client.get_json(server.url, {"start": "20240101"}) == PAYLOAD
+    assert server.hits == 3
+
+    summary = client.metrics.summary()
+    assert summary["requests"] == 3
+    assert summary["retries"] == 2
+    assert summary["failures"] == 0
+    assert summary["coalesced"] == 0
+    assert summary["bytes_received"] == len(b"busy") + len(json.dumps(PAYLOAD))
+    assert summary["latency_p50"] <= summary["latency_p95"]
+
+
+def test_persistent_503_raises(server, client):
+    server.plan = ["503"] * 10
+    with pytest.raises(requests.HTTPError) as error:
+        client.get_json(server.url, {"start": "20240101"})
+    assert error.value.response.status_code == 503
+    assert server.hits == client.max_retries + 1
+
+    summary = client.metrics.summary()
+    assert summary["requests"] == 4
+    assert summary["retries"] == 3
+    assert summary["failures"] == 1
+    # L'appel abandonné ne reste pas "en cours" : un nouvel appel envoie une nouvelle requête
+    assert client._in_flight == {}
+    server.plan = []
+    assert client.get_json(server.url, {"start": "20240101"}) == PAYLOAD
+    assert server.hits == 5
+
+
+def test_timeout_failure_clears_in_flight(server, client):
+    server.plan = ["slow"] * 4
+    with pytest.raises(requests.Timeout):
+        client.get_json(server.url, {"start": "20240101"})
+    assert client._in_flight == {}
+    assert client.metrics.summary()["failures"] == 1
+
+
+def test_concurrent_calls_share_one_request(server, client):
+    server.plan = ["hold"]
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.get_json(server.url, {"start": "20240101"})))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    # Tous les appels attendent la même requête avant que le serveur ne réponde
+    deadline = time.monotonic() + 5
+    while client.metrics.summary()["coalesced"] < 9 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    server.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert server.hits == 1
+    assert len(results) == 10 and all(result is results[0] for result in results)
+    summary = client.metrics.summary()
+    assert summary["requests"] == 1
+    assert summary["coalesced"] == 9
+    assert client._in_flight == {}
+
+
+# --- Téléchargement découpé en années ---
+
+def _days(start, end):
+    first, last = datetime.strptime(start, "%Y%m%d"), datetime.strptime(end, "%Y%m%d")
+    return [(first + timedelta(days=d)).strftime("%Y%m%d") for d in range((last - first).days + 1)]
+
+
+class ChunkClient:
+    """Client de remplacement : une valeur par jour demandé ; échoue ou omet un jour pour les débuts donnés."""
+
+    def __init__(self, fail=(), truncate=()):
+        self.fail, self.truncate = set(fail), set(truncate)
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def get_json(self, url, params):
+        with self._lock:
+            self.requested.append((params["start"], params["end"]))
+        if params["start"] in self.fail:
+            raise requests.HTTPError(f"503 pour {params['start']}")
+        days = _days(params["start"], params["end"])
+        if params["start"] in self.truncate:
+            days = days[:-1]
+        return {"header": {"start": params["start"]}, "properties": {"parameter": {
+            name: {day: float(int(day) % 97) for day in days} for name in params["parameters"].split(",")
+        }}}
+
+
+@pytest.mark.parametrize("start, end, expected", [
+    ("20190315", "20210610", [("20190315", "20191231"), ("20200101", "20201231"), ("20210101", "20210610")]),
+    ("20200229", "20200301", [("20200229", "20200301")]),
+    ("20191231", "20200101", [("20191231", "20191231"), ("20200101", "20200101")]),
+    ("20240101", "20241231", [("20240101", "20241231")]),
+])
+def test_split_date_range(start, end, expected):
+    chunks = split_date_range(start, end)
+    assert chunks == expected
+    # Morceaux contigus, sans recouvrement, qui couvrent exactement la période (29 février compris)
+    assert sum((_days(*chunk) for chunk in chunks), []) == _days(start, end)
+
+
+def test_chunked_download_has_every_day_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(nasa_api, "default_cache_dir", lambda: str(tmp_path))
+    client = ChunkClient()
+    data = get_nasa_power_data_chunked(1.0, 2.0, "20190704", "20220115", "cle", client=client, max_workers=2)
+    assert sorted(client.requested) == split_date_range("20190704", "20220115")
+
+    expected = _days("20190704", "20220115")
+    for series in data["properties"]["parameter"].values():
+        assert list(series) == expected # Chaque jour une fois, dans l'ordre
+    assert "20200229" in data["properties"]["parameter"]["T2M"]
+    assert data["header"] == {"start": "20190704"}
+
+    # Deuxième appel : tout vient du cache
+    again = get_nasa_power_data_chunked(1.0, 2.0, "20190704", "20220115", "cle", client=ChunkClient(fail={"20200101"}))
+    assert again["properties"] == data["properties"]
+
+
+def test_merge_keeps_last_value_of_a_repeated_day():
+    first = {"properties": {"parameter": {"T2M": {"20200101": 1.0, "20200102": 2.0}}}}
+    second = {"properties": {"parameter": {"T2M": {"20200102": 3.0, "20200103": 4.0}}}}
+    assert merge_payloads([first, second])["properties"]["parameter"]["T2M"] == {
+        "20200101": 1.0, "20200102": 3.0, "20200103": 4.0}
+
+
+def test_failed_chunk_is_reported(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(nasa_api, "default_cache_dir", lambda: str(tmp_path))
+    client = ChunkClient(fail={"20200101"})
+    with pytest.raises(requests.HTTPError):
+        get_nasa_power_data_chunked(1.0, 2.0, "20190601", "20210301", "cle", client=client)
+    assert "du 20200101 au 20201231 en échec" in capsys.readouterr().out
+    # Les autres années ont été téléchargées et mises en cache
+    assert len(client.requested) == 3
+    assert sorted(os.listdir(tmp_path)) == ["1.00_2.00_20190601_20191231.json", "1.00_2.00_20210101_20210301.json"]
+
+
+def test_incomplete_chunk_is_rejected_and_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(nasa_api, "default_cache_dir", lambda: str(tmp_path))
+    with pytest.raises(ValueError, match="20201231"):
+        get_nasa_power_data_chunked(1.0, 2.0, "20190601", "20210301", "cle", client=ChunkClient(truncate={"20200101"}))
+    assert "1.00_2.00_20200101_20201231.json" not in os.listdir(tmp_path)
+
+    # Nouvel essai : seule l'année incomplète est redemandée
+    client = ChunkClient()
+    data = get_nasa_power_data_chunked(1.0, 2.0, "20190601", "20210301", "cle", client=client)
+    assert client.requested == [("20200101", "20201231")]
+    assert list(data["properties"]["parameter"]["TS"]) == _days("20190601", "20210301")
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from core.catalog import default_catalog
+from core.farm_logic import FarmLogic
+from core.policies import BUILTIN_POLICIES, CropRulePolicy, FarmState, run_policy
+
+
+def _config(seed=11, plots=4):
+    regions = default_catalog().regions
+    name = next(iter(regions))
+    return {"plots": plots, "years": 1, "location": name, "region_data": regions[name], "seed": seed}
+
+
+@pytest.mark.parametrize("name", sorted(BUILTIN_POLICIES))
+def test_seeded_run_is_reproducible(name):
+    policy = BUILTIN_POLICIES[name]
+    policy = policy if name == "greedy_harvest" else policy()
+    logic = FarmLogic()
+    first = run_policy(policy, _config(), logic=logic)
+    first_farm = first["history"].farm[:, :len(first["history"])].copy()
+    first_actions = list(first["actions_taken"])
+    first_money = first["final_money"]
+
+    # Même graine, même FarmLogic réutilisée (comme l'optimiseur) : partie identique
+    second = run_policy(policy, _config(), logic=logic)
+    assert second["final_money"] == first_money
+    assert second["actions_taken"] == first_actions
+    assert np.array_equal(second["history"].farm[:, :len(second["history"])], first_farm)
+
+
+def test_max_days_stops_early():
+    results = run_policy(CropRulePolicy(), _config(), max_days=10)
+    assert len(results["history"]) == 10
+
+
+def test_state_is_read_only():
+    logic = FarmLogic()
+    logic.setup_from_config(_config())
+    state = FarmState(logic)
+    for array in (state.progress, state.water_level, state.crop_id, state.crop_water_need):
+        with pytest.raises(ValueError):
+            array[0] = 1
+    # Les vues ne modifient pas la partie, et la partie ne modifie les vues qu'au refresh()
+    logic.plots[0]["water_level"] = 99.0
+    assert state.water_level[0] != 99.0
+    assert state.refresh(logic).water_level[0] == 99.0
+
+
+def test_state_refreshed_each_day():
+    seen = []
+
+    def policy(state):
+        seen.append((state, state.day, state.progress.copy(), state.crop_id.copy(), state.money))
+        return [("plant", 0, state.crop_names[state.available_crop_ids[0]])] if state.day == 1 else [("water", 0)]
+
+    logic = FarmLogic()
+    logic.setup_from_config(_config())
+    daily = []
+    original_update = logic.update_simulation
+
+    def update():
+        daily.append(([plot["progress"] for plot in logic.plots], logic.money))
+        original_update()
+
+    logic.update_simulation = update
+    run_policy(policy, logic=logic, max_days=6)
+
+    # Un seul objet, réécrit chaque jour avec l'état de la ferme au moment de la décision
+    assert all(state is seen[0][0] for state, *_ in seen)
+    assert [day for _, day, *_ in seen] == list(range(1, 7))
+    assert seen[0][3][0] == -1 and all(crop_id[0] >= 0 for *_, crop_id, _ in seen[1:])
+    for (_, _, progress, _, money), (plot_progress, logic_money) in zip(seen[1:], daily[1:]):
+        assert progress.tolist() == plot_progress
+        assert money == logic_money
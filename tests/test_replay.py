@@ -0,0 +1,155 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from core.catalog import default_catalog
+from core.farm_logic import FarmLogic
+from core.replay import REPLAY_FORMAT_VERSION, SessionRecorder, load_session, replay_session, weather_key
+
+
+def _payload(days=40):
+    dates = [f"2024{1 + i // 28:02d}{1 + i % 28:02d}" for i in range(days)]
+    return {"properties": {"parameter": {
+        "T2M": {day: 10.0 + (i % 15) for i, day in enumerate(dates)},
+        "PRECTOTCORR": {day: float(i % 4) for i, day in enumerate(dates)},
+    }}}
+
+
+def _config():
+    region = next(iter(default_catalog().regions))
+    return {
+        "plots": 4,
+        "years": 1,
+        "location": region,
+        "region_data": default_catalog().regions[region],
+        "nasa_weather_data": _payload(),
+        "start_date": datetime(2024, 1, 1),
+        "seed": 1234,
+    }
+
+
+def _play(config, recorder, days=25):
+    logic = FarmLogic()
+    logic.setup_from_config(config)
+    _play_days(logic, recorder, days)
+    recorder.finish(logic)
+    return logic
+
+
+def _play_days(logic, recorder, days):
+    """Comme l'écran de jeu : actions enregistrées, météo du jour lue avant chaque action."""
+    crops = logic.available_crops
+    for day in range(days):
+        logic.get_current_day_weather()
+        plot = day % len(logic.plots)
+        if logic.plots[plot]["crop"] is None:
+            if logic.plant_action(plot, crops[day % len(crops)]):
+                recorder.record(logic.current_day, "plant", plot, crops[day % len(crops)])
+        elif logic.water_action(plot):
+            recorder.record(logic.current_day, "water", plot)
+        logic.update_simulation()
+
+
+def test_header_is_compact(tmp_path):
+    config = _config()
+    recorder = SessionRecorder(config, path=str(tmp_path / "session.jsonl"), weather_dir=str(tmp_path / "weather"))
+    recorder.finish(FarmLogic())
+
+    header, _actions, _end = load_session(recorder.path)
+    assert header["version"] == REPLAY_FORMAT_VERSION
+    assert "config" not in header and "nasa_weather_data" not in header
+    assert header["region"] == config["location"] and header["seed"] == 1234
+    assert header["start_date"] == "2024-01-01T00:00:00"
+    assert header["weather_key"] == weather_key(config["nasa_weather_data"])
+    assert (tmp_path / "weather" / f"{header['weather_key']}.json").exists()
+
+
+def test_record_then_replay(tmp_path):
+    weather_dir = str(tmp_path / "weather")
+    recorder = SessionRecorder(_config(), path=str(tmp_path / "session.jsonl"), weather_dir=weather_dir)
+    logic = _play(_config(), recorder)
+    assert logic.actions_taken
+
+    report = replay_session(recorder.path, weather_dir=weather_dir)
+    assert report["matches"] is True, report["mismatches"]
+    assert report["end"]["money"] == logic.money
+
+
+def test_replay_detects_changed_weather(tmp_path):
+    weather_dir = tmp_path / "weather"
+    recorder = SessionRecorder(_config(), path=str(tmp_path / "session.jsonl"), weather_dir=str(weather_dir))
+    _play(_config(), recorder)
+
+    # Une météo altérée n'est pas utilisée : la partie rejouée diffère de l'originale
+    header, _actions, _end = load_session(recorder.path)
+    stored = weather_dir / f"{header['weather_key']}.json"
+    payload = json.loads(stored.read_text(encoding="utf-8"))
+    payload["properties"]["parameter"]["T2M"]["20240101"] = 40.0
+    stored.write_text(json.dumps(payload), encoding="utf-8")
+
+    report = replay_session(recorder.path, weather_dir=str(weather_dir))
+    assert report["matches"] is False
+
+
+def _resume(filepath):
+    """Comme GameInterface.load_save : recharge la sauvegarde et continue sa session."""
+    logic = FarmLogic()
+    assert logic.load_game(filepath)
+    recorder = SessionRecorder.resume(logic.resumed_from["session"], logic.current_day)
+    logic.session_recorder = recorder
+    return logic, recorder
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_resumed_session_replays_whole_game(tmp_path, incremental):
+    weather_dir = str(tmp_path / "weather")
+    filepath = str(tmp_path / "slot_1.json")
+    logic = FarmLogic()
+    logic.setup_from_config(_config())
+    recorder = SessionRecorder(_config(), path=str(tmp_path / "session.jsonl"), weather_dir=weather_dir)
+    logic.session_recorder = recorder
+    _play_days(logic, recorder, 6)
+    logic.save_game(filepath)
+    _play_days(logic, recorder, 3)
+    logic.save_game(filepath, incremental=incremental)
+    recorder.finish(logic) # Retour au menu
+
+    # Deuxième séance, puis arrêt brutal : les actions jouées après la sauvegarde sont perdues
+    logic, recorder = _resume(filepath)
+    assert recorder.path == str(tmp_path / "session.jsonl")
+    _play_days(logic, recorder, 8)
+    logic.save_game(filepath, incremental=incremental)
+    saved_day, saved_money = logic.current_day, logic.money
+    _play_days(logic, recorder, 5)
+    recorder.file.close()
+
+    logic, recorder = _resume(filepath)
+    assert (logic.current_day, logic.money) == (saved_day, saved_money)
+    _play_days(logic, recorder, 10)
+    recorder.finish(logic)
+
+    _header, actions, end = load_session(recorder.path)
+    assert len(actions) == recorder.actions and end["day"] == logic.current_day
+    report = replay_session(recorder.path, weather_dir=weather_dir)
+    assert report["matches"] is True, report["mismatches"]
+    assert report["results"]["actions_taken"] == logic.actions_taken
+
+
+def test_save_without_session_starts_partial_session(tmp_path):
+    filepath = str(tmp_path / "slot_1.json")
+    logic = FarmLogic()
+    logic.setup_from_config(_config())
+    logic.save_game(filepath) # Ancienne sauvegarde : aucune session notée
+
+    logic, recorder = _resume(filepath)
+    assert recorder is None
+    resumed_from = {"save_id": logic.resumed_from["save_id"], "day": logic.resumed_from["day"]}
+    recorder = SessionRecorder(logic.config, path=str(tmp_path / "partial.jsonl"),
+                               weather_dir=str(tmp_path / "weather"), resumed_from=resumed_from)
+    recorder.finish(logic)
+
+    header, _actions, _end = load_session(recorder.path)
+    assert header["resumed_from"]["save_id"] == logic.resumed_from["save_id"]
+    with pytest.raises(ValueError):
+        replay_session(recorder.path, weather_dir=str(tmp_path / "weather"))
@@ -0,0 +1,40 @@
+from core import optimizer
+from core.results_db import ResultsDatabase, run_in_background
+from core.scoring import MIN_SUSTAINABILITY, SUSTAINABILITY_PENALTY, score_run
+
+
+def _results(food=120.0, sustainability=80.0):
+    return {
+        "final_money": 900.0,
+        "final_water": 40.0,
+        "sustainability_score": sustainability,
+        "food_harvested": food,
+        "actions_taken": ["plant", "harvest"],
+        "config": {"location": "Kenya", "seed": 7, "plots": 4, "years": 1, "nasa_weather_data": {"big": True}},
+    }
+
+
+def test_score_run_shared_with_optimizer():
+    assert optimizer.score_run is score_run
+    assert score_run(100, MIN_SUSTAINABILITY) == 100
+    assert score_run(100, MIN_SUSTAINABILITY - 2) == 100 - 2 * SUSTAINABILITY_PENALTY
+
+
+def test_record_in_background(tmp_path):
+    path = str(tmp_path / "results.db")
+    done = {}
+    record = run_in_background(lambda database: database.record_run(_results()),
+                               lambda value, error: done.update(run_id=value, error=error), path=path)
+
+    # Les écritures enchaînées attendent la précédente
+    rename = run_in_background(lambda database: database.set_player(done["run_id"], "Awa"), path=path, after=record)
+    rename.join()
+    assert done["error"] is None
+
+    database = ResultsDatabase(path)
+    run = database.get_run(done["run_id"])
+    database.close()
+    assert run["player"] == "Awa" and run["region"] == "Kenya"
+    assert run["score"] == score_run(120.0, 80.0)
+    assert "nasa_weather_data" not in run["config"]
+
@@ -0,0 +1,198 @@
+import json
+import os
+
+import pytest
+
+from core import savegame
+from core.catalog import default_catalog
+from core.farm_logic import FarmLogic
+from core.savegame import (NUM_SLOTS, flush_saves, free_slot_path, journal_path, json_serializer, list_slots,
+                           needs_full_save, read_journal, slot_path, state_from_snapshot)
+
+
+def _logic(seed=1, plots=4):
+    regions = default_catalog().regions
+    name = next(iter(regions))
+    logic = FarmLogic()
+    logic.setup_from_config({"plots": plots, "years": 1, "location": name, "region_data": regions[name], "seed": seed})
+    return logic
+
+
+def test_free_slot_path_never_picks_an_occupied_slot(tmp_path):
+    directory = str(tmp_path)
+    assert free_slot_path(directory) == slot_path(1, directory)
+    _logic().save_game(slot_path(1, directory))
+    _logic().save_game(slot_path(3, directory))
+    assert free_slot_path(directory) == slot_path(2, directory)
+
+    _logic().save_game(slot_path(2, directory))
+    assert len(list_slots(directory)) == NUM_SLOTS
+    assert free_slot_path(directory) is None
+
+
+def _play(logic, days, plot=0):
+    crop = logic.available_crops[0]
+    for _ in range(days):
+        if logic.plots[plot]["crop"] is None:
+            logic.plant_action(plot, crop)
+        else:
+            logic.water_action(plot)
+        logic.update_simulation()
+
+
+def _state(logic):
+    state = state_from_snapshot(logic.snapshot(), None)
+    return json.dumps(state, sort_keys=True, default=json_serializer)
+
+
+def _loaded(filepath):
+    logic = FarmLogic()
+    assert logic.load_game(filepath)
+    return logic
+
+
+def test_base_and_journal_round_trip(tmp_path):
+    filepath = str(tmp_path / "slot_1.json")
+    logic = _logic()
+    _play(logic, 3)
+    logic.save_game(filepath)
+    for day in range(3):
+        _play(logic, 2, plot=day + 1)
+        logic.save_game(filepath, incremental=True)
+
+    assert len(read_journal(filepath, logic._save_marks[filepath]["save_id"])) == 3
+    with open(filepath, encoding="utf-8") as f:
+        base = json.load(f)
+    assert "history" in base and "daily_yields" not in base and "daily_soil_quality" not in base
+    assert _state(_loaded(filepath)) == _state(logic)
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    filepath = str(tmp_path / "slot_1.json")
+    logic = _logic()
+    _play(logic, 3)
+    logic.save_game(filepath)
+    _play(logic, 2)
+    logic.save_game(filepath, incremental=True)
+    expected = _state(logic)
+
+    # Arrêt brutal pendant l'ajout suivant : la dernière ligne est incomplète
+    _play(logic, 2)
+    logic.save_game(filepath, incremental=True)
+    with open(journal_path(filepath), "rb+") as f:
+        f.truncate(os.path.getsize(journal_path(filepath)) - 20)
+    reloaded = _loaded(filepath)
+    assert _state(reloaded) == expected
+
+    # Le journal reste utilisable après la ligne interrompue
+    _play(reloaded, 2)
+    reloaded.save_game(filepath, incremental=True)
+    assert _state(_loaded(filepath)) == _state(reloaded)
+
+
+def test_journal_of_another_save_is_ignored(tmp_path):
+    filepath = str(tmp_path / "slot_1.json")
+    logic = _logic()
+    _play(logic, 3)
+    logic.save_game(filepath)
+    expected = _state(logic)
+    _play(logic, 2)
+    logic.save_game(filepath, incremental=True)
+
+    with open(filepath, encoding="utf-8") as f:
+        base = json.load(f)
+    base["save_id"] = "autre-sauvegarde"
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(base, f)
+    assert _state(_loaded(filepath)) == expected
+
+
+def test_failed_background_write_forces_full_save(tmp_path, monkeypatch):
+    filepath = str(tmp_path / "slot_1.json")
+    logic = _logic()
+    _play(logic, 3)
+    logic.save_game(filepath)
+
+    def failing_append(*args, **kwargs):
+        raise OSError("disque plein")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(savegame, "append_delta", failing_append)
+        _play(logic, 2)
+        logic.save_game(filepath, background=True, incremental=True)
+        flush_saves()
+    assert needs_full_save(filepath)
+
+    # La sauvegarde suivante est complète, le journal disparaît
+    _play(logic, 2)
+    logic.save_game(filepath, background=True, incremental=True)
+    flush_saves()
+    assert not needs_full_save(filepath)
+    assert not os.path.exists(journal_path(filepath))
+    assert _state(_loaded(filepath)) == _state(logic)
+
+
+def test_failed_direct_write_keeps_mark(tmp_path, monkeypatch):
+    filepath = str(tmp_path / "slot_1.json")
+    logic = _logic()
+    _play(logic, 3)
+    logic.save_game(filepath)
+    mark = dict(logic._save_marks[filepath])
+
+    def failing_append(*args, **kwargs):
+        raise OSError("disque plein")
+
+    _play(logic, 2)
+    monkeypatch.setattr("core.farm_logic.append_delta", failing_append)
+    with pytest.raises(OSError):
+        logic.save_game(filepath, incremental=True)
+    assert logic._save_marks[filepath] == mark
+
+    # Le prochain ajout reprend depuis le repère : aucun jour ne manque au journal
+    monkeypatch.undo()
+    logic.save_game(filepath, incremental=True)
+    assert _state(_loaded(filepath)) == _state(logic)
+
+
+def _drowned(logic, days):
+    """Parcelles noyées : tirages de maladie chaque jour ; la météo du jour est lue comme par l'écran de jeu."""
+    for _ in range(days):
+        logic.get_current_day_weather()
+        for index, plot in enumerate(logic.plots):
+            if plot["crop"] is None:
+                logic.plant_action(index, logic.available_crops[0])
+            plot["water_level"] = 100.0
+        logic.update_simulation()
+    logic.get_current_day_weather()
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_reload_continues_random_stream(tmp_path, incremental):
+    filepath = str(tmp_path / "slot_1.json")
+    uninterrupted, saved = _logic(seed=7), _logic(seed=7)
+    _drowned(uninterrupted, 12)
+    _drowned(saved, 6)
+    saved.save_game(filepath)
+    _drowned(saved, 6)
+    saved.save_game(filepath, incremental=incremental)
+
+    reloaded = _loaded(filepath)
+    assert _state(reloaded) == _state(uninterrupted)
+    assert reloaded.rng.getstate() != _logic(seed=7).rng.getstate() # Pas de retour au tirage du jour 1
+    _drowned(uninterrupted, 25)
+    _drowned(reloaded, 25)
+    assert _state(reloaded) == _state(uninterrupted)
+
+
+def test_old_save_without_rng_state_is_reseeded(tmp_path):
+    filepath = str(tmp_path / "slot_1.json")
+    logic = _logic(seed=7)
+    _play(logic, 3)
+    logic.save_game(filepath)
+    with open(filepath, encoding="utf-8") as f:
+        base = json.load(f)
+    del base["rng_state"], base["weather_cache"]
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(base, f)
+
+    assert _loaded(filepath).rng.random() == _logic(seed=7).rng.random()
@@ -0,0 +1,76 @@
+from core.catalog import Catalog, default_catalog
+from core.farm_logic import FarmLogic
+from core.seasons import SEASON_DEFAULTS, SeasonCalendar
+
+SEASONS = {
+    "Printemps": {"temp_offset": 0, "precip_factor": 1.0, "growth_factor": 1.1, "icon": "🌱"},
+    "Été": {"temp_offset": 8, "precip_factor": 0.5, "growth_factor": 1.0, "icon": "☀️"},
+}
+
+
+def _region(**extra):
+    return dict({"season_cycle": ["Printemps", "Été", "Mousson"], "season_durations": [3, 4, 5]}, **extra)
+
+
+def test_effects_by_season():
+    calendar = SeasonCalendar(_region(seasons=SEASONS), num_years=2)
+    assert calendar.names == ["Printemps", "Été", "Mousson"] * 2
+    assert calendar.modifiers(1) == (8, 0.5, 1.0)
+    assert calendar.icon(4) == "☀️"
+    # Saison absente de la table
+    assert calendar.modifiers(2) == (SEASON_DEFAULTS["temp_offset"], SEASON_DEFAULTS["precip_factor"],
+                                     SEASON_DEFAULTS["growth_factor"])
+    assert calendar.icon(2) == SEASON_DEFAULTS["icon"]
+
+
+def test_region_table_overrides_shared_table_field_by_field():
+    overrides = {"Été": {"precip_factor": 0.1}, "Mousson": {"growth_factor": 1.4}}
+    region = Catalog({}, {"R": _region(seasons=overrides)}, SEASONS).regions["R"]
+    calendar = SeasonCalendar(region)
+    assert calendar.modifiers(0) == (0, 1.0, 1.1)
+    assert calendar.modifiers(1) == (8, 0.1, 1.0) and calendar.icon(1) == "☀️"
+    assert calendar.modifiers(2) == (SEASON_DEFAULTS["temp_offset"], SEASON_DEFAULTS["precip_factor"], 1.4)
+    # La table commune n'est pas modifiée par les corrections d'une région
+    assert SEASONS["Été"]["precip_factor"] == 0.5
+
+
+def test_invalid_season_fields_are_ignored(capsys):
+    shared = {"Été": {"temp_offset": "chaud", "growth_factor": 0.7, "pluie": 2}, "Hiver": 3}
+    catalog = Catalog({}, {"R": _region()}, shared)
+    assert catalog.seasons == {"Été": {"growth_factor": 0.7}}
+    assert catalog.regions["R"]["seasons"]["Été"] == {"growth_factor": 0.7}
+    assert SeasonCalendar(catalog.regions["R"]).modifiers(1) == (SEASON_DEFAULTS["temp_offset"],
+                                                                 SEASON_DEFAULTS["precip_factor"], 0.7)
+    output = capsys.readouterr().out
+    assert "seasons.Été.temp_offset" in output and "seasons.Hiver" in output
+    assert "saison 'Mousson'" in output
+
+
+def test_day_to_season():
+    calendar = SeasonCalendar(_region(), num_years=1)
+    assert [calendar.season_index(day) for day in (0, 1, 3, 4, 7, 8, 12, 50)] == [0, 0, 0, 1, 1, 2, 2, 2]
+    assert calendar.season_indices([0, 4, 100]).tolist() == [0, 1, 2]
+    assert calendar.max_days == 12
+
+
+def test_project_regions_use_season_table():
+    catalog = default_catalog()
+    assert "seasons" not in catalog.regions
+    for region in catalog.regions.values():
+        calendar = SeasonCalendar(region)
+        for index, name in enumerate(calendar.names):
+            assert set(catalog.seasons[name]) == set(SEASON_DEFAULTS)
+            assert calendar.icon(index) == catalog.seasons[name]["icon"]
+            assert calendar.modifiers(index) == tuple(catalog.seasons[name][key]
+                                                      for key in ("temp_offset", "precip_factor", "growth_factor"))
+
+
+def test_config_without_seasons_uses_catalog_table():
+    regions = default_catalog().regions
+    name = next(iter(regions))
+    old_region = {key: value for key, value in regions[name].items() if key != "seasons"}
+    logic = FarmLogic()
+    logic.setup_from_config({"plots": 2, "years": 1, "location": name, "region_data": old_region, "seed": 1})
+    expected = SeasonCalendar(regions[name])
+    assert [logic.calendar.modifiers(i) for i in range(len(logic.seasons))] == \
+        [expected.modifiers(i) for i in range(len(expected.names))]
@@ -0,0 +1,80 @@
+import numpy as np
+
+from core.timeseries import FARM_CHANNELS, PLOT_CHANNELS, WEATHER_CONDITIONS, FarmTimeSeries
+
+
+def _record_days(series, days, num_plots=3, first=0):
+    conditions = WEATHER_CONDITIONS + ("inconnue",)
+    for day in range(first, first + days):
+        totals = [day * 10 + row for row in range(len(FARM_CHANNELS))]
+        weather = {"temp": 15.0 + day, "precip": day % 4, "condition": conditions[day % len(conditions)]}
+        if day % 5 == 0:
+            weather["soil_temp"] = 9.5 # Sinon la température de l'air
+        plots = [{channel: day * 100 + plot * 10 + row for row, channel in enumerate(PLOT_CHANNELS)}
+                 for plot in range(num_plots)]
+        series.record(totals, weather, plots)
+
+
+def _assert_same(series, other):
+    days = len(series)
+    assert len(other) == days
+    assert np.array_equal(other.farm[:, :days], series.farm[:, :days])
+    assert np.array_equal(other.weather[:, :days], series.weather[:, :days])
+    assert other.condition_names() == series.condition_names()
+    assert np.array_equal(other.plots[:, :days], series.plots[:, :days])
+
+
+def test_grow_keeps_recorded_days():
+    series = FarmTimeSeries(max_days=4, num_plots=3)
+    _record_days(series, 11)
+    assert len(series) == 11 and series.capacity >= 11
+    assert series.column("money").tolist() == [day * 10 + 2 for day in range(11)]
+    assert series.column("soil_temp")[:6].tolist() == [9.5, 16.0, 17.0, 18.0, 19.0, 9.5]
+    assert series.plot_channel("water_level").shape == (11, 3)
+    assert series.plot_channel("water_level")[10].tolist() == [1001, 1011, 1021]
+    assert series.condition_names()[6] is None # Condition inconnue
+    # Les jours non enregistrés restent inconnus
+    assert np.isnan(series.farm[:, 11:]).all()
+
+
+def test_to_dict_round_trip_past_capacity():
+    series = FarmTimeSeries(max_days=5, num_plots=3)
+    _record_days(series, 17)
+
+    # Rechargement complet dans un historique plus petit que la partie
+    reloaded = FarmTimeSeries(max_days=5, num_plots=3)
+    reloaded.load_dict(series.to_dict())
+    _assert_same(series, reloaded)
+
+    # Rechargement par morceaux (sauvegarde complète puis journal), chacun au-delà de la capacité
+    base = FarmTimeSeries(max_days=5, num_plots=3)
+    _record_days(base, 7)
+    pieces = FarmTimeSeries(max_days=5, num_plots=3)
+    pieces.load_dict(base.to_dict())
+    pieces.load_dict(series.to_dict(7), start=7)
+    pieces.load_dict(series.to_dict(12), start=12)
+    _assert_same(series, pieces)
+
+    # Un morceau rechargé une seconde fois (journal rejoué) ne décale rien
+    pieces.load_dict(series.to_dict(12), start=12)
+    _assert_same(series, pieces)
+
+
+def test_load_dict_without_plot_channels():
+    series = FarmTimeSeries(max_days=3, num_plots=2)
+    _record_days(series, 6, num_plots=2)
+    data = series.to_dict()
+    del data["plots"]
+    reloaded = FarmTimeSeries(max_days=3, num_plots=2)
+    reloaded.load_dict(data)
+    assert np.array_equal(reloaded.farm[:, :6], series.farm[:, :6])
+    assert np.isnan(reloaded.plot_channel("progress")).all()
+
+
+def test_copy_is_independent():
+    series = FarmTimeSeries(max_days=3, num_plots=2)
+    _record_days(series, 2, num_plots=2)
+    clone = series.copy()
+    _record_days(clone, 4, num_plots=2, first=2)
+    assert len(series) == 2 and series.capacity == 3
+    assert series.column("money").tolist() == [2, 12]
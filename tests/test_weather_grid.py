@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from core.weather_grid import MISSING_VALUE, WeatherGrid, _bracket, find_cached_point_data
+
+PARAMETERS = ["T2M", "PRECTOTCORR"]
+LATS = [10.0, 10.5]
+LONS = [20.0, 20.5, 21.0]
+START = datetime(2023, 1, 1)
+NUM_DAYS = 6
+
+
+def _temperature(day, lat, lon):
+    # Fonction affine : l'interpolation bilinéaire la retrouve exactement
+    return day + 2 * (lat - 10) + 4 * (lon - 20)
+
+
+def _payload(missing=()):
+    """Réponse régionale (GeoJSON) ; `missing` : (jour, lat, lon) à -999."""
+    features = []
+    for lat in LATS:
+        for lon in LONS:
+            dates = [(START + timedelta(days=d)).strftime("%Y%m%d") for d in range(NUM_DAYS)]
+            temperature = {date: (MISSING_VALUE if (d, lat, lon) in missing else _temperature(d, lat, lon))
+                           for d, date in enumerate(dates)}
+            features.append({
+                "geometry": {"coordinates": [lon, lat, 0]},
+                "properties": {"parameter": {"T2M": temperature, "PRECTOTCORR": {date: 1.5 for date in dates}}},
+            })
+    return {"features": features}
+
+
+@pytest.fixture
+def grid(tmp_path):
+    return WeatherGrid.from_regional_payload(_payload(missing={(2, 10.0, 20.0)}), PARAMETERS).save(
+        "fixture", str(tmp_path))
+
+
+def test_saved_grid_is_memmapped(grid, tmp_path):
+    assert isinstance(grid.values, np.memmap)
+    assert grid.values.shape == (len(PARAMETERS), NUM_DAYS, len(LATS), len(LONS))
+    assert grid.path == str(tmp_path / "fixture.json")
+    reopened = WeatherGrid.open(grid.path)
+    assert isinstance(reopened.values, np.memmap)
+    assert reopened.start_date == START and reopened.end_date == START + timedelta(days=NUM_DAYS - 1)
+    assert reopened.lats.tolist() == LATS and reopened.lons.tolist() == LONS
+    assert np.isnan(reopened.values[0, 2, 0, 0])
+
+
+def test_interpolate_on_nodes(grid):
+    days = np.arange(NUM_DAYS)
+    for lat in LATS:
+        for lon in LONS:
+            series = grid.interpolate(lat, lon)
+            if (lat, lon) == (10.0, 20.0):
+                assert np.isnan(series["T2M"][2])
+                days_known = days != 2
+            else:
+                days_known = days >= 0
+            assert np.allclose(series["T2M"][days_known], _temperature(days[days_known], lat, lon))
+            assert np.allclose(series["PRECTOTCORR"], 1.5)
+
+
+def test_interpolate_midpoint(grid):
+    series = grid.interpolate(10.25, 20.75, ["T2M"])
+    assert list(series) == ["T2M"]
+    assert np.allclose(series["T2M"], _temperature(np.arange(NUM_DAYS), 10.25, 20.75))
+
+
+def test_interpolate_renormalizes_missing_neighbour(grid):
+    # Le jour 2, le coin (10.0, 20.0) manque : moyenne pondérée des trois autres
+    value = grid.interpolate(10.25, 20.25, ["T2M"])["T2M"][2]
+    others = [_temperature(2, 10.0, 20.5), _temperature(2, 10.5, 20.0), _temperature(2, 10.5, 20.5)]
+    assert value == pytest.approx(np.mean(others))
+    # Les autres jours, les quatre coins comptent
+    assert grid.interpolate(10.25, 20.25, ["T2M"])["T2M"][3] == pytest.approx(_temperature(3, 10.25, 20.25))
+
+
+def test_bracket_clamps_to_edges():
+    coords = np.array(LONS)
+    assert _bracket(coords, 19.0) == (0, 1, 0.0)
+    assert _bracket(coords, 22.0) == (1, 2, 1.0)
+    assert _bracket(coords, 20.75) == (1, 2, 0.5)
+    assert _bracket(np.array([5.0]), 7.0) == (0, 0, 0.0)
+
+
+def test_interpolate_outside_uses_edge(grid):
+    series = grid.interpolate(12.0, 25.0, ["T2M"])["T2M"]
+    assert np.allclose(series, _temperature(np.arange(NUM_DAYS), 10.5, 21.0))
+
+
+def test_point_payload_missing_round_trip(grid):
+    payload = grid.point_payload(10.0, 20.0)
+    temperature = payload["properties"]["parameter"]["T2M"]
+    assert len(temperature) == NUM_DAYS
+    assert temperature["20230103"] == MISSING_VALUE
+    assert temperature["20230104"] == pytest.approx(_temperature(3, 10.0, 20.0))
+
+    # Une grille reconstruite depuis cette réponse retrouve le NaN
+    feature = dict(payload, geometry={"coordinates": [20.0, 10.0]})
+    rebuilt = WeatherGrid.from_regional_payload({"features": [feature]}, PARAMETERS)
+    assert np.isnan(rebuilt.values[0, 2, 0, 0])
+    assert rebuilt.values[0, 3, 0, 0] == pytest.approx(_temperature(3, 10.0, 20.0))
+
+
+def test_point_payload_window(grid):
+    payload = grid.point_payload(10.5, 21.0, "20230102", "20230104")
+    assert list(payload["properties"]["parameter"]["T2M"]) == ["20230102", "20230103", "20230104"]
+
+
+def test_find_cached_point_data(grid, tmp_path):
+    directory = str(tmp_path)
+    data, start_date = find_cached_point_data(10.2, 20.3, num_days=4, directory=directory)
+    assert start_date == START + timedelta(days=NUM_DAYS - 4)
+    assert list(data["properties"]["parameter"]["T2M"]) == [
+        (start_date + timedelta(days=d)).strftime("%Y%m%d") for d in range(4)]
+
+    # Point hors de la grille, période plus longue que la grille, dossier vide
+    assert find_cached_point_data(11.0, 20.3, num_days=4, directory=directory) == (None, None)
+    assert find_cached_point_data(10.2, 20.3, num_days=NUM_DAYS + 1, directory=directory) == (None, None)
+    assert find_cached_point_data(10.2, 20.3, directory=str(tmp_path / "vide")) == (None, None)
@@ -0,0 +1,166 @@
+"""
+Paquet d'images pré-décodées (assets/assets.bundle).
+
+Les emojis et les stades de croissance des cultures sont décodés et
+redimensionnés une fois pour toutes, aux tailles utilisées par le jeu, et
+rangés dans un seul fichier :
+- en-tête : "FNAB", version, taille de l'index (struct "<4sII") ;
+- index JSON : clé -> [position, largeur, hauteur] ;
+- pixels RGBA bruts, à la suite (alignés sur 16 octets).
+
+Au lancement, le fichier est ouvert en mémoire partagée (mmap) : une image est
+une vue sur ses pixels, transformée en Surface sans lecture de fichier ni
+décodage PNG. Les images absentes du paquet (ou le paquet entier, s'il n'a pas
+été construit) sont lues depuis les fichiers PNG, comme pendant le développement.
+
+Construction :
+    python -m ui.asset_bundle
+"""
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+MAGIC = b"FNAB"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+ALIGNMENT = 16
+
+
+def default_bundle_path():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "assets", "assets.bundle")
+
+
+def crop_key(crop, stage, box):
+    return f"crop/{crop}/{stage}/{box[0]}x{box[1]}"
+
+
+def emoji_key(char, size):
+    return f"emoji/{hex(ord(char))[2:]}/{size}"
+
+
+class AssetBundle:
+    """Paquet ouvert en lecture (mmap). Les Surfaces retournées partagent la mémoire du fichier."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} n'est pas un paquet d'images valide (version {VERSION} attendue)")
+        index_end = HEADER.size + index_length
+        self.entries = json.loads(self._mmap[HEADER.size:index_end].decode("utf-8"))
+        self._data_start = _align(index_end)
+        self._view = memoryview(self._mmap)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def surface(self, key):
+        """Surface RGBA d'une image du paquet (vue sur le fichier, sans copie), ou None si absente."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        offset, width, height = entry
+        start = self._data_start + offset
+        return pygame.image.frombuffer(self._view[start:start + width * height * 4], (width, height), "RGBA")
+
+
+_bundle = None
+_bundle_loaded = False
+
+
+def default_bundle():
+    """Le paquet assets/assets.bundle (ouvert au premier appel), ou None s'il n'existe pas."""
+    global _bundle, _bundle_loaded
+    if not _bundle_loaded:
+        _bundle_loaded = True
+        path = default_bundle_path()
+        if os.path.exists(path):
+            try:
+                _bundle = AssetBundle(path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"AVERTISSEMENT: Paquet d'images ignoré ({e}). Lecture des fichiers PNG.")
+    return _bundle
+
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_bundle(images, path):
+    """Écrit un paquet à partir d'un dictionnaire clé -> Surface."""
+    entries = {}
+    chunks = []
+    offset = 0
+    for key, image in images.items():
+        pixels = pygame.image.tobytes(image, "RGBA")
+        entries[key] = [offset, image.get_width(), image.get_height()]
+        padding = _align(len(pixels)) - len(pixels)
+        chunks.append(pixels + b"\0" * padding)
+        offset += len(pixels) + padding
+
+    index = json.dumps(entries, ensure_ascii=False).encode("utf-8")
+    header = HEADER.pack(MAGIC, VERSION, len(index))
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(header + index)
+        f.write(b"\0" * (_align(len(header) + len(index)) - len(header) - len(index)))
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, path)
+    return path
+
+
+def build_bundle(path=None):
+    """
+    Décode tous les emojis et les stades de croissance de toutes les cultures, aux tailles
+    utilisées par le jeu (polices préchargées et cartes de parcelles), et écrit le paquet.
+    Nécessite pygame.init() et une fenêtre (pour les polices).
+    """
+    from .assets import CROP_STAGES, GAME_CARD_SIZES, crop_image_box, images_dir, load_crop_file
+    from .widgets import emoji_chars, emoji_sizes, get_font, load_emoji_file, preload_fonts
+
+    preload_fonts()
+    for _, card_height in GAME_CARD_SIZES:
+        # Polices des cartes (voir CropCard) : leurs emojis sont aussi empaquetés
+        get_font(int(card_height / 9.5))
+        get_font(int(card_height / 8))
+
+    images = {}
+    for char in emoji_chars():
+        for size in emoji_sizes():
+            image = load_emoji_file(char, size)
+            if image:
+                images[emoji_key(char, size)] = image
+
+    crops = sorted(name for name in os.listdir(images_dir()) if os.path.isdir(os.path.join(images_dir(), name)))
+    for card_width, card_height in GAME_CARD_SIZES:
+        box = crop_image_box(card_width, card_height)
+        for crop in crops:
+            for stage in range(CROP_STAGES):
+                image = load_crop_file(crop, stage, box)
+                if image:
+                    images[crop_key(crop, stage, box)] = image
+
+    return write_bundle(images, path or default_bundle_path()), len(images)
+
+
+if __name__ == "__main__":
+    import time
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    start = time.perf_counter()
+    bundle_path, count = build_bundle()
+    print(f"{count} images empaquetées dans {bundle_path} "
+          f"({os.path.getsize(bundle_path) / 1e6:.1f} Mo, {time.perf_counter() - start:.1f} s)")
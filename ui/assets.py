@@ -0,0 +1,187 @@
+"""
+Préchargement des images du jeu : emojis et stades de croissance des cultures.
+
+Les fichiers PNG sont décodés et redimensionnés dans des threads, puis le thread
+principal les convertit au format de l'écran et les range en cache (poll()).
+Une fois le préchargement terminé, plus aucune image n'est lue sur le disque
+pendant le dessin d'une image du jeu. Si le paquet assets/assets.bundle a été
+construit (voir asset_bundle.py), les images y sont prises directement, sans
+décodage ; les fichiers PNG ne servent que pour celles qui n'y sont pas.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from .asset_bundle import crop_key, default_bundle
+from .constants import WHITE, GRAY_DARK, GRAY_LIGHT, GREEN_PRIMARY
+from .widgets import cache_emoji_image, emoji_chars, emoji_sizes, get_font, load_emoji_image
+
+CROP_STAGES = 5  # Images <culture>_0.png à <culture>_4.png
+# Tailles (largeur, hauteur) des cartes de parcelles, voir GameInterface.generate_crop_cards_from_logic()
+GAME_CARD_SIZES = [(200, 200 * 1.1), (150, 150 * 1.1)]
+
+# (culture, stade, (largeur max, hauteur max)) -> Surface, ou None si l'image n'existe pas
+_crop_images = {}
+
+
+def images_dir():
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(project_root, "assets", "images")
+
+
+def crop_image_path(crop, stage):
+    return os.path.join(images_dir(), crop, f"{crop}_{stage}.png")
+
+
+def crop_image_box(width, height):
+    """Place disponible pour l'image d'une culture sur une carte de cette taille."""
+    return int(width * 0.7), int(height * 0.5)
+
+
+def load_crop_image(crop, stage, box):
+    """
+    Image de culture réduite pour tenir dans `box`, prise dans le paquet d'images s'il la
+    contient, sinon lue depuis le fichier PNG. Sans cache ni conversion (utilisable depuis
+    un thread). None si l'image n'existe pas.
+    """
+    bundle = default_bundle()
+    if bundle and crop_key(crop, stage, box) in bundle:
+        return bundle.surface(crop_key(crop, stage, box))
+    return load_crop_file(crop, stage, box)
+
+
+def load_crop_file(crop, stage, box):
+    """Lit le fichier PNG d'une image de culture et la réduit pour tenir dans `box` (proportions gardées)."""
+    path = crop_image_path(crop, stage)
+    if not os.path.exists(path):
+        return None
+    try:
+        image = pygame.image.load(path)
+    except pygame.error as e:
+        print(f"Erreur de chargement de l'image {path}: {e}")
+        return None
+    img_width, img_height = image.get_size()
+    scale = min(box[0] / img_width, box[1] / img_height) if img_width > 0 and img_height > 0 else 1
+    new_size = (int(img_width * scale), int(img_height * scale))
+    try:
+        return pygame.transform.smoothscale(image, new_size)
+    except ValueError:
+        # Images en palette (8 bits) : pas de lissage possible
+        return pygame.transform.scale(image, new_size)
+
+
+def cache_crop_image(crop, stage, box, image):
+    """Convertit (thread principal) et met en cache une image de culture."""
+    _crop_images[(crop, stage, box)] = image.convert_alpha() if image else None
+
+
+def get_crop_image(crop, stage, box):
+    """Image de culture en cache (préchargée), ou chargée immédiatement au premier appel."""
+    key = (crop, stage, box)
+    if key not in _crop_images:
+        cache_crop_image(crop, stage, box, load_crop_image(crop, stage, box))
+    return _crop_images[key]
+
+
+class AssetPreloader:
+    """
+    File d'images à précharger.
+
+    Chaque tâche est un couple (load, store) : load() s'exécute dans un thread et
+    retourne une Surface (ou None), store(image) la range en cache depuis le thread
+    principal, lors d'un appel à poll().
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.total = 0
+        self.completed = 0
+        self._jobs = []
+        self._pending = []
+
+    def add(self, load, store):
+        self._jobs.append((load, store))
+
+    def add_emojis(self, sizes=None):
+        """Tous les emojis disponibles, aux tailles des polices chargées (par défaut)."""
+        for size in sizes or emoji_sizes():
+            for char in emoji_chars():
+                self.add(lambda c=char, s=size: load_emoji_image(c, s),
+                         lambda image, c=char, s=size: cache_emoji_image(c, s, image))
+
+    def add_crops(self, crops, box):
+        """Tous les stades de croissance des cultures données, pour une taille de carte."""
+        for crop in crops:
+            for stage in range(CROP_STAGES):
+                if (crop, stage, box) in _crop_images:
+                    continue
+                self.add(lambda c=crop, st=stage: load_crop_image(c, st, box),
+                         lambda image, c=crop, st=stage: cache_crop_image(c, st, box, image))
+
+    def start(self):
+        """Lance le décodage des images dans les threads."""
+        self.total += len(self._jobs)
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending += [(executor.submit(load), store) for load, store in self._jobs]
+        self._jobs = []
+        executor.shutdown(wait=False)
+        return self
+
+    @property
+    def progress(self):
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def done(self):
+        return not self._jobs and not self._pending
+
+    def poll(self):
+        """Range en cache les images décodées (à appeler depuis le thread principal). Retourne la progression."""
+        pending = []
+        for future, store in self._pending:
+            if not future.done():
+                pending.append((future, store))
+                continue
+            try:
+                image = future.result()
+            except Exception as e:
+                print(f"Erreur lors du préchargement d'une image : {e}")
+                image = None
+            store(image)
+            self.completed += 1
+        self._pending = pending
+        return self.progress
+
+    def run(self, screen, draw_background=None, label="Chargement des images..."):
+        """Précharge tout en affichant une barre de progression ; rend la main une fois terminé."""
+        if self._jobs:
+            self.start()
+        clock = pygame.time.Clock()
+        while True:
+            self.poll()
+            pygame.event.pump() # La fenêtre reste réactive (les événements restent dans la file)
+            if draw_background:
+                draw_background()
+            else:
+                screen.fill((0, 0, 0))
+            draw_progress_bar(screen, self.progress, label)
+            pygame.display.flip()
+            if self.done:
+                return
+            clock.tick(60)
+
+
+def draw_progress_bar(screen, progress, label):
+    """Barre de progression centrée en bas de l'écran."""
+    bar_rect = pygame.Rect(0, 0, 400, 20)
+    bar_rect.center = (screen.get_width() // 2, screen.get_height() - 60)
+    pygame.draw.rect(screen, GRAY_LIGHT, bar_rect, border_radius=10)
+    fill_rect = bar_rect.copy()
+    fill_rect.width = int(bar_rect.width * progress)
+    if fill_rect.width > 0:
+        pygame.draw.rect(screen, GREEN_PRIMARY, fill_rect, border_radius=10)
+    pygame.draw.rect(screen, GRAY_DARK, bar_rect, width=2, border_radius=10)
+
+    text_surface = get_font(20).render(f"{label} {int(progress * 100)} %", True, WHITE)
+    screen.blit(text_surface, text_surface.get_rect(midbottom=(bar_rect.centerx, bar_rect.top - 6)))
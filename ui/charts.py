@@ -0,0 +1,104 @@
+"""
+Graphiques de l'écran de résultats (rendements et qualité du sol par jour).
+
+Une série plus longue que la largeur du graphique est d'abord réduite à un
+paquet de jours par colonne de pixels (downsample) : le nombre de barres ou de
+points dessinés ne dépend plus de la durée de la partie. Chaque colonne garde
+le minimum, le maximum et la moyenne de son paquet, si bien que les pics restent
+visibles (maximum en couleur claire derrière chaque barre, bande min-max
+derrière la courbe).
+"""
+import math
+
+import numpy as np
+import pygame
+
+
+def downsample(values, buckets):
+    """
+    Regroupe une série en `buckets` paquets consécutifs (un par colonne de pixels).
+
+    Returns:
+        (minimums, maximums, moyennes) : trois tableaux de longueur min(len(values), buckets).
+        Les NaN (valeurs inconnues) sont ignorés.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) <= buckets:
+        return values, values, values
+
+    edges = np.linspace(0, len(values), buckets + 1).astype(int)
+    starts = edges[:-1]
+    known = ~np.isnan(values)
+    counts = np.add.reduceat(known, starts)
+    sums = np.add.reduceat(np.where(known, values, 0.0), starts)
+    with np.errstate(invalid="ignore"):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    return np.fmin.reduceat(values, starts), np.fmax.reduceat(values, starts), means
+
+
+def day_label_step(num_days):
+    """Écart entre deux étiquettes de jour (tous les jours jusqu'à 15, puis tous les 5 jours ou plus)."""
+    if num_days <= 15:
+        return 1
+    return 5 * max(1, math.ceil(num_days / 50))
+
+
+def draw_bars(surface, rect, values, max_value, color, empty_color, light_color):
+    """
+    Histogramme d'une série dans `rect`. Au-delà d'une barre par pixel, chaque colonne
+    montre le maximum de son paquet (couleur claire) et la moyenne (couleur pleine).
+
+    Returns:
+        Les abscisses (centre de chaque jour ou de chaque colonne) et le nombre de jours par colonne.
+    """
+    num_values = len(values)
+    if num_values == 0 or max_value <= 0:
+        return [], 1
+    buckets = max(1, rect.width)
+    if num_values <= buckets:
+        slot = rect.width / num_values
+        bar_width = slot * 0.8
+        for i, value in enumerate(values):
+            bar_height = int((value / max_value) * rect.height)
+            bar_x = rect.x + i * slot
+            pygame.draw.rect(surface, color if value > 0 else empty_color,
+                             (bar_x, rect.bottom - bar_height, bar_width, bar_height))
+        return [rect.x + i * slot + bar_width / 2 for i in range(num_values)], 1
+
+    _, maxs, means = downsample(values, buckets)
+    max_heights = np.nan_to_num(maxs / max_value * rect.height).astype(int)
+    mean_heights = np.nan_to_num(means / max_value * rect.height).astype(int)
+    for x, top, mean in zip(range(rect.x, rect.x + buckets), max_heights.tolist(), mean_heights.tolist()):
+        if top > 0:
+            pygame.draw.line(surface, light_color, (x, rect.bottom - top), (x, rect.bottom - 1))
+        if mean > 0:
+            pygame.draw.line(surface, color, (x, rect.bottom - mean), (x, rect.bottom - 1))
+    return list(range(rect.x, rect.x + buckets)), num_values / buckets
+
+
+def draw_line(surface, rect, values, color, band_color, max_points=60):
+    """
+    Courbe d'une série comprise entre 0 et 1 dans `rect`. Au-delà d'un point par pixel,
+    la plage min-max de chaque colonne est dessinée en bande derrière la courbe des moyennes.
+    Les points ne sont marqués que si la série est courte (`max_points`).
+    """
+    buckets = max(1, rect.width)
+    mins, maxs, means = downsample(values, buckets)
+    num_points = len(means)
+    if num_points == 0:
+        return
+
+    xs = rect.x + np.arange(num_points) / max(1, num_points - 1) * rect.width
+    if num_points < len(values):
+        tops = rect.bottom - np.nan_to_num(maxs) * rect.height
+        bottoms = rect.bottom - np.nan_to_num(mins) * rect.height
+        for x, top, bottom in zip(xs.tolist(), tops.tolist(), bottoms.tolist()):
+            pygame.draw.line(surface, band_color, (x, top), (x, bottom))
+
+    known = ~np.isnan(means)
+    points = list(zip(xs[known].tolist(), (rect.bottom - means[known] * rect.height).tolist()))
+    if len(points) > 1:
+        pygame.draw.lines(surface, color, False, points, 3)
+    if len(points) <= max_points:
+        for point in points:
+            pygame.draw.circle(surface, color, point, 4)
@@ -1,14 +1,19 @@
 import pygame
-import json
 import os
+import random
 from datetime import datetime, timedelta
 
 # Importer les constantes et les widgets partagés
 from .constants import WHITE, BLACK, GREEN_PRIMARY, GRAY_LIGHT, GRAY_DARK, GREEN_LIGHT, GREEN_DARK, ORANGE
+from .events import EventDispatcher
 from .widgets import Button, get_font, render_text_with_emojis
 
+from core.catalog import default_catalog
+
 # Importer la fonction de l'API NASA
-from core.nasa_api import get_nasa_power_data
+from core.nasa_api import DEFAULT_PARAMETERS, get_nasa_power_data
+from core.weather_grid import find_cached_point_data
+from core.climate import weather_for_game
 
 class ConfigInterface:
     def __init__(self, screen):
@@ -29,13 +34,15 @@ class ConfigInterface:
         self.loading = False
 
         # Données des régions chargées depuis un fichier JSON
-        self.region_data = self._load_regions()
+        self.region_data = default_catalog().regions
         self.locations = list(self.region_data.keys())
         self.location_index = 0
         self.selected_location = self.locations[self.location_index] if self.locations else ""
         
          # Charger la clé API depuis les variables d'environnement pour la sécurité
         self.nasa_api_key = os.getenv("NASA_API_KEY")
+        # Paramètres NASA demandés (ex: NASA_PARAMETERS=T2M,PRECTOTCORR,TS,ALLSKY_SFC_SW_DWN,RH2M)
+        self.nasa_parameters = os.getenv("NASA_PARAMETERS", DEFAULT_PARAMETERS)
         
         # Positions relatives pour les boutons
         center_x = self.width // 2
@@ -53,18 +60,17 @@ class ConfigInterface:
         bottom_y = self.height - 90
         self.confirm_config_btn = Button(center_x - 100, bottom_y, 200, 50, "Confirmer", GREEN_PRIMARY)
         self.back_to_menu_btn = Button(40, bottom_y + 5, 120, 40, "← Retour", GRAY_DARK, WHITE, 20)
-        
-    def _load_regions(self):
-        """Charge les données des régions depuis un fichier JSON."""
-        # Construit un chemin robuste vers le fichier, indépendant du lieu d'exécution
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        regions_path = os.path.join(project_root, "data", "regions_fr.json")
-        try:
-            with open(regions_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Erreur: Fichier '{regions_path}' introuvable ou invalide. {e}")
-            return {}    
+
+        self.events = EventDispatcher()
+        layer = self.events.layer()
+        layer.add(self.plots_minus_btn, lambda: self._change_plots(-1))
+        layer.add(self.plots_plus_btn, lambda: self._change_plots(1))
+        layer.add(self.years_minus_btn, lambda: self._change_years(-1))
+        layer.add(self.years_plus_btn, lambda: self._change_years(1))
+        layer.add(self.location_prev_btn, lambda: self._change_location(-1))
+        layer.add(self.location_next_btn, lambda: self._change_location(1))
+        layer.add(self.confirm_config_btn, self._confirm)
+        layer.add(self.back_to_menu_btn, lambda: "back")
         
     def draw(self):
         # Si en cours de chargement, afficher un écran dédié
@@ -190,32 +196,25 @@ class ConfigInterface:
         if self.loading:
             return None # Bloquer les interactions pendant le chargement
 
-        if self.plots_minus_btn.handle_event(event):
-            if self.selected_plots > 3:
-                self.selected_plots -= 1
-        elif self.plots_plus_btn.handle_event(event):
-            if self.selected_plots < 12:
-                self.selected_plots += 1
-        elif self.years_minus_btn.handle_event(event):
-            if self.selected_years > 1:
-                self.selected_years -= 1
-        elif self.years_plus_btn.handle_event(event):
-            if self.selected_years < 5:
-                self.selected_years += 1
-        elif self.location_prev_btn.handle_event(event):
-            self.location_index = (self.location_index - 1) % len(self.locations)
-            self.selected_location = self.locations[self.location_index]
-        elif self.location_next_btn.handle_event(event):
-            self.location_index = (self.location_index + 1) % len(self.locations)
+        _, action = self.events.dispatch(event)
+        return action
+
+    def _change_plots(self, step):
+        self.selected_plots = min(12, max(3, self.selected_plots + step))
+
+    def _change_years(self, step):
+        self.selected_years = min(5, max(1, self.selected_years + step))
+
+    def _change_location(self, step):
+        if self.locations:
+            self.location_index = (self.location_index + step) % len(self.locations)
             self.selected_location = self.locations[self.location_index]
-        elif self.confirm_config_btn.handle_event(event):
-            # Lancer la préparation de la configuration
-            self.loading = True
-            self.status_message = f"Chargement des données météo pour {self.selected_location}..."
-            return "prepare_game" # Indiquer au main.py de lancer la préparation
-        elif self.back_to_menu_btn.handle_event(event):
-            return "back"
-        return None
+
+    def _confirm(self):
+        # Lancer la préparation de la configuration
+        self.loading = True
+        self.status_message = f"Chargement des données météo pour {self.selected_location}..."
+        return "prepare_game" # Indiquer au main.py de lancer la préparation
 
     def prepare_game_config(self):
         """
@@ -241,7 +240,13 @@ class ConfigInterface:
 
         end_date_api = datetime.now() - timedelta(days=1)
         start_date_api = end_date_api - timedelta(days=364) # 365 jours au total
-        if self.nasa_api_key:
+
+        # Une grille régionale en cache couvre-t-elle ce lieu ? (pas de requête réseau)
+        nasa_data, cached_start_date = find_cached_point_data(region_info["lat"], region_info["lon"], num_days=365)
+        if nasa_data:
+            start_date_api = cached_start_date
+            self.status_message = "Données NASA (grille locale) chargées. Lancement..."
+        elif self.nasa_api_key:
 
             try:
                 nasa_data = get_nasa_power_data(
@@ -250,6 +255,7 @@ class ConfigInterface:
                     start_date=start_date_api.strftime("%Y%m%d"),
                     end_date=end_date_api.strftime("%Y%m%d"),
                     api_key=self.nasa_api_key,
+                    parameters=self.nasa_parameters,
                 )
                 self.status_message = "Données NASA chargées. Lancement..."
             except Exception as e:
@@ -260,6 +266,17 @@ class ConfigInterface:
             self.status_message = "Lancement sans données météo (clé API manquante)."
             start_date_api = datetime.now() # Pour le mode hors-ligne, on utilise la date actuelle
 
+        # Années supplémentaires (ou toutes, hors-ligne) tirées de la climatologie des données en cache :
+        # chaque année de jeu a sa propre météo, sans nouveau téléchargement
+        seed = random.randrange(2**32)
+        if not nasa_data or self.selected_years > 1:
+            synthetic_data = weather_for_game(region_info["lat"], region_info["lon"], self.selected_years,
+                                              seed, start_date_api, base_payload=nasa_data)
+            if synthetic_data is not None and synthetic_data is not nasa_data:
+                if not nasa_data:
+                    self.status_message = "Météo synthétique (climatologie en cache). Lancement..."
+                nasa_data = synthetic_data
+
         # Finaliser la configuration
         self.selected_config = {
             "plots": self.selected_plots,
@@ -268,6 +285,7 @@ class ConfigInterface:
             "region_data": region_info,
             "nasa_weather_data": nasa_data,
             "start_date": start_date_api, # On passe la date de début de la PÉRIODE de 365 jours
+            "seed": seed,
         }
         self.loading = False    
         
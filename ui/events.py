@@ -0,0 +1,170 @@
+"""
+Distribution des événements souris aux widgets d'un écran.
+
+Un écran range ses widgets (boutons, cartes de parcelles, zones cliquables) dans
+des couches superposées, la dernière créée étant au premier plan. Une couche peut
+n'être active que sous condition (menu ouvert...) et bloquer les couches du
+dessous, sur tout l'écran (modal) ou sur une zone (fond d'un menu contextuel).
+
+Chaque couche indexe ses widgets dans une grille de cases de CELL_SIZE pixels :
+trouver le widget sous le curseur ne teste que ceux de la case concernée, quel
+que soit leur nombre. Le dispatcher route les événements par type et ne modifie
+l'état de survol (`hovered`) que du widget quitté et du widget atteint. Après un
+clic (qui peut ouvrir ou fermer une couche) le survol est recalculé ; une couche
+vidée, ou désactivée avant l'événement suivant, retire le survol de ses widgets :
+un widget d'une couche fermée ne reste pas affiché comme survolé.
+"""
+import pygame
+
+CELL_SIZE = 64
+
+
+class Hotspot:
+    """Zone cliquable sans dessin propre (l'écran la dessine lui-même)."""
+
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+        self.hovered = False
+
+
+class WidgetLayer:
+    """
+    Couche de widgets indexés par une grille spatiale.
+
+    Args:
+        active: Fonction sans argument ; la couche est ignorée quand elle retourne False.
+        modal: Si True, les couches du dessous ne reçoivent aucun clic ni survol.
+        area: Rect (éventuellement déplacé ensuite) qui bloque les couches du dessous.
+        dispatcher: EventDispatcher propriétaire (survol à retirer quand la couche est vidée).
+    """
+
+    def __init__(self, active=None, modal=False, area=None, dispatcher=None):
+        self.active = active
+        self.modal = modal
+        self.area = area
+        self.dispatcher = dispatcher
+        self._widgets = [] # (widget, callback), du fond vers le premier plan
+        self._grid = None
+
+    def add(self, widget, callback=None):
+        """Ajoute un widget (tout objet ayant un attribut `rect`) ; `callback()` est appelée au clic."""
+        self._widgets.append((widget, callback))
+        self._grid = None
+        return widget
+
+    def clear(self):
+        if self.dispatcher is not None:
+            self.dispatcher.unhover(self)
+        self._widgets = []
+        self._grid = None
+
+    def holds(self, widget):
+        return any(item is widget for item, _ in self._widgets)
+
+    def invalidate(self):
+        """À appeler si le rect d'un widget a changé."""
+        self._grid = None
+
+    def is_active(self):
+        return self.active is None or self.active()
+
+    def blocks(self, pos):
+        return self.modal or (self.area is not None and self.area.collidepoint(pos))
+
+    def _build_grid(self):
+        grid = {}
+        for index, (widget, _) in enumerate(self._widgets):
+            rect = widget.rect
+            for cell_x in range(rect.left // CELL_SIZE, (rect.right - 1) // CELL_SIZE + 1):
+                for cell_y in range(rect.top // CELL_SIZE, (rect.bottom - 1) // CELL_SIZE + 1):
+                    grid.setdefault((cell_x, cell_y), []).append(index)
+        self._grid = grid
+
+    def hit(self, pos):
+        """(widget, callback) au premier plan sous `pos`, ou (None, None)."""
+        if self._grid is None:
+            self._build_grid()
+        for index in reversed(self._grid.get((int(pos[0]) // CELL_SIZE, int(pos[1]) // CELL_SIZE), ())):
+            widget, callback = self._widgets[index]
+            if widget.rect.collidepoint(pos):
+                return widget, callback
+        return None, None
+
+    def widget_at(self, pos):
+        return self.hit(pos)[0]
+
+
+class EventDispatcher:
+    """Couches de widgets d'un écran et routage des événements souris."""
+
+    def __init__(self):
+        self.layers = []
+        self.hovered = None
+        self._hovered_layer = None
+        self._handlers = {
+            pygame.MOUSEMOTION: self._on_motion,
+            pygame.MOUSEBUTTONDOWN: self._on_button_down,
+        }
+
+    def layer(self, active=None, modal=False, area=None):
+        """Crée une couche au-dessus des précédentes."""
+        layer = WidgetLayer(active, modal, area, self)
+        self.layers.append(layer)
+        return layer
+
+    def hit(self, pos):
+        """(widget, callback) au premier plan parmi les couches actives, ou (None, None)."""
+        widget, callback, _ = self._hit(pos)
+        return widget, callback
+
+    def _hit(self, pos):
+        for layer in reversed(self.layers):
+            if not layer.is_active():
+                continue
+            widget, callback = layer.hit(pos)
+            if widget is not None or layer.blocks(pos):
+                return widget, callback, layer
+        return None, None, None
+
+    def dispatch(self, event):
+        """
+        Transmet un événement au widget concerné.
+
+        Returns:
+            (widget, résultat) : le widget cliqué et la valeur retournée par son callback,
+            ou (None, None) si aucun widget n'a été cliqué (l'écran traite alors l'événement).
+        """
+        # Couche du widget survolé fermée depuis l'événement précédent (touche, fin de partie...)
+        if self._hovered_layer is not None and not self._hovered_layer.is_active():
+            self.unhover()
+        handler = self._handlers.get(event.type)
+        return handler(event) if handler else (None, None)
+
+    def unhover(self, layer=None):
+        """Retire l'état de survol (seulement s'il appartient à `layer`, si elle est donnée)."""
+        if self.hovered is not None and (layer is None or layer.holds(self.hovered)):
+            self._set_hovered(None, None)
+
+    def _set_hovered(self, widget, layer):
+        if widget is not self.hovered:
+            if self.hovered is not None and hasattr(self.hovered, "hovered"):
+                self.hovered.hovered = False
+            if widget is not None and hasattr(widget, "hovered"):
+                widget.hovered = True
+            self.hovered = widget
+        self._hovered_layer = layer if widget is not None else None
+
+    def _on_motion(self, event):
+        widget, _, layer = self._hit(event.pos)
+        self._set_hovered(widget, layer)
+        return None, None
+
+    def _on_button_down(self, event):
+        widget, callback = self.hit(event.pos)
+        if widget is None:
+            return None, None
+        result = callback() if callback else None
+        # Le clic a pu ouvrir ou fermer une couche : le widget sous le curseur a pu changer
+        hovered, _, layer = self._hit(event.pos)
+        self._set_hovered(hovered, layer)
+        return widget, result
@@ -2,16 +2,33 @@
 import numpy as np
 import time
 import random
-import os
 
 from core.farm_logic import FarmLogic
+from core.forecast import YieldForecaster
+from core.replay import SessionRecorder
+from core.savegame import free_slot_path
 # Importer les constantes et widgets partagés
 from .constants import (
     WHITE, BLACK, GREEN_PRIMARY, GREEN_LIGHT, GREEN_DARK, RED,
     YELLOW, BLUE, ORANGE, PURPLE, GRAY_LIGHT, GRAY_DARK, BROWN, BACKGROUND_GAME
 )
+from .assets import AssetPreloader, crop_image_box, get_crop_image
+from .events import EventDispatcher, Hotspot
 from .widgets import Button, get_font, render_text_with_emojis
 
+# Formulation des conseils issus de la prévision de rendement
+FORECAST_ADVICE = {
+    "water": "💧 Prévision sur {days} jours : arroser maintenant rapporterait environ {gain:.0f} kg de plus.",
+    "drain": "🌊 Prévision sur {days} jours : drainer maintenant rapporterait environ {gain:.0f} kg de plus.",
+    "fertilize": "🌿 Prévision sur {days} jours : fertiliser rapporterait environ {gain:.0f} kg de plus, coût déduit.",
+    "treat": "💀 Prévision sur {days} jours : traiter la maladie sauverait environ {gain:.0f} kg, coût déduit.",
+    "harvest": "🌾 Prévision sur {days} jours : récolter maintenant puis replanter {crop} rapporterait {gain:.0f} kg de plus.",
+    "plant": "🌱 Prévision sur {days} jours : {crop} est la culture la plus prometteuse ici (+{gain:.0f} kg).",
+}
+
+# Sauvegarde automatique tous les N jours simulés
+AUTOSAVE_INTERVAL_DAYS = 5
+
 class CropCard:
     def __init__(self, x, y, width, height, plot_data):
         self.rect = pygame.Rect(x, y, width, height)
@@ -24,6 +41,7 @@ class CropCard:
         self.fade_alpha = 0
         self.font = get_font(int(height / 9.5))
         self.name_font = get_font(int(height / 8))
+        self.image_box = crop_image_box(width, height)
 
     def draw(self, screen, is_selected):
         # 1. Fond de la carte
@@ -74,30 +92,9 @@ class CropCard:
             # int() le tronque pour obtenir un index de 0, 1, 2, 3, 4 ou 5.
             image_index = int(progress * 5)
 
-            # Construction du chemin de l'image
-            image_path = os.path.join("assets", "images", crop_name, f"{crop_name}_{image_index}.png")
-
-            scaled_image = None
-            if os.path.exists(image_path):
-                try:
-                    # Charger l'image originale
-                    image = pygame.image.load(image_path).convert_alpha()
-                    # Redimensionner l'image pour qu'elle s'adapte à la carte
-                    max_width = self.rect.width * 0.7
-                    max_height = self.rect.height * 0.5
-                    img_width, img_height = image.get_size()
-                    scale = min(max_width / img_width, max_height / img_height) if img_width > 0 and img_height > 0 else 1
-                    new_size = (int(img_width * scale), int(img_height * scale))
-                    scaled_image = pygame.transform.scale(image, new_size)
-
-                except pygame.error as e:
-                    # Gestion de l'erreur si l'image ne peut pas être chargée
-                    error_message = f"Image manquante: {image_path}"
-                    error_surface = self.font.render(error_message, True, RED)
-                    error_rect = error_surface.get_rect(center=self.rect.center)
-                    screen.blit(error_surface, error_rect)
-                    print(f"Erreur de chargement de l'image {image_path}: {e}")
-            
+            # Image préchargée (voir GameInterface.asset_preloader), réduite à la taille de la carte
+            scaled_image = get_crop_image(crop_name, image_index, self.image_box)
+
             # Centrer et afficher l'image si elle a été chargée et redimensionnée
             if scaled_image:
                 image_rect = scaled_image.get_rect(centerx=self.rect.centerx, y=self.rect.y + self.rect.height * 0.1)
@@ -193,6 +190,9 @@ class GameInterface:
         
         # Logique du jeu
         self.logic = FarmLogic()
+        self.save_path = None # Emplacement de sauvegarde de la partie en cours
+        self.forecaster = YieldForecaster(self.logic)
+        self.recorder = None # Enregistrement de la session en cours (rejeu, audit)
         
         # État de l'UI
         self.selected_plot_index = 0
@@ -244,11 +244,23 @@ class GameInterface:
         # Menu de plantation
         self.plant_menu_rect = pygame.Rect(0, 0, 250, 300) # Position sera dynamique
         self.plant_menu_buttons = []
+
+        # Bouton "Menu" de l'en-tête (dessiné dans draw())
+        self.menu_hotspot = Hotspot((15, 20, 100, 40))
+        self._build_layers()
         
-    def setup_from_config(self, config):
-        """Configure le jeu à partir des paramètres de configuration"""
+    def setup_from_config(self, config, save_path=None):
+        """
+        Configure le jeu à partir des paramètres de configuration. `save_path` : emplacement
+        choisi dans le menu ; sans lui, un emplacement libre, ou à défaut celui de la partie
+        précédente ("Rejouer" après une partie terminée).
+        """
         self.logic.setup_from_config(config)
+        self.save_path = save_path or free_slot_path() or self.save_path
         self.generate_crop_cards_from_logic()
+        self.stop_recording()
+        self.recorder = SessionRecorder(self.logic.config)
+        self.logic.session_recorder = self.recorder
         self.selected_plot_index = 0
         self.show_ai_popup = False
         self.ai_advice = ""
@@ -260,9 +272,48 @@ class GameInterface:
         self.play_pause_btn.text = "▶️ Jouer"
         self.speed_btn.text = "Vitesse x1"
         
+    def load_save(self, filepath):
+        """
+        Reprend une partie sauvegardée ; les sauvegardes suivantes iront dans le même emplacement.
+        L'enregistrement continue la session de la sauvegarde, ou à défaut une session partielle
+        commence au jour chargé (voir core/replay.py).
+        """
+        self.stop_recording()
+        if not self.logic.load_game(filepath):
+            return False
+        self.save_path = filepath
+        resumed_from = self.logic.resumed_from
+        self.recorder = SessionRecorder.resume(resumed_from["session"], self.logic.current_day) or SessionRecorder(
+            self.logic.config, resumed_from={"save_id": resumed_from["save_id"], "day": resumed_from["day"]})
+        self.logic.session_recorder = self.recorder
+        self.generate_crop_cards_from_logic()
+        return True
+
+    def asset_preloader(self):
+        """Images à charger avant de jouer : stades des cultures de la région (et des parcelles), emojis."""
+        crops = list(self.logic.available_crops)
+        crops += sorted({plot["crop"] for plot in self.logic.plots if plot["crop"] and plot["crop"] not in crops})
+        preloader = AssetPreloader()
+        for box in {card.image_box for card in self.crop_cards}:
+            preloader.add_crops(crops, box)
+        preloader.add_emojis()
+        return preloader
+
+    def stop_recording(self):
+        """Termine l'enregistrement de la session en cours, s'il y en a un."""
+        if self.recorder:
+            self.recorder.finish(self.logic)
+            self.recorder = None
+
+    def _record(self, action, crop=None):
+        """Enregistre une action réussie sur la parcelle sélectionnée."""
+        if self.recorder:
+            self.recorder.record(self.logic.current_day, action, self.selected_plot_index, crop)
+
     def generate_crop_cards_from_logic(self):
         """Génère les cartes de cultures en s'assurant qu'elles ne chevauchent pas les panneaux."""
         self.crop_cards.clear()
+        self.cards_layer.clear()
         num_plots = self.logic.plots_config
         
         # --- NOUVELLE LOGIQUE DE DISPOSITION ADAPTATIVE ---
@@ -303,6 +354,7 @@ class GameInterface:
             
             card = CropCard(x, y, card_width, card_height, plot_data)
             self.crop_cards.append(card)
+            self.cards_layer.add(card, lambda index=i: self._select_plot(index))
 
     
 
@@ -315,6 +367,12 @@ class GameInterface:
 
         plot = self.logic.plots[self.selected_plot_index]
 
+        # Conseil issu de la prévision : l'action au meilleur gain attendu pour cette parcelle
+        for suggestion in self.forecaster.rank_actions():
+            if suggestion["plot"] == self.selected_plot_index:
+                advices.append(FORECAST_ADVICE[suggestion["action"]].format(days=self.forecaster.horizon, **suggestion))
+                break
+
         # Conseils liés aux maladies
         if plot.get("disease"):
             advices.append(f"💀 La plante est atteinte de {plot['disease']}. Un traitement est urgent !")
@@ -397,10 +455,12 @@ class GameInterface:
         self.plant_menu_rect.topleft = (selected_card_rect.right + 10, selected_card_rect.top)
 
         self.plant_menu_buttons.clear()
+        self.plant_menu_layer.clear()
         y_offset = self.plant_menu_rect.y + 10
         for crop_name in self.logic.available_crops:
             btn = Button(self.plant_menu_rect.x + 10, y_offset, self.plant_menu_rect.width - 20, 40, crop_name, GREEN_DARK)
             self.plant_menu_buttons.append(btn)
+            self.plant_menu_layer.add(btn, lambda crop=crop_name: self._plant(crop))
             y_offset += 50
 
     def draw_plant_menu(self):
@@ -592,9 +652,14 @@ class GameInterface:
             if self.day_timer >= self.day_duration:
                 self.logic.update_simulation()
                 self.day_timer -= self.day_duration # Conserver le surplus de temps pour le jour suivant
+                # Sauvegarde automatique : seul l'instantané est pris pendant l'image, l'écriture se fait en arrière-plan.
+                # Incrémentale : seuls les jours écoulés depuis la précédente sont ajoutés au journal.
+                if self.logic.current_day % AUTOSAVE_INTERVAL_DAYS == 0 and self.logic.current_day <= self.logic.max_days:
+                    self.logic.save_game(self.save_path, background=True, incremental=True)
 
         # Vérifier fin de jeu
         if self.logic.current_day > self.logic.max_days:
+            self.stop_recording()
             if self.logic.check_win_condition():
                 return "game_over"
             else:
@@ -609,23 +674,17 @@ class GameInterface:
         self._draw_objective_bar()
         
         # Bouton menu
-        menu_btn_rect = pygame.Rect(15, 20, 100, 40)
+        menu_btn_rect = self.menu_hotspot.rect
         pygame.draw.rect(self.screen, GREEN_DARK, menu_btn_rect, border_radius=8)
         menu_text = render_text_with_emojis("← Menu", self.text_font, WHITE)
         menu_rect = menu_text.get_rect(center=menu_btn_rect.center)
         self.screen.blit(menu_text, menu_rect)
         
         # Titre avec jour et saison
-        season = self.logic.get_current_season()
-        season_icon_map = {"Printemps": "🌱", "Été": "☀️", "Automne": "🍂", "Hiver": "❄️",
-                           "Petite saison des pluies": "🌦️", "Grande saison sèche": "☀️", "Grande saison des pluies": "🌧️", "Petite saison sèche": "🏜️"}
-        season_icon = season_icon_map.get(season, "❓")
-
-        # Calcul de l'année actuelle
-        region_data = self.logic.config.get("region_data", {})
-        base_season_durations = region_data.get("season_durations", [10, 10, 10, 10])
-        days_in_one_game_year = sum(base_season_durations) if sum(base_season_durations) > 0 else 1
-        current_year = ((self.logic.current_day - 1) // days_in_one_game_year) + 1
+        calendar = self.logic.calendar
+        season = calendar.name(self.logic.current_season_index)
+        season_icon = calendar.icon(self.logic.current_season_index)
+        current_year = calendar.year_of(self.logic.current_day)
 
         title_text = render_text_with_emojis(f"Farm Navigator - Année {current_year} - {season_icon} {season}", self.title_font, WHITE)
         day_text = render_text_with_emojis(f"Jour {self.logic.current_day}/{self.logic.max_days}", self.subtitle_font, WHITE)
@@ -758,7 +817,8 @@ class GameInterface:
         # NOUVEAU: Gérer le survol pour les infobulles
         if event.type == pygame.MOUSEMOTION:
             self.tooltip_text = "" # Réinitialiser à chaque mouvement
-            for card in self.crop_cards:
+            card = self.cards_layer.widget_at(event.pos)
+            if card:
                 # Recalculer les positions des barres pour le test de collision
                 bar_width = card.rect.width * 0.25
                 bar_height = 8
@@ -771,114 +831,104 @@ class GameInterface:
                 if water_bar_rect.collidepoint(event.pos):
                     self.tooltip_text = f"Eau: {card.plot_data['water_level']:.0f}%"
                     self.tooltip_pos = event.pos
-                    break # Une seule infobulle à la fois
                 elif fert_bar_rect.collidepoint(event.pos):
                     fert_percent = min(1.0, card.plot_data['fertilizer_bonus'] / 0.5) * 100
                     self.tooltip_text = f"Nutriments: {fert_percent:.0f}%"
                     self.tooltip_pos = event.pos
-                    break
                 elif soil_bar_rect.collidepoint(event.pos):
                     self.tooltip_text = f"Qualité du sol: {card.plot_data['soil_quality']*100:.0f}%"
                     self.tooltip_pos = event.pos
-                    break
 
-        # Gestion du popup IA (bouton fermer) - TRAITÉ EN PREMIER
-        if self.show_ai_popup:
-            if self.close_ai_btn.handle_event(event):
-                self.show_ai_popup = False
-                return None
-
-        # Gestion du menu de plantation - TRAITÉ EN SECOND
-        if self.show_plant_menu:
-            for i, btn in enumerate(self.plant_menu_buttons):
-                if btn.handle_event(event):
-                    crop_to_plant = self.logic.available_crops[i]
-                    self.logic.plant_action(self.selected_plot_index, crop_to_plant)
-                    self.show_plant_menu = False
-                    return None
-
-        # Gestion des boutons d'action principaux - TRAITÉ EN TROISIÈME
-        if self.plant_btn.handle_event(event):
-            if self.logic.plots[self.selected_plot_index]["crop"] is None:
-                self.show_plant_menu = not self.show_plant_menu
-                if self.show_plant_menu:
-                    self._build_plant_menu()
-            return None
-        elif self.water_btn.handle_event(event):
-            if self.logic.water_action(self.selected_plot_index):
-                self.crop_cards[self.selected_plot_index].water_animation_timer = 30
-            return None
-        elif self.drain_btn.handle_event(event):
-            self.logic.drain_action(self.selected_plot_index)
-            return None
-        elif self.fertilize_btn.handle_event(event):
-            self.logic.fertilize_action(self.selected_plot_index)
-            return None
-        elif self.treat_btn.handle_event(event):
-            self.logic.treat_action(self.selected_plot_index)
-            return None
-        elif self.harvest_btn.handle_event(event):
-            self.logic.harvest_action(self.selected_plot_index)
-            return None
-        elif self.ai_btn.handle_event(event):
-            self.show_ai_popup = True
-            self.ai_advice = self.get_ai_advice()
-            return None
-        elif self.play_pause_btn.handle_event(event):
-            self.is_paused = not self.is_paused
-            if self.is_paused:
-                self.play_pause_btn.text = "▶ Jouer"
-            else:
-                self.play_pause_btn.text = "⏸ Pause"
-                self.last_frame_time = time.time()
-            return None
-        elif self.speed_btn.handle_event(event):
-            if self.time_speed_multiplier == 1:
-                self.time_speed_multiplier = 2
-                self.speed_btn.text = "Vitesse x2"
-            elif self.time_speed_multiplier == 2:
-                self.time_speed_multiplier = 4
-                self.speed_btn.text = "Vitesse x4"
-            else:
-                self.time_speed_multiplier = 1
-                self.speed_btn.text = "Vitesse x1"
-            return None
+        # Boutons, cartes et menus contextuels (popup IA, puis menu de plantation, au premier plan)
+        widget, action = self.events.dispatch(event)
+        if widget is not None:
+            return action
 
-        # Clic général - TRAITÉ EN DERNIER
+        # Clic en dehors de tout widget : fermer les menus contextuels
         if event.type == pygame.MOUSEBUTTONDOWN:
-            # Vérifier clic sur "Menu"
-            menu_btn_rect = pygame.Rect(15, 20, 100, 40)
-            if menu_btn_rect.collidepoint(event.pos):
-                self.logic.save_game()
-                return "menu"
-            
-            # Fermer le menu de plantation si on clique en dehors
             if self.show_plant_menu and not self.plant_menu_rect.collidepoint(event.pos):
                 self.show_plant_menu = False
-            
-            # Fermer le popup IA si on clique en dehors
             if self.show_ai_popup and not self.ai_popup_rect.collidepoint(event.pos):
                 self.show_ai_popup = False
+        return None
 
-            # Gérer la sélection de parcelle
-            if not self.show_plant_menu and not self.show_ai_popup:
-                for i, card in enumerate(self.crop_cards):
-                    if card.rect.collidepoint(event.pos):
-                        self.selected_plot_index = i
-                        break
+    def _build_layers(self):
+        """Couches de widgets cliquables, du fond vers le premier plan."""
+        self.events = EventDispatcher()
+        self.cards_layer = self.events.layer() # Rempli par generate_crop_cards_from_logic()
+
+        actions_layer = self.events.layer()
+        actions_layer.add(self.plant_btn, self._toggle_plant_menu)
+        actions_layer.add(self.water_btn, lambda: self._plot_action("water"))
+        actions_layer.add(self.drain_btn, lambda: self._plot_action("drain"))
+        actions_layer.add(self.fertilize_btn, lambda: self._plot_action("fertilize"))
+        actions_layer.add(self.treat_btn, lambda: self._plot_action("treat"))
+        actions_layer.add(self.harvest_btn, lambda: self._plot_action("harvest"))
+        actions_layer.add(self.ai_btn, self._open_ai_popup)
+        actions_layer.add(self.play_pause_btn, self._toggle_pause)
+        actions_layer.add(self.speed_btn, self._cycle_speed)
+        actions_layer.add(self.menu_hotspot, self._back_to_menu)
+
+        # Les menus contextuels bloquent les clics sur ce qu'ils recouvrent
+        self.plant_menu_layer = self.events.layer(active=lambda: self.show_plant_menu, area=self.plant_menu_rect)
+        ai_layer = self.events.layer(active=lambda: self.show_ai_popup, area=self.ai_popup_rect)
+        ai_layer.add(self.close_ai_btn, self._close_ai_popup)
+
+    def _select_plot(self, index):
+        # Un clic sur une parcelle ferme aussi les menus contextuels
+        self.show_plant_menu = False
+        self.show_ai_popup = False
+        self.selected_plot_index = index
+
+    def _plot_action(self, action):
+        """Applique une action à la parcelle sélectionnée et l'enregistre si elle a réussi."""
+        if getattr(self.logic, f"{action}_action")(self.selected_plot_index):
+            if action == "water":
+                self.crop_cards[self.selected_plot_index].water_animation_timer = 30
+            self._record(action)
+
+    def _plant(self, crop):
+        if self.logic.plant_action(self.selected_plot_index, crop):
+            self._record("plant", crop)
+        self.show_plant_menu = False
+
+    def _toggle_plant_menu(self):
+        if self.logic.plots[self.selected_plot_index]["crop"] is None:
+            self.show_plant_menu = not self.show_plant_menu
+            if self.show_plant_menu:
+                self._build_plant_menu()
+
+    def _open_ai_popup(self):
+        self.show_ai_popup = True
+        self.ai_advice = self.get_ai_advice()
+
+    def _close_ai_popup(self):
+        self.show_ai_popup = False
+
+    def _toggle_pause(self):
+        self.is_paused = not self.is_paused
+        if self.is_paused:
+            self.play_pause_btn.text = "▶ Jouer"
+        else:
+            self.play_pause_btn.text = "⏸ Pause"
+            self.last_frame_time = time.time()
+
+    def _cycle_speed(self):
+        if self.time_speed_multiplier == 1:
+            self.time_speed_multiplier = 2
+            self.speed_btn.text = "Vitesse x2"
+        elif self.time_speed_multiplier == 2:
+            self.time_speed_multiplier = 4
+            self.speed_btn.text = "Vitesse x4"
+        else:
+            self.time_speed_multiplier = 1
+            self.speed_btn.text = "Vitesse x1"
+
+    def _back_to_menu(self):
+        self.logic.save_game(self.save_path, background=True)
+        self.stop_recording()
+        return "menu"
 
-        return None
-            
     def get_results(self):
         """Retourne les résultats de la simulation"""
-        return {
-            "daily_yields": self.logic.daily_yields,
-            "daily_soil_quality": self.logic.daily_soil_quality,
-            "sustainability_score": self.logic.sustainability_score,
-            "food_harvested": self.logic.food_harvested,
-            "food_target": self.logic.food_target,
-            "final_money": self.logic.money,
-            "final_water": self.logic.water_reserve,
-            "actions_taken": self.logic.actions_taken,
-            "plots_data": self.logic.plots
-        }
+        return self.logic.get_results()
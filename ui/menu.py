@@ -1,11 +1,13 @@
 import pygame
-import os
+from datetime import datetime
 
 
 
 # Importer les constantes et widgets partagés
-from .constants import WHITE, BLACK, GREEN_PRIMARY, GREEN_DARK, GRAY_LIGHT, ORANGE
+from .constants import WHITE, BLACK, GREEN_PRIMARY, GREEN_DARK, GRAY_LIGHT, GRAY_DARK, ORANGE
+from .events import EventDispatcher
 from .widgets import Button, get_font, render_text_with_emojis  
+from core.savegame import free_slot_path, index_version, list_slots
        
 class MenuInterface:
     def __init__(self, screen):
@@ -23,13 +25,104 @@ class MenuInterface:
         
         self.continue_btn = None # Sera créé/mis à jour avant l'affichage
         self.quit_btn = Button(self.width//2 - 75, 510, 150, 40, "Quitter", WHITE, ORANGE, 20)
+
+        # Emplacements de sauvegarde, lus dans l'index (relu seulement s'il a changé)
+        self.slots = []
+        self.slot_buttons = []
+        self.slots_version = None
+        self.show_slots = False
+        self.overwrite_mode = False # Liste ouverte par "Nouvelle partie" : choix de la partie à remplacer
+        self.selected_slot_path = None
+        self.new_game_slot_path = None # Emplacement de la prochaine nouvelle partie
+        self.slots_panel_rect = pygame.Rect(self.width//2 - 340, 300, 680, 300)
+        self.close_slots_btn = Button(self.slots_panel_rect.centerx - 75, self.slots_panel_rect.bottom - 60,
+                                      150, 40, "← Retour", GRAY_DARK, WHITE, 20)
+
+        # Widgets cliquables ; la liste des parties, au premier plan, bloque le reste du menu
+        self.events = EventDispatcher()
+        self.main_layer = self.events.layer()
+        self.slots_layer = self.events.layer(active=lambda: self.show_slots, modal=True)
+        self._build_layers()
+
+    def _build_layers(self):
+        self.main_layer.clear()
+        self.main_layer.add(self.new_game_btn, self._new_game)
+        if self.continue_btn:
+            self.main_layer.add(self.continue_btn, self._open_slots)
+        self.main_layer.add(self.quit_btn, lambda: "quit")
+
+        self.slots_layer.clear()
+        for slot, button in zip(self.slots, self.slot_buttons):
+            self.slots_layer.add(button, lambda path=slot["path"]: self._select_slot(path))
+        self.slots_layer.add(self.close_slots_btn, self._close_slots)
+
+    def _new_game(self):
+        """Nouvelle partie dans un emplacement libre ; s'ils sont tous occupés, le joueur choisit celle à remplacer."""
+        self.new_game_slot_path = free_slot_path()
+        if self.new_game_slot_path is not None:
+            return "new_game"
+        self.overwrite_mode = True
+        self.show_slots = True
+        return None
+
+    def _open_slots(self):
+        if self.save_exists:
+            self.overwrite_mode = False
+            self.show_slots = True
+
+    def _close_slots(self):
+        self.show_slots = False
+
+    def _select_slot(self, path):
+        self.show_slots = False
+        if self.overwrite_mode:
+            self.new_game_slot_path = path
+            return "new_game"
+        self.selected_slot_path = path
+        return "continue"
+
     def update_continue_button(self):
-        """Vérifie l'existence de la sauvegarde et met à jour le bouton 'Continuer'."""
-        self.save_exists = os.path.exists("data/savegame.json")
+        """Relit l'index des sauvegardes s'il a changé et met à jour le bouton 'Continuer' et la liste des parties."""
+        if self.slots_version == index_version() and self.continue_btn:
+            return
+        self.slots = list_slots()
+        self.slots_version = index_version()
+        self.save_exists = bool(self.slots)
         continue_color = GREEN_PRIMARY if self.save_exists else GRAY_LIGHT
         continue_text_color = WHITE if self.save_exists else BLACK
         self.continue_btn = Button(self.width//2 - 175, 430, 350, 50, "Continuer", continue_color, continue_text_color)
-        
+        self.slot_buttons = [
+            Button(self.slots_panel_rect.x + 20, self.slots_panel_rect.y + 60 + i * 60,
+                   self.slots_panel_rect.width - 40, 50, self._slot_label(slot), GREEN_PRIMARY, WHITE, 20)
+            for i, slot in enumerate(self.slots)
+        ]
+        self._build_layers()
+
+    @staticmethod
+    def _slot_label(slot):
+        day = f"Jour {slot['day']}/{slot['max_days']}" if slot.get("max_days") else f"Jour {slot['day']}"
+        try:
+            saved_at = datetime.fromisoformat(slot["saved_at"]).strftime("%d/%m %H:%M")
+        except (KeyError, TypeError, ValueError):
+            saved_at = ""
+        return (f"{slot['slot']}. {slot.get('region') or '?'} - {day} - {slot['money']:.0f} € - "
+                f"{slot['sustainability']:.0f} % - {saved_at}")
+
+    def draw_slots_panel(self):
+        """Liste des parties sauvegardées (affichée par 'Continuer', ou par 'Nouvelle partie' si tout est occupé)."""
+        overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 120))
+        self.screen.blit(overlay, (0, 0))
+        pygame.draw.rect(self.screen, WHITE, self.slots_panel_rect, border_radius=15)
+        pygame.draw.rect(self.screen, GREEN_DARK, self.slots_panel_rect, width=3, border_radius=15)
+        if self.overwrite_mode:
+            title = render_text_with_emojis("Emplacements pleins : partie à remplacer ?", self.subtitle_font, ORANGE)
+        else:
+            title = render_text_with_emojis("Reprendre une partie", self.subtitle_font, GREEN_DARK)
+        self.screen.blit(title, title.get_rect(centerx=self.slots_panel_rect.centerx, y=self.slots_panel_rect.y + 15))
+        for button in self.slot_buttons:
+            button.draw(self.screen)
+        self.close_slots_btn.draw(self.screen)
 
     def draw(self):
         self.update_continue_button()
@@ -81,14 +174,12 @@ class MenuInterface:
         version_text = render_text_with_emojis("Version  1.0.0", self.text_font, GREEN_PRIMARY)
         version_rect = version_text.get_rect(centerx=self.width//2, y=self.height - 40)
         self.screen.blit(version_text, version_rect)
+
+        if self.show_slots:
+            self.draw_slots_panel()
     
     def handle_event(self, event):
-        if self.new_game_btn.handle_event(event):
-            return "new_game"
-        if self.continue_btn and self.save_exists and self.continue_btn.handle_event(event):
-            return "continue"
-        elif self.quit_btn.handle_event(event):
-            return "quit"
-        return None
+        _, action = self.events.dispatch(event)
+        return action
 
         
\ No newline at end of file
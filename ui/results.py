@@ -1,11 +1,18 @@
 ﻿import pygame
+import numpy as np
 import re
 import os
-import csv
+
+from core.export import export_in_background
+from core.results_db import run_in_background
 
 # Importer les constantes et widgets partagés
 from .constants import WHITE, BLACK, GREEN_PRIMARY, GREEN_DARK, GRAY_LIGHT, GRAY_DARK, GREEN_LIGHT, ORANGE, BROWN, BLUE, RED
+from .events import EventDispatcher
 from .widgets import Button, get_font, render_text_with_emojis
+from .charts import day_label_step, draw_bars, draw_line
+
+SOIL_BAND_COLOR = (222, 184, 135) # Plage min-max de la qualité du sol
 
 class ResultsInterface:
     def __init__(self, screen):
@@ -27,6 +34,7 @@ class ResultsInterface:
         self.actions_taken = []
         self.plots_data = []
         self.food_target = 0
+        self.history = None # Historique complet de la partie (core.timeseries.FarmTimeSeries)
         
         # Boutons
         self.replay_btn = Button(self.width//2 - 320, self.height - 90, 180, 50, "🔄 Rejouer", GREEN_PRIMARY)
@@ -41,10 +49,30 @@ class ResultsInterface:
         self.input_box_rect = pygame.Rect(self.input_popup_rect.x + 50, self.input_popup_rect.y + 80, 300, 40)
         self.confirm_export_btn = Button(self.input_popup_rect.centerx - 75, self.input_popup_rect.bottom - 60, 150, 40, "Confirmer", GREEN_PRIMARY)
         self.close_export_btn = Button(self.input_popup_rect.right - 45, self.input_popup_rect.top + 10, 35, 30, "✕", RED)
+
+        # Widgets cliquables ; le popup d'export, au premier plan, bloque les boutons du dessous
+        self.events = EventDispatcher()
+        main_layer = self.events.layer()
+        main_layer.add(self.replay_btn, lambda: "replay")
+        main_layer.add(self.export_btn, self._open_export)
+        main_layer.add(self.quit_final_btn, lambda: "menu")
+        export_layer = self.events.layer(active=lambda: self.show_name_input, modal=True)
+        export_layer.add(self.confirm_export_btn, self._export_results_to_csv)
+        export_layer.add(self.close_export_btn, self._close_export)
         self.export_status_message = ""
+        self.export_thread = None
+        self.results = {}
+        self._chart_cache = {} # Panneaux de graphiques déjà rendus
+
+        # Base des parties terminées (classements), écrite dans un thread
+        self.record_thread = None
+        self.run_id = None
+        self.ranking_text = ""
         
     def setup_from_game(self, results):
         """Configure l'interface avec les résultats du jeu"""
+        self.results = results
+        self._chart_cache = {}
         self.daily_yields = results["daily_yields"]
         self.daily_soil_quality = results.get("daily_soil_quality", [])
         self.sustainability_score = results["sustainability_score"]
@@ -54,6 +82,28 @@ class ResultsInterface:
         self.final_water = results["final_water"]
         self.actions_taken = results["actions_taken"]
         self.plots_data = results.get("plots_data", [])
+        self.history = results.get("history")
+        self._record_run(results)
+
+    def _record_run(self, results):
+        """Enregistre la partie dans la base de résultats (dans un thread) et calcule son classement dans la région."""
+        self.run_id = None
+        self.ranking_text = ""
+
+        def record(database):
+            run_id = database.record_run(results)
+            return run_id, database.run_percentile(run_id)
+
+        def on_done(value, error):
+            if error is not None:
+                print(f"Erreur de la base de résultats : {error}")
+                return
+            self.run_id, percentile = value
+            region = results.get("config", {}).get("location")
+            if percentile is not None:
+                self.ranking_text = f"Classement: {percentile:.0f}e centile" + (f" ({region})" if region else "")
+
+        self.record_thread = run_in_background(record, on_done, after=self.record_thread)
         
     def draw(self):
         # Fond dégradé
@@ -88,115 +138,119 @@ class ResultsInterface:
         if self.show_name_input:
             self._draw_name_input_popup()
         
+    def _blit_cached_chart(self, key, panel, render):
+        """
+        Affiche un panneau de graphique rendu une seule fois : le coût par image ne dépend
+        plus de la durée de la partie. Le cache est vidé quand les résultats changent.
+        """
+        surface = self._chart_cache.get(key)
+        if surface is None or surface.get_size() != panel.size:
+            surface = pygame.Surface(panel.size, pygame.SRCALPHA)
+            render(surface, surface.get_rect())
+            self._chart_cache[key] = surface
+        self.screen.blit(surface, panel.topleft)
+
     def _draw_yield_graph(self):
-        """Dessine le graphique de rendement avec plus de détails."""
-        # Le graphique occupe 40% de la largeur
-        panel_width = self.width * 0.45
-        graph_panel = pygame.Rect(self.width * 0.05, 120, panel_width, 250)
-        pygame.draw.rect(self.screen, WHITE, graph_panel, border_radius=10)
-        pygame.draw.rect(self.screen, GREEN_PRIMARY, graph_panel, width=3, border_radius=10)
+        """Dessine le graphique de rendement (panneau mis en cache)."""
+        # Le graphique occupe 45% de la largeur
+        panel = pygame.Rect(self.width * 0.05, 120, self.width * 0.45, 250)
+        self._blit_cached_chart("yield", panel, self._render_yield_graph)
+
+    def _render_yield_graph(self, surface, graph_panel):
+        """Rend le graphique de rendement avec plus de détails."""
+        pygame.draw.rect(surface, WHITE, graph_panel, border_radius=10)
+        pygame.draw.rect(surface, GREEN_PRIMARY, graph_panel, width=3, border_radius=10)
         
         graph_title = render_text_with_emojis("📈 Rendement par Jour", self.subtitle_font, GREEN_DARK)
         title_rect = graph_title.get_rect(midtop=(graph_panel.centerx, graph_panel.top + 10))
-        self.screen.blit(graph_title, title_rect)
+        surface.blit(graph_title, title_rect)
 
         subtitle_text = render_text_with_emojis("Unités de récolte produites quotidiennement.", self.text_font, GRAY_DARK)
         subtitle_rect = subtitle_text.get_rect(midtop=(graph_panel.centerx, title_rect.bottom))
-        self.screen.blit(subtitle_text, subtitle_rect)
+        surface.blit(subtitle_text, subtitle_rect)
         
         # Zone de dessin du graphique
         chart_rect = pygame.Rect(graph_panel.x + 40, graph_panel.y + 70, 
                                  graph_panel.width - 60, graph_panel.height - 90)
         
         # Fond de la zone de graphique
-        pygame.draw.rect(self.screen, GRAY_LIGHT, chart_rect)
+        pygame.draw.rect(surface, GRAY_LIGHT, chart_rect)
         
-        if self.daily_yields:
-            max_yield = max(self.daily_yields) if any(self.daily_yields) else 1
+        if len(self.daily_yields):
+            max_yield = float(np.nanmax(self.daily_yields)) if np.any(self.daily_yields) else 1
             
             # Dessiner les axes
-            pygame.draw.line(self.screen, GRAY_DARK, (chart_rect.left, chart_rect.top), (chart_rect.left, chart_rect.bottom), 2)
-            pygame.draw.line(self.screen, GRAY_DARK, (chart_rect.left, chart_rect.bottom), (chart_rect.right, chart_rect.bottom), 2)
+            pygame.draw.line(surface, GRAY_DARK, (chart_rect.left, chart_rect.top), (chart_rect.left, chart_rect.bottom), 2)
+            pygame.draw.line(surface, GRAY_DARK, (chart_rect.left, chart_rect.bottom), (chart_rect.right, chart_rect.bottom), 2)
 
             # Étiquettes axe Y
             max_yield_text = render_text_with_emojis(f"{max_yield:.0f}", self.text_font, BLACK)
-            self.screen.blit(max_yield_text, (chart_rect.left - 35, chart_rect.top - 10))
+            surface.blit(max_yield_text, (chart_rect.left - 35, chart_rect.top - 10))
             zero_text = render_text_with_emojis("0", self.text_font, BLACK)
-            self.screen.blit(zero_text, (chart_rect.left - 15, chart_rect.bottom - 10))
+            surface.blit(zero_text, (chart_rect.left - 15, chart_rect.bottom - 10))
 
-            # Dessiner les barres
+            # Barres (regroupées par colonne de pixels pour les longues parties)
+            centers, days_per_column = draw_bars(surface, chart_rect, self.daily_yields, max_yield,
+                                                 GREEN_PRIMARY, GRAY_DARK, GREEN_LIGHT)
+
+            # Étiquettes jour (seulement pour quelques jours pour éviter le surpeuplement)
             num_days = len(self.daily_yields)
-            bar_width = (chart_rect.width / num_days) * 0.8
-            bar_spacing = (chart_rect.width / num_days) * 0.2
-            
-            for i, yield_val in enumerate(self.daily_yields):
-                bar_height = int((yield_val / max_yield) * chart_rect.height) if max_yield > 0 else 0
-                bar_x = chart_rect.x + i * (bar_width + bar_spacing)
-                bar_y = chart_rect.bottom - bar_height
-                
-                bar_color = GREEN_PRIMARY if yield_val > 0 else GRAY_DARK
-                pygame.draw.rect(self.screen, bar_color, (bar_x, bar_y, bar_width, bar_height))
-
-                # Étiquette jour (seulement pour quelques jours pour éviter le surpeuplement)
-                if num_days <= 15 or i % 5 == 0 or i == num_days - 1:
-                    day_text = render_text_with_emojis(f"J{i+1}", self.text_font, BLACK)
-                    day_rect = day_text.get_rect(centerx=bar_x + bar_width//2, y=chart_rect.bottom + 5)
-                    self.screen.blit(day_text, day_rect)
+            label_days = list(range(0, num_days, day_label_step(num_days)))
+            if label_days[-1] != num_days - 1:
+                label_days.append(num_days - 1)
+            for i in label_days:
+                column = min(len(centers) - 1, int(i / days_per_column)) if centers else 0
+                day_text = render_text_with_emojis(f"J{i+1}", self.text_font, BLACK)
+                day_rect = day_text.get_rect(centerx=centers[column] if centers else chart_rect.x, y=chart_rect.bottom + 5)
+                surface.blit(day_text, day_rect)
                 
     def _draw_soil_graph(self):
-        """Dessine le graphique de l'évolution de la qualité du sol avec plus de détails."""
-        panel_width = self.width * 0.22
-        graph_panel = pygame.Rect(self.width * 0.52, 120, panel_width, 250)
-        pygame.draw.rect(self.screen, WHITE, graph_panel, border_radius=10)
-        pygame.draw.rect(self.screen, GREEN_PRIMARY, graph_panel, width=3, border_radius=10)
+        """Dessine le graphique de la qualité du sol (panneau mis en cache)."""
+        panel = pygame.Rect(self.width * 0.52, 120, self.width * 0.22, 250)
+        self._blit_cached_chart("soil", panel, self._render_soil_graph)
+
+    def _render_soil_graph(self, surface, graph_panel):
+        """Rend le graphique de l'évolution de la qualité du sol avec plus de détails."""
+        pygame.draw.rect(surface, WHITE, graph_panel, border_radius=10)
+        pygame.draw.rect(surface, GREEN_PRIMARY, graph_panel, width=3, border_radius=10)
 
         graph_title = render_text_with_emojis("📉 Qualité du Sol", self.subtitle_font, GREEN_DARK)
         title_rect = graph_title.get_rect(midtop=(graph_panel.centerx, graph_panel.top + 10))
-        self.screen.blit(graph_title, title_rect)
+        surface.blit(graph_title, title_rect)
 
         subtitle_text = render_text_with_emojis("Impact de la fertilisation.", self.text_font, GRAY_DARK)
         subtitle_rect = subtitle_text.get_rect(midtop=(graph_panel.centerx, title_rect.bottom))
-        self.screen.blit(subtitle_text, subtitle_rect)
+        surface.blit(subtitle_text, subtitle_rect)
 
         chart_rect = pygame.Rect(graph_panel.x + 40, graph_panel.y + 70, 
                                  graph_panel.width - 60, graph_panel.height - 100)
 
         # Fond de la zone de graphique
-        pygame.draw.rect(self.screen, GRAY_LIGHT, chart_rect)
+        pygame.draw.rect(surface, GRAY_LIGHT, chart_rect)
 
-        if self.daily_soil_quality:
-            points = []
+        if len(self.daily_soil_quality):
             num_days = len(self.daily_soil_quality)
-            for i, quality in enumerate(self.daily_soil_quality):
-                x = chart_rect.x + (i / (num_days - 1 if num_days > 1 else 1)) * chart_rect.width
-                y = chart_rect.bottom - (quality * chart_rect.height) # quality est 0-1
-                points.append((x, y))
             
             # Dessiner les axes
-            pygame.draw.line(self.screen, GRAY_DARK, (chart_rect.left, chart_rect.top), (chart_rect.left, chart_rect.bottom), 2)
-            pygame.draw.line(self.screen, GRAY_DARK, (chart_rect.left, chart_rect.bottom), (chart_rect.right, chart_rect.bottom), 2)
+            pygame.draw.line(surface, GRAY_DARK, (chart_rect.left, chart_rect.top), (chart_rect.left, chart_rect.bottom), 2)
+            pygame.draw.line(surface, GRAY_DARK, (chart_rect.left, chart_rect.bottom), (chart_rect.right, chart_rect.bottom), 2)
 
             # Étiquettes des axes
             label_100 = render_text_with_emojis("100%", self.text_font, BLACK)
-            self.screen.blit(label_100, (chart_rect.left - 38, chart_rect.top - 10))
+            surface.blit(label_100, (chart_rect.left - 38, chart_rect.top - 10))
             label_0 = render_text_with_emojis("0%", self.text_font, BLACK)
-            self.screen.blit(label_0, (chart_rect.left - 25, chart_rect.bottom - 10))
+            surface.blit(label_0, (chart_rect.left - 25, chart_rect.bottom - 10))
 
             # Étiquettes axe X
             if num_days > 1:
                 day1_text = render_text_with_emojis("J1", self.text_font, BLACK)
-                self.screen.blit(day1_text, (chart_rect.left, chart_rect.bottom + 5))
+                surface.blit(day1_text, (chart_rect.left, chart_rect.bottom + 5))
                 day_last_text = render_text_with_emojis(f"J{num_days}", self.text_font, BLACK)
                 day_last_rect = day_last_text.get_rect(right=chart_rect.right, top=chart_rect.bottom + 5)
-                self.screen.blit(day_last_text, day_last_rect)
+                surface.blit(day_last_text, day_last_rect)
 
-            # Dessiner la ligne du graphique
-            if len(points) > 1:
-                pygame.draw.lines(self.screen, BROWN, False, points, 3) # Ligne marron pour le sol
-            
-            # Dessiner les points sur la ligne
-            for point in points:
-                pygame.draw.circle(self.screen, BROWN, point, 4)
+            # Courbe marron pour le sol (quality est 0-1), bande min-max pour les longues parties
+            draw_line(surface, chart_rect, self.daily_soil_quality, BROWN, SOIL_BAND_COLOR)
         
     def _draw_statistics(self):
         """Dessine les statistiques finales"""
@@ -238,6 +292,11 @@ class ResultsInterface:
         score_text = render_text_with_emojis(f"{self.sustainability_score}%", self.subtitle_font, arc_color)
         score_rect = score_text.get_rect(left=stats_panel.x + 105, centery=stats_panel.y + 50 + 4 * 28 + 10)
         self.screen.blit(score_text, score_rect)
+
+        # Classement parmi les parties enregistrées de la même région
+        if self.ranking_text:
+            ranking_surface = render_text_with_emojis(self.ranking_text, self.text_font, GRAY_DARK)
+            self.screen.blit(ranking_surface, (stats_panel.x + 15, stats_panel.y + 50 + 5 * 28 + 15))
             
     def _draw_plots_summary(self):
         """Dessine le résumé final de chaque parcelle."""
@@ -328,93 +387,65 @@ class ResultsInterface:
         self.close_export_btn.draw(self.screen)
 
     def _export_results_to_csv(self):
-        """Exporte les résultats de la simulation dans un fichier CSV."""
+        """Exporte les résultats de la simulation dans un fichier CSV (dans un thread, sans bloquer l'écran)."""
         if not self.player_name.strip():
             self.export_status_message = "Le nom ne peut pas être vide."
             return
+        if self.export_thread and self.export_thread.is_alive():
+            return # Un export est déjà en cours
+        if not len(self.daily_yields):
+            self.export_status_message = "Erreur : Aucune donnée de rendement à exporter."
+            print(self.export_status_message)
+            return
 
         # Nettoyer le nom pour l'utiliser comme nom de fichier
         sanitized_name = re.sub(r'[\\/*?:"<>|]', "", self.player_name)
         filename = f"{sanitized_name}_results.csv"
-        
-        # Créer le dossier 'rapports' s'il n'existe pas
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        exports_dir = os.path.join(project_root, "rapports")
-        os.makedirs(exports_dir, exist_ok=True)
-        
-        filepath = os.path.join(exports_dir, filename)
-
-        try:
-            with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                # Section 1: Informations générales
-                writer.writerow(['Argent Final (€)', f"{self.final_money:.2f}"])
-                writer.writerow(['Réserve d\'Eau Finale (L)', f"{self.final_water:.2f}"])
-                writer.writerow(['Score de Durabilité Final (%)', f"{self.sustainability_score:.2f}"])
-                writer.writerow(['Nombre de Récoltes', self.actions_taken.count("harvest")])
-                
-                # Section 2: Journal Quotidien
-                writer.writerow([])  # Ligne vide
-                if self.daily_yields:  # Check if daily_yields is not empty
-                    writer.writerow(['Journal Quotidien'])
-                    writer.writerow(['Jour', 'Rendement du jour (kg)', 'Qualité moyenne du sol (%)'])
-                    
-                    num_days = len(self.daily_yields)
-                    for i in range(num_days):
-                        day = i + 1
-                        yield_val = self.daily_yields[i]
-                        
-                        # Vérification de la qualité du sol
-                        if i < len(self.daily_soil_quality):
-                            soil_val = self.daily_soil_quality[i] * 100
-                        else:
-                            soil_val = 'N/A'  # Si la qualité du sol est manquante
-                        
-                        # Validation des données
-                        try:
-                            yield_val_formatted = f"{yield_val:.2f}" if isinstance(yield_val, (int, float)) else "N/A"
-                        except Exception as e:
-                            print(f"Erreur de formatage pour le rendement du jour {day}: {e}")
-                            yield_val_formatted = "N/A"
-                        
-                        try:
-                            soil_val_formatted = f"{soil_val:.2f}" if isinstance(soil_val, (int, float)) else "N/A"
-                        except Exception as e:
-                            print(f"Erreur de formatage pour la qualité du sol du jour {day}: {e}")
-                            soil_val_formatted = "N/A"
-                        
-                        # Écriture dans le fichier CSV
-                        writer.writerow([day, yield_val_formatted, soil_val_formatted])
-                        print(f"Exporté - Jour {day}: Rendement = {yield_val_formatted}, Qualité du sol = {soil_val_formatted}")
-                    
-                    # Message de succès
-                    self.export_status_message = f"Exporté vers {filename} !"
-                    print(self.export_status_message)
-                else:
-                    self.export_status_message = "Erreur : Aucune donnée de rendement à exporter."
-                    print(self.export_status_message)
+        filepath = os.path.join(project_root, "rapports", filename)
 
-        except FileNotFoundError:
-            self.export_status_message = "Erreur : Le fichier ou le répertoire spécifié est introuvable."
-            print(self.export_status_message)
+        def on_done(path, error):
+            if error is None:
+                self.export_status_message = f"Exporté vers {filename} !"
+            elif isinstance(error, PermissionError):
+                self.export_status_message = "Erreur : Permission refusée pour écrire dans le fichier."
+            elif isinstance(error, FileNotFoundError):
+                self.export_status_message = "Erreur : Le fichier ou le répertoire spécifié est introuvable."
+            else:
+                self.export_status_message = "Erreur lors de l'export."
+            print(self.export_status_message if error is None else f"Erreur d'exportation CSV : {error}")
 
-        except PermissionError:
-            self.export_status_message = "Erreur : Permission refusée pour écrire dans le fichier."
-            print(self.export_status_message)
+        # Après l'enregistrement de la partie (self.run_id est connu une fois record_thread terminé)
+        player = self.player_name.strip()
+
+        def set_player(database):
+            if self.run_id is not None:
+                database.set_player(self.run_id, player)
+
+        def on_player_done(_value, error):
+            if error is not None:
+                print(f"Erreur de la base de résultats : {error}")
+
+        self.record_thread = run_in_background(set_player, on_player_done, after=self.record_thread)
 
-        except Exception as e:
-            self.export_status_message = "Erreur lors de l'export."
-            print(f"Erreur d'exportation CSV : {e}")
+        self.export_status_message = "Export en cours..."
+        self.export_thread = export_in_background(self.results, filepath, "csv", on_done)
+
+    def _open_export(self):
+        self.show_name_input = True
+
+    def _close_export(self):
+        self.show_name_input = False
+        self.player_name = ""
+        self.export_status_message = ""
 
     def handle_event(self, event):
+        widget, action = self.events.dispatch(event)
+        if widget is not None:
+            return action
+
         if self.show_name_input:
-            if self.confirm_export_btn.handle_event(event):
-                self._export_results_to_csv()
-            elif self.close_export_btn.handle_event(event):
-                self.show_name_input = False
-                self.player_name = ""
-                self.export_status_message = ""
-            elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.type == pygame.MOUSEBUTTONDOWN:
                 self.input_box_active = self.input_box_rect.collidepoint(event.pos)
             elif event.type == pygame.KEYDOWN and self.input_box_active:
                 if event.key == pygame.K_RETURN:
@@ -424,13 +455,4 @@ class ResultsInterface:
                 else:
                     self.player_name += event.unicode
                 self.export_status_message = "" # Effacer le message de statut lors de la saisie
-            return None # Consommer l'événement pour éviter d'autres actions
-
-        if self.replay_btn.handle_event(event):
-            return "replay"
-        elif self.export_btn.handle_event(event):
-            self.show_name_input = True
-            return None
-        elif self.quit_final_btn.handle_event(event):
-            return "menu"
         return None
\ No newline at end of file
@@ -1,34 +1,66 @@
 import pygame
 import os
+from .asset_bundle import default_bundle, emoji_key
 from .constants import GRAY_DARK
 
-def get_font(size):
+# Police préférée (emojis sur Windows) et tailles utilisées par les écrans, chargées au démarrage
+DEFAULT_FONT_FAMILY = "Segoe UI Emoji"
+PRELOAD_FONT_SIZES = (20, 22, 24, 26, 28, 48, 64, 72)
+
+# Registre partagé par tout le jeu : un seul objet Font par (famille, taille)
+_font_paths = {}   # famille -> fichier de police retenu (None = police par défaut de Pygame)
+_fonts = {}        # (famille, taille) -> pygame.font.Font
+
+
+def resolve_font_path(family=DEFAULT_FONT_FAMILY):
     """
-    Charge la meilleure police disponible pour le rendu du texte et des symboles.
+    Cherche une seule fois le fichier de police à utiliser pour une famille.
     Tente dans cet ordre :
-    1. Segoe UI Emoji (pour les emojis sur Windows)
+    1. La police système demandée (Segoe UI Emoji par défaut, pour les emojis sur Windows)
     2. DejaVuSans.ttf (fournie avec le jeu, pour la portabilité)
-    3. Police par défaut de Pygame (solution de repli)
+    3. Police par défaut de Pygame (solution de repli, None)
     """
-    # 1. Essayer de charger la police système "Segoe UI Emoji" (idéal sur Windows)
-    try:
-        return pygame.font.SysFont("Segoe UI Emoji", size)
-    except pygame.error:
-        # Police non trouvée, on passe à la suite
-        pass
-
-    # 2. Essayer de charger la police "DejaVu Sans" fournie avec le jeu
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    font_path = os.path.join(project_root, "assets", "fonts", "DejaVuSans.ttf")
-    try:
-        return pygame.font.Font(font_path, size)
-    except pygame.error:
-        # Police non trouvée, on passe à la solution de repli
-        print(f"AVERTISSEMENT: Police 'DejaVuSans.ttf' non trouvée dans 'assets/fonts/'. Utilisation de la police par défaut.")
-        pass
-    
-    # 3. Utiliser la police par défaut de Pygame en dernier recours
-    return pygame.font.Font(None, size)
+    if family in _font_paths:
+        return _font_paths[family]
+
+    # 1. Police système (la recherche parcourt les polices installées : coûteuse, faite une fois)
+    path = pygame.font.match_font(family) if family else None
+
+    # 2. Police "DejaVu Sans" fournie avec le jeu
+    if path is None:
+        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        bundled_path = os.path.join(project_root, "assets", "fonts", "DejaVuSans.ttf")
+        if os.path.isfile(bundled_path):
+            path = bundled_path
+        else:
+            # 3. Police par défaut de Pygame
+            print(f"AVERTISSEMENT: Police '{family}' introuvable et 'DejaVuSans.ttf' absente de 'assets/fonts/'. Utilisation de la police par défaut.")
+
+    _font_paths[family] = path
+    return path
+
+
+def get_font(size, family=DEFAULT_FONT_FAMILY):
+    """
+    Police partagée pour une taille donnée (créée au premier appel, puis réutilisée).
+    Les objets retournés sont partagés : ne pas modifier leur style (gras, italique...).
+    """
+    key = (family, size)
+    font = _fonts.get(key)
+    if font is None:
+        try:
+            font = pygame.font.Font(resolve_font_path(family), size)
+        except (pygame.error, OSError) as e:
+            print(f"AVERTISSEMENT: Impossible de charger la police '{family}' ({e}). Utilisation de la police par défaut.")
+            font = pygame.font.Font(None, size)
+        _fonts[key] = font
+    return font
+
+
+def preload_fonts(sizes=PRELOAD_FONT_SIZES, family=DEFAULT_FONT_FAMILY):
+    """Charge à l'avance les polices des écrans (à appeler une fois, après pygame.init())."""
+    for size in sizes:
+        get_font(size, family)
 
 _emoji_cache = {}
 _emoji_folder = None
@@ -43,26 +75,50 @@ def _initialize_emoji_handler():
             print(f"AVERTISSEMENT: Dossier d'emojis non trouvé à '{_emoji_folder}'. Les emojis en couleur ne s'afficheront pas.")
             _emoji_folder = None
 
-def get_emoji_image(char, size):
-    """Charge, redimensionne et met en cache une image d'emoji."""
+def emoji_chars():
+    """Caractères pour lesquels une image d'emoji existe (d'après les noms de fichiers)."""
+    _initialize_emoji_handler()
+    if not _emoji_folder: return []
+    return [chr(int(os.path.splitext(name)[0], 16)) for name in sorted(os.listdir(_emoji_folder))
+            if name.endswith(".png")]
+
+def emoji_sizes():
+    """Tailles d'emojis utilisées avec les polices déjà chargées (voir render_text_with_emojis)."""
+    return sorted({int(font.get_height() * 1.1) for font in _fonts.values()})
+
+def load_emoji_image(char, size):
+    """
+    Image d'emoji à la taille demandée, prise dans le paquet d'images s'il la contient,
+    sinon lue depuis le fichier PNG. Sans cache ni conversion (utilisable depuis un thread).
+    """
+    bundle = default_bundle()
+    if bundle and emoji_key(char, size) in bundle:
+        return bundle.surface(emoji_key(char, size))
+    return load_emoji_file(char, size)
+
+def load_emoji_file(char, size):
+    """Lit et redimensionne le fichier PNG d'un emoji ; None s'il n'existe pas."""
     _initialize_emoji_handler()
     if not _emoji_folder: return None
-    
-    if (char, size) in _emoji_cache:
-        return _emoji_cache[(char, size)]
 
     codepoint = hex(ord(char))[2:]
     filepath = os.path.join(_emoji_folder, f"{codepoint}.png")
-
     try:
-        image = pygame.image.load(filepath).convert_alpha()
-        image = pygame.transform.smoothscale(image, (size, size))
-        _emoji_cache[(char, size)] = image
-        return image
-    except pygame.error:
-        _emoji_cache[(char, size)] = None # Mettre en cache l'échec pour ne pas réessayer
+        image = pygame.image.load(filepath)
+        return pygame.transform.smoothscale(image, (size, size))
+    except (pygame.error, FileNotFoundError, ValueError):
         return None
 
+def cache_emoji_image(char, size, image):
+    """Convertit (thread principal) et met en cache une image d'emoji ; None mémorise l'absence d'image."""
+    _emoji_cache[(char, size)] = image.convert_alpha() if image else None
+
+def get_emoji_image(char, size):
+    """Image d'emoji en cache (préchargée), ou chargée immédiatement au premier appel."""
+    if (char, size) not in _emoji_cache:
+        cache_emoji_image(char, size, load_emoji_image(char, size))
+    return _emoji_cache[(char, size)]
+
 def render_text_with_emojis(text, font, color):
     """Crée une surface unique contenant du texte et des emojis (en couleur si possible)."""
     parts = []
@@ -104,6 +160,7 @@ class Button:
     """
     Une classe de bouton réutilisable pour l'interface Pygame.
     Centraliser ce composant évite la duplication de code.
+    Le survol et les clics sont gérés par l'EventDispatcher de l'écran (events.py).
     """
     def __init__(self, x, y, width, height, text, color, text_color=(255, 255, 255), font_size=24):
         self.rect = pygame.Rect(x, y, width, height)
@@ -128,10 +185,3 @@ class Button:
         text_rect = text_surface.get_rect(center=self.rect.center)
         screen.blit(text_surface, text_rect)
 
-    def handle_event(self, event):
-        if event.type == pygame.MOUSEMOTION:
-            self.hovered = self.rect.collidepoint(event.pos)
-        elif event.type == pygame.MOUSEBUTTONDOWN and self.hovered:
-            return True
-        return False
-